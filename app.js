@@ -1,25 +1,4 @@
-// 관심 지역(Watchlist) — 이 지역만 대시보드에 표시. data.json은 보존됨.
-const WATCHLIST_DISTRICTS=['노원구','도봉구','강북구','중랑구'];
-function isInWatchlist(item){
-  const sgg=item.sgg_name||item.region||'';
-  return WATCHLIST_DISTRICTS.some(d=>sgg.includes(d));
-}
-
-// ─── 지역별 규제등급 매핑 (2025.10.15 대책 기준) ───
-const REGULATION_MAP={
-  // 서울 투기과열지구 (LTV 40%) — 서울 전역은 fallback 처리
-  '서울 강남구':{zone:'투기과열',ltv:40},'서울 서초구':{zone:'투기과열',ltv:40},'서울 송파구':{zone:'투기과열',ltv:40},
-  '서울 강동구':{zone:'투기과열',ltv:40},'서울 관악구':{zone:'투기과열',ltv:40},'서울 금천구':{zone:'투기과열',ltv:40},
-  '서울 노원구':{zone:'투기과열',ltv:40},'서울 도봉구':{zone:'투기과열',ltv:40},
-  '서울 강북구':{zone:'투기과열',ltv:40},'서울 중랑구':{zone:'투기과열',ltv:40},
-  '서울 광진구':{zone:'투기과열',ltv:40},'서울 동대문구':{zone:'투기과열',ltv:40},'서울 양천구':{zone:'투기과열',ltv:40},
-};
-function getRegulation(region){
-  if(!region)return{zone:'비규제',ltv:70};
-  if(REGULATION_MAP[region])return REGULATION_MAP[region];
-  if(region.startsWith('서울'))return{zone:'투기과열',ltv:40};
-  return{zone:'비규제',ltv:70};
-}
+// 관심 지역·규제등급·그룹핑·필터 등 데이터 처리는 data_core.js (data_worker.js에서 실행)
 
 // ─── 구별 색상 (지역 배지 · 지도 핀) ───
 const DISTRICT_COLORS={
@@ -29,10 +8,6 @@ const DISTRICT_COLORS={
   '서울 강동구':'#EF4444',
   '서울 강남구':'#6B7280','서울 서초구':'#6B7280','서울 송파구':'#6B7280',
 };
-const DISTRICT_GROUPS={
-  '동북권':['서울 노원구','서울 도봉구','서울 강북구','서울 중랑구','서울 광진구','서울 동대문구'],
-  '남서권':['서울 양천구','서울 관악구','서울 금천구'],
-};
 function getDistrictColor(region){return DISTRICT_COLORS[region]||'#9CA3AF';}
 function districtBadge(region){
   const color=getDistrictColor(region);
@@ -40,8 +15,8 @@ function districtBadge(region){
   return '<span class="dc-badge" style="background:'+color+'">'+short+'</span>';
 }
 
-let currentMode='buy',isMarried=true,PROPERTIES=[],RENT_PROPERTIES=[],DATA_LOADED=false,RENT_DATA_LOADED=false,DATA_UPDATED_AT='',RENT_UPDATED_AT='',currentSort='value',rentSort='value',searchQuery='',regionFilterVal='',verdictFilterVal='',rentTypeFilterVal='',rentVerdictFilterVal='',districtFilterVal='',areaUnit='py',pageSize=20,currentPage=1,rentPage=1,currentView='card';
-let markerMap={},filteredBuyProps=[],filteredRentProps=[],hlTimer=null,COMMUTE_DATA={};
+let currentMode='buy',isMarried=true,PROP_COUNT=0,RENT_COUNT=0,RENT_ANOMALY_COUNT=0,DATA_LOADED=false,RENT_DATA_LOADED=false,DATA_UPDATED_AT='',RENT_UPDATED_AT='',currentSort='value',rentSort='value',searchQuery='',regionFilterVal='',verdictFilterVal='',rentTypeFilterVal='',rentVerdictFilterVal='',districtFilterVal='',areaUnit='py',pageSize=20,currentPage=1,rentPage=1,currentView='card';
+let markerMap={},hlTimer=null;
 // ─── 북마크 ───
 let BOOKMARKS=new Set(JSON.parse(localStorage.getItem('bookmarks')||'[]'));
 function saveBookmarks(){localStorage.setItem('bookmarks',JSON.stringify([...BOOKMARKS]));}
@@ -76,7 +51,7 @@ function switchMode(mode){
   document.getElementById('logoText').textContent=mode==='buy'?'🏠 우리 집 사기':'🔑 우리 집 구하기';
   const tabBtnProp=document.getElementById('tabBtnProperties');
   if(mode==='rent'){
-    if(RENT_DATA_LOADED&&RENT_PROPERTIES.length>0){tabBtnProp.style.display='';tabBtnProp.textContent='📊 전세 실거래';switchTab('properties');}
+    if(RENT_DATA_LOADED&&RENT_COUNT>0){tabBtnProp.style.display='';tabBtnProp.textContent='📊 전세 실거래';switchTab('properties');}
     else{tabBtnProp.style.display='none';switchTab('policy');}
   }else{tabBtnProp.style.display='';tabBtnProp.textContent='📊 매물 시뮬레이션';}
   update();
@@ -98,7 +73,11 @@ function onRentTypeChange(){
 function setRV(id,v){const s=document.getElementById(id),i=document.getElementById(id+'Val');if(s)s.value=v;if(i)i.value=v;}
 function toggleAreaUnit(){areaUnit=areaUnit==='py'?'m2':'py';document.getElementById('areaUnitLabel').textContent=areaUnit==='py'?'평':'㎡';update();}
 function fmtArea(p){return areaUnit==='py'?(p.area_py?p.area_py+'평':p.area):p.area;}
-function toggleHistory(btn){let h=btn.closest('.prop-card,tr')?.querySelector('.trade-history');if(!h)h=btn.nextElementSibling;if(!h||!h.classList.contains('trade-history'))return;h.classList.toggle('open');btn.textContent=h.classList.contains('open')?'▼ 거래내역 접기':'▶ 거래내역 '+h.querySelectorAll('.trade-row').length+'건';}
+function toggleHistory(btn){
+  // 가상 목록 행은 펼친 상태만 기록하고 행을 다시 그린다 (히스토리 HTML은 펼칠 때만 생성)
+  const row=btn.closest('[data-prop-id]');
+  if(row&&row._vlist){const pid=row.dataset.propId;if(_openHistory.has(pid))_openHistory.delete(pid);else _openHistory.add(pid);row._vlist.refreshRow(row);return;}
+  let h=btn.closest('.prop-card,tr')?.querySelector('.trade-history');if(!h)h=btn.nextElementSibling;if(!h||!h.classList.contains('trade-history'))return;h.classList.toggle('open');btn.textContent=h.classList.contains('open')?'▼ 거래내역 접기':'▶ 거래내역 '+h.querySelectorAll('.trade-row').length+'건';}
 function switchTab(tabId){
   document.querySelectorAll('.tab-btn').forEach(b=>b.classList.remove('active'));
   document.querySelectorAll('.tab-content').forEach(c=>c.classList.remove('active'));
@@ -125,28 +104,22 @@ function switchTab(tabId){
   }
 }
 function changePageSize(v){pageSize=parseInt(v);currentPage=1;update();}
+// pageSize 0 = 전체 (가상 목록이라 한 페이지에 모두 두어도 화면에 보이는 행만 렌더링)
+function pageLen(total){return pageSize>0?pageSize:Math.max(1,total);}
 function changeRentPageSize(v){pageSize=parseInt(v);rentPage=1;update();}
 function getVal(id){const i=document.getElementById(id+'Val');if(i&&i.value!=='')return parseFloat(i.value);const e=document.getElementById(id);return e?parseFloat(e.value):0;}
 function fmtShort(n){if(n>=10000){const u=Math.floor(n/10000),m=n%10000;return m===0?u+'억':u+'억 '+m.toLocaleString()+'만';}return n.toLocaleString()+'만';}
-function monthlyPayment(p,r,y){if(p<=0)return 0;const mr=r/100/12,n=y*12;if(mr===0)return p/n;return p*mr*Math.pow(1+mr,n)/(Math.pow(1+mr,n)-1);}
 function maxLoanFromMonthly(m,r,y){const mr=r/100/12,n=y*12;if(mr===0)return m*n;return m*(Math.pow(1+mr,n)-1)/(mr*Math.pow(1+mr,n));}
 function makeLinks(p){const q=encodeURIComponent((p.dong||'')+' '+p.name);return '<a href="https://m.land.naver.com/search/result/'+q+'" target="_blank" class="link-icon" title="네이버 부동산">N</a>';}
 function fmtCommute(min){if(min==null)return'<span style="color:var(--text-dim)">—</span>';const c=min<=60?'var(--green)':min<=90?'var(--yellow)':'var(--text-dim)';return'<span style="color:'+c+'">'+min+'분</span>';}
 function commuteHtml(p){return'<span class="pc-commute">🚇'+fmtCommute(p.commuteSubway)+' 🚌'+fmtCommute(p.commuteTransit)+'</span>';}
 function jeonseRateBadge(p){if(p.jeonseRate==null)return'';if(p.jeonseRate>=70)return'<span class="tag tag-jr tag-jr-danger">전세가율 '+p.jeonseRate+'%</span>';if(p.jeonseRate<=50)return'<span class="tag tag-jr tag-jr-safe">전세가율 '+p.jeonseRate+'%</span>';return'<span class="tag tag-jr">전세가율 '+p.jeonseRate+'%</span>';}
-function findBuyMatch(p){
-  if(!DATA_LOADED||PROPERTIES.length===0)return null;
-  const py=parseFloat(p.area_py)||0;
-  // 1순위: 같은 이름+같은 면적
-  let m=PROPERTIES.find(b=>b.name===p.name&&b.area_py===p.area_py);
-  if(m)return m;
-  // 2순위: 같은 이름+유사면적(±3평)
-  m=PROPERTIES.find(b=>b.name===p.name&&Math.abs((parseFloat(b.area_py)||0)-py)<=3);
-  return m||null;
-}
+// 매수비교 버튼은 화면에 그려진 전세 행에만 있으므로 받아 둔 페이지에서 찾고, 매매 시세 매칭은 Worker에 요청
 function showBuyCompare(pid){
-  const rp=RENT_PROPERTIES.find(p=>getPropId(p)===pid);if(!rp)return;
-  const bp=findBuyMatch(rp);
+  const rp=RESULTS.rent&&RESULTS.rent.page.find(p=>p&&getPropId(p)===pid);if(!rp)return;
+  dataRequest({type:'match',p:{region:rp.region,dong:rp.dong,name:rp.name,area_py:rp.area_py}}).then(m=>renderBuyCompare(rp,m.match));
+}
+function renderBuyCompare(rp,bp){
   const eq=getVal('cash'),interior=getVal('interior'),eqBuy=Math.max(0,eq-interior);
   const rate=getVal('rate'),term=getVal('term');
   const rr=getVal('rentRate'),rlr=getVal('rentLoanRatio'),rll=getVal('rentLoanLimit');
@@ -168,13 +141,6 @@ function showBuyCompare(pid){
   overlay.addEventListener('click',function(e){if(e.target===overlay)overlay.remove();});
   document.body.appendChild(overlay);
 }
-function matchCommute(p){
-  if(!COMMUTE_DATA.data)return null;const d=COMMUTE_DATA.data;
-  const key=p.region+' '+p.dong;if(d[key])return d[key];
-  const normR=s=>s.replace(/시(\s|$)/g,'$1').replace(/^경기\s+/,'').replace(/\s+/g,' ').trim();
-  const nk=normR(key);for(const[k,v]of Object.entries(d)){if(normR(k)===nk)return v;}
-  return null;
-}
 function setSort(btn){btn.closest('.filter-chip-group').querySelectorAll('.filter-chip').forEach(b=>b.classList.remove('active'));btn.classList.add('active');currentSort=btn.dataset.sort;currentPage=1;update();}
 function setRentSort(btn){btn.closest('.filter-chip-group').querySelectorAll('.filter-chip').forEach(b=>b.classList.remove('active'));btn.classList.add('active');rentSort=btn.dataset.sort;rentPage=1;update();}
 function setVerdictFilter(btn){document.querySelectorAll('#verdictChips .filter-chip').forEach(b=>b.classList.remove('active'));btn.classList.add('active');verdictFilterVal=btn.dataset.val;currentPage=1;update();}
@@ -212,16 +178,11 @@ function resetRentFilters(){
   const rb=document.getElementById('rentBmOnly');if(rb)rb.checked=false;
   document.getElementById('rentSearchInput').value='';_focusedPropId=null;rentPage=1;update();
 }
-function areaMatch(py,val){if(!val)return true;const p=parseFloat(py)||0;if(val==='small')return p<=18;if(val==='mid')return p>18&&p<=25;if(val==='large')return p>25;return true;}
-function builtYearMatch(by,val){if(!val)return true;if(!by)return false;const cy=new Date().getFullYear();if(val==='old')return cy-by>=20;return cy-by<=parseInt(val);}
-function getPropId(p){return (p.name+'_'+(p.dong||'')+'_'+(p.area_py||'')).replace(/\s/g,'');}
-function getMarkerKey(p){return p.name+'_'+p.region;}
 function focusCard(mKey){
-  const props=currentMode==='buy'?filteredBuyProps:filteredRentProps;
-  const idx=props.findIndex(p=>getMarkerKey(p)===mKey);
-  if(idx<0)return;
-  const targetPage=Math.floor(idx/pageSize)+1,propId=getPropId(props[idx]);
-  _focusedPropId=propId;
+  const res=RESULTS[currentMode==='buy'?'trade':'rent'],pt=res&&res.markers.find(m=>m.key===mKey);
+  if(!pt)return;
+  const targetPage=Math.floor(pt.row/pageLen(res.total))+1;
+  _focusedPropId=pt.id;_focusedRow=pt.row;
   if(mapIdleTimer)clearTimeout(mapIdleTimer);
   let need=false;
   if(currentMode==='buy'&&currentPage!==targetPage){currentPage=targetPage;need=true;}
@@ -231,61 +192,164 @@ function focusCard(mKey){
 }
 function restoreFocus(){
   if(!_focusedPropId)return;
-  const el=document.querySelector('[data-prop-id="'+_focusedPropId+'"]');
-  if(!el)return;
+  const sel='[data-prop-id="'+_focusedPropId+'"]';
+  let el=document.querySelector(sel);
+  if(!el){const vl=activeVList(),res=RESULTS[currentMode==='buy'?'trade':'rent'];_autoScrolling=true;if(vl&&res&&vl.scrollToIndex(_focusedRow-res.start))el=document.querySelector(sel);}
+  if(!el){_autoScrolling=false;return;}
   _autoScrolling=true;
   el.scrollIntoView({behavior:'smooth',block:'center'});
   highlightEl(el);
   setTimeout(()=>{_autoScrolling=false;},800);
 }
 function highlightEl(el){document.querySelectorAll('.highlight').forEach(e=>e.classList.remove('highlight'));if(hlTimer)clearTimeout(hlTimer);el.classList.add('highlight');hlTimer=setTimeout(()=>{if(el.classList)el.classList.remove('highlight');},2500);}
-function bounceMarker(mKey){stopBounce();const m=markerMap[mKey];if(m&&m.a)m.a.style.animation='markerBounce 0.6s ease infinite';}
-function stopBounce(){Object.values(markerMap).forEach(m=>{try{if(m.a)m.a.style.animation='';}catch(e){}});}
-function renderBuyCards(items,eq,mr){
-  const cg=document.getElementById('propertyCards');cg.innerHTML='';
-  items.forEach(p=>{
-    const bc=p.verdict==='매수가능'?'ok':p.verdict==='빠듯함'?'warn':'danger';
-    const meta=[];
-    if(p.station_name)meta.push((p.line?p.line+' ':'')+'도보 '+(p.walk_min||'?')+'분');
-    if(p.built_year)meta.push(p.built_year+'년');
-    if(p.area_py)meta.push(p.area_py+'평'+(p.area?'('+p.area+')':''));
-    if(p.households>0)meta.push(p.households+'세대');else if(p.households===0&&isLikelyNaholo(p))meta.push('<span class="tag tag-danger" style="font-size:10px;padding:1px 4px">⚠️ 소단지 추정</span>');else if(p.households===0)meta.push('<span style="color:var(--text-dim)">세대수 미확인</span>');
-    const mColor=p.pMonthly>mr?'var(--red)':p.pMonthly>mr*0.85?'var(--yellow)':'var(--green)';
-    const details='대출 '+fmtShort(p.pLoan)+' · 자기 '+fmtShort(p.pEquityNeeded)+' · <span style="color:'+mColor+'">월 '+p.pMonthly+'만</span>';
-    const tBtn=p.trade_count>1?'<button class="expand-btn" onclick="toggleHistory(this)">▶ 거래내역 '+p.trade_count+'건</button>':'';
-    let hH='';if(p.trade_count>1){const rows=p.trades.map((t,i)=>{let d='';if(i<p.trades.length-1){const df=t.price-p.trades[i+1].price;d=df>0?'<span class="trade-delta up">+'+fmtShort(df)+'</span>':df<0?'<span class="trade-delta down">'+fmtShort(df)+'</span>':'<span class="trade-delta same">±0</span>';}return '<div class="trade-row"><span class="trade-date">'+(t.date||'')+'</span><span class="trade-price">'+fmtShort(t.price)+'</span><span class="trade-floor">'+t.floor+'층</span>'+d+'</div>';}).join('');hH='<div class="trade-history"><div class="trade-history-title"><span>📊 거래 히스토리</span></div>'+rows+'</div>';}
-    const card=document.createElement('div');card.className='prop-card pc-compact';card.dataset.propId=getPropId(p);
-    card.addEventListener('mouseenter',()=>bounceMarker(getMarkerKey(p)));card.addEventListener('mouseleave',()=>stopBounce());
-    const regBadge=p.regZone==='투기과열'?'<span class="tag tag-reg tag-reg-hot">투기과열 LTV'+p.pLTV+'%</span>':'<span class="tag tag-reg tag-reg-free">비규제 LTV'+p.pLTV+'%</span>';
-    card.innerHTML='<div class="pc-line">'+bmBtn(p)+'<span class="pc-badge-sm '+bc+'">'+p.verdict+'</span>'+districtBadge(p.region)+'<span class="pc-cname">'+p.name+'</span><span class="pc-cregion">'+p.region+'</span>'+regBadge+'</div><div class="pc-line"><span class="pc-cmeta">'+meta.join(' · ')+'</span></div><div class="pc-line"><span class="pc-cprice">매매 '+fmtShort(p.price)+'</span><span class="pc-cdetails">'+details+'</span></div><div class="pc-cfoot"><span>'+tBtn+'</span>'+commuteHtml(p)+'<div class="pc-links">'+makeLinks(p)+'</div></div>'+(hH?'<div class="pc-history">'+hH+'</div>':'');
-    cg.appendChild(card);
-  });
+// 마커 강조: 키로 바로 찾고(클러스터에 묶여 있으면 클러스터를 강조), 강조 중인 요소 하나만 되돌린다
+let _bounceEl=null;
+function bounceMarker(mKey){stopBounce();const m=markerMap[mKey];let el=m&&m.a;if(!el){const c=_mapLayer.get(_clusterOfMarker.get(mKey));el=c&&c.el;}if(el){el.style.animation='markerBounce 0.6s ease infinite';_bounceEl=el;}}
+function stopBounce(){if(_bounceEl){try{_bounceEl.style.animation='';}catch(e){}_bounceEl=null;}}
+// ─── 가상 스크롤 목록 ───
+// 뷰포트(+VLIST_OVERSCAN_PX)에 걸친 행만 DOM에 두고, 범위를 벗어난 노드는 새로 보이는 행에 재사용한다.
+// 행 높이는 그린 뒤 실측해 propId별로 캐시(미측정 행은 평균값)하고, 누적 오프셋을 이진 탐색해 시작 행을 찾는다.
+// 마커 강조는 행마다 리스너를 달지 않고 목록 컨테이너에서 위임 처리.
+// 목록 배열에 빈 칸(아직 Worker에서 받지 않은 행)이 있으면 자리만 그려 두고 o.load로 요청, 도착하면 refresh.
+const VLIST_OVERSCAN_PX=600;
+const _openHistory=new Set();
+function createVirtualList(host,o){
+  // o: {tag:'div'|'tr', cls, cols(표 colspan), estimate(px), render(p,ctx), load(i)}
+  let items=[],ctx=null,gen=0,offsets=new Float64Array(1),dirty=true,start=0,end=0,drawnGen=-1,hovered=null,frame=0;
+  const heights=new Map(),live=[],pool=[];
+  const keyOf=i=>items[i]?getPropId(items[i]):'#'+i;
+  const spacer=()=>{const el=document.createElement(o.tag);el.className='vlist-spacer';if(o.tag==='tr')el.innerHTML='<td colspan="'+o.cols+'"></td>';el.style.display='none';return el;};
+  const top=spacer(),bottom=spacer();
+  host.innerHTML='';host.appendChild(top);host.appendChild(bottom);
+  // 행 간격: 그리드 gap + 행 margin (모바일에서 tr이 카드형 블록이 됨)
+  const gap=()=>{const g=parseFloat(getComputedStyle(host).rowGap)||0;if(!live.length)return g;const cs=getComputedStyle(live[0]);return g+(parseFloat(cs.marginTop)||0)+(parseFloat(cs.marginBottom)||0);};
+  function rebuild(){
+    const n=items.length;if(offsets.length!==n+1)offsets=new Float64Array(n+1);
+    // 미측정 행 추정치는 접힌 행 평균 (펼친 히스토리가 추정을 부풀리지 않게)
+    let sum=0,cnt=0;heights.forEach((h,k)=>{if(!_openHistory.has(k)){sum+=h;cnt++;}});
+    const est=cnt?sum/cnt:o.estimate;
+    for(let i=0;i<n;i++)offsets[i+1]=offsets[i]+(heights.get(keyOf(i))||est);
+    dirty=false;
+  }
+  function indexAt(y){let lo=0,hi=items.length;while(lo<hi){const m=(lo+hi)>>1;if(offsets[m+1]<=y)lo=m+1;else hi=m;}return lo;}
+  function setSpacer(el,h){el.style.display=h>0?'':'none';el.style.height=h+'px';}
+  function fill(node,i){
+    const p=items[i];node._vi=i;node._vgen=gen;node._vlist=api;node._vph=!p;
+    if(!p){node.className=o.cls+' vlist-loading';delete node.dataset.propId;delete node.dataset.mkey;node.innerHTML=o.tag==='tr'?'<td colspan="'+o.cols+'">…</td>':'…';if(o.load)o.load(i);return;}
+    node.className=o.cls;node.dataset.propId=getPropId(p);node.dataset.mkey=getMarkerKey(p);
+    node.innerHTML=o.render(p,ctx);
+  }
+  function measure(){
+    const g=gap();let changed=false;
+    for(const node of live){if(node._vph)continue;const h=node.offsetHeight+g,k=node.dataset.propId;if(heights.get(k)!==h){heights.set(k,h);changed=true;}}
+    if(changed)rebuild();
+    const g0=start>0?g:0;
+    setSpacer(top,Math.max(0,offsets[start]-g0));setSpacer(bottom,Math.max(0,offsets[items.length]-offsets[end]-(end<items.length?g:0)));
+  }
+  function draw(force){
+    frame=0;
+    if(!host.getClientRects().length)return;
+    if(dirty)rebuild();
+    const sc=document.getElementById('splitList'),hr=host.getBoundingClientRect();
+    const sr=sc&&sc.contains(host)?sc.getBoundingClientRect():{top:0,bottom:window.innerHeight};
+    const vTop=Math.max(sr.top,0)-hr.top-VLIST_OVERSCAN_PX,vBot=Math.min(sr.bottom,window.innerHeight)-hr.top+VLIST_OVERSCAN_PX;
+    const s0=Math.min(indexAt(Math.max(0,vTop)),items.length),e0=Math.max(s0,Math.min(items.length,indexAt(Math.max(0,vBot))+1));
+    if(!force&&s0===start&&e0===end&&drawnGen===gen)return;
+    start=s0;end=e0;drawnGen=gen;
+    // 범위 안에 이미 그려진 행은 그대로 두고, 나머지 노드는 풀로 돌려 재사용
+    const keep=new Map();
+    for(const node of live){if(node._vgen===gen&&node._vi>=start&&node._vi<end&&!(node._vph&&items[node._vi]))keep.set(node._vi,node);else{node.remove();pool.push(node);}}
+    live.length=0;
+    let cur=top.nextSibling;
+    for(let i=start;i<end;i++){
+      let node=keep.get(i);
+      if(node){if(node===cur)cur=cur.nextSibling;else host.insertBefore(node,cur);}
+      else{node=pool.pop()||document.createElement(o.tag);fill(node,i);host.insertBefore(node,cur);}
+      live.push(node);
+    }
+    measure();
+  }
+  function schedule(){if(!frame)frame=requestAnimationFrame(()=>draw(false));}
+  host.addEventListener('mouseover',e=>{const el=e.target.closest('[data-mkey]');if(el===hovered)return;hovered=el;if(el)bounceMarker(el.dataset.mkey);else stopBounce();});
+  host.addEventListener('mouseleave',()=>{hovered=null;stopBounce();});
+  const api={
+    setItems(list,c){items=list;ctx=c;gen++;dirty=true;hovered=null;draw(true);},
+    schedule,
+    refreshRow(node){if(node._vgen!==gen)return;fill(node,node._vi);measure();schedule();},
+    refresh(){dirty=true;draw(true);},
+    scrollToIndex(i){
+      if(!(i>=0&&i<items.length))return false;
+      if(dirty)rebuild();
+      const sc=document.getElementById('splitList'),hr=host.getBoundingClientRect(),y=hr.top+offsets[i];
+      if(sc&&sc.contains(host)&&sc.scrollHeight>sc.clientHeight){const sr=sc.getBoundingClientRect();sc.scrollTop+=y-(sr.top+sc.clientHeight/2);}
+      else window.scrollBy(0,y-window.innerHeight/2);
+      draw(true);return true;
+    }
+  };
+  return api;
 }
-function renderRentCards(items,equity,budget){
-  const cg=document.getElementById('rentPropertyCards');cg.innerHTML='';
-  items.forEach(p=>{
-    const bc=p.verdict==='가능'?'ok':p.verdict==='빠듯함'?'warn':'danger';
-    const typeIcon=p.rent_type==='월세'?'💳':'🔑';
-    const meta=[];
-    if(p.station_name)meta.push((p.line?p.line+' ':'')+'도보 '+(p.walk_min||'?')+'분');
-    if(p.built_year)meta.push(p.built_year+'년');
-    if(p.area_py)meta.push(p.area_py+'평'+(p.area?'('+p.area+')':''));
-    if(p.households>0)meta.push(p.households+'세대');else if(p.households===0&&isLikelyNaholo(p))meta.push('<span class="tag tag-danger" style="font-size:10px;padding:1px 4px">⚠️ 소단지 추정</span>');else if(p.households===0)meta.push('<span style="color:var(--text-dim)">세대수 미확인</span>');
-    const needEq=Math.max(0,p.deposit-budget+equity);const loanAmt=p.deposit-needEq;const rr=getVal('rentRate');const mi=Math.round(loanAmt*rr/100/12);
-    const miColor=mi<=50?'var(--green)':mi<=80?'var(--yellow)':'var(--red)';
-    const priceStr=p.rent_type==='월세'?'월세 '+fmtShort(p.deposit)+'/'+p.monthly_rent+'만':'전세 '+fmtShort(p.deposit);
-    const details='대출 '+fmtShort(loanAmt)+' · 자기 '+fmtShort(needEq)+' · <span style="color:'+miColor+'">이자 '+mi+'만</span>';
-    const tBtn=p.trade_count>1?'<button class="expand-btn" onclick="toggleHistory(this)">▶ 거래내역 '+p.trade_count+'건</button>':'';
-    let hH='';if(p.trade_count>1){const rows=p.trades.map((t,i)=>{let d='';if(i<p.trades.length-1){const df=t.deposit-p.trades[i+1].deposit;d=df>0?'<span class="trade-delta up">+'+fmtShort(df)+'</span>':df<0?'<span class="trade-delta down">'+fmtShort(df)+'</span>':'<span class="trade-delta same">±0</span>';}return '<div class="trade-row"><span class="trade-date">'+(t.date||'')+'</span><span class="trade-price">'+fmtShort(t.deposit)+'</span><span class="trade-floor">'+t.floor+'층</span>'+d+'</div>';}).join('');hH='<div class="trade-history"><div class="trade-history-title"><span>📊 거래 히스토리</span></div>'+rows+'</div>';}
-    const card=document.createElement('div');card.className='prop-card pc-compact';card.dataset.propId=getPropId(p);
-    card.addEventListener('mouseenter',()=>bounceMarker(getMarkerKey(p)));card.addEventListener('mouseleave',()=>stopBounce());
-    const anomalyBadge=p.priceAnomaly?'<span class="tag tag-anomaly">⚠️ 이상가격</span>':'';
-    const jrBadge=jeonseRateBadge(p);
-    const cmpBtn=p.rent_type==='전세'?'<button class="expand-btn" onclick="showBuyCompare(\''+getPropId(p).replace(/'/g,"\\'")+'\')">📊 매수비교</button>':'';
-    card.innerHTML='<div class="pc-line">'+bmBtn(p)+'<span class="pc-badge-sm '+bc+'">'+p.verdict+'</span>'+anomalyBadge+jrBadge+'<span class="pc-cname">'+typeIcon+' '+p.name+'</span><span class="pc-cregion">'+p.region+'</span></div><div class="pc-line"><span class="pc-cmeta">'+meta.join(' · ')+'</span></div><div class="pc-line"><span class="pc-cprice">'+priceStr+'</span><span class="pc-cdetails">'+details+'</span></div><div class="pc-cfoot"><span>'+tBtn+cmpBtn+'</span>'+commuteHtml(p)+'<div class="pc-links">'+makeLinks(p)+'</div></div>'+(hH?'<div class="pc-history">'+hH+'</div>':'');
-    cg.appendChild(card);
-  });
+function tradeHistoryHtml(p,f,detail){
+  const rows=p.trades.map((t,i)=>{let d='';if(i<p.trades.length-1){const df=t[f]-p.trades[i+1][f];d=df>0?'<span class="trade-delta up">+'+fmtShort(df)+'</span>':df<0?'<span class="trade-delta down">'+fmtShort(df)+'</span>':'<span class="trade-delta same">±0</span>';}return '<div class="trade-row"><span class="trade-date">'+(t.date||(detail?'날짜없음':''))+'</span><span class="trade-price">'+fmtShort(t[f])+'</span><span class="trade-floor">'+t.floor+'층</span>'+d+'</div>';}).join('');
+  const pd=p['max_'+f]-p['min_'+f];
+  return '<div class="trade-history open"><div class="trade-history-title"><span>📊 거래 히스토리</span>'+(detail?'<span style="font-size:10px;color:var(--text-dim)">'+(pd>0?'변동폭: '+fmtShort(pd):'동일가')+'</span>':'')+'</div>'+rows+'</div>';
+}
+function historyBtn(p){if(p.trade_count<=1)return'';return '<button class="expand-btn" onclick="toggleHistory(this)">'+(_openHistory.has(getPropId(p))?'▼ 거래내역 접기':'▶ 거래내역 '+p.trade_count+'건')+'</button>';}
+function openHistoryHtml(p,f,detail){return p.trade_count>1&&_openHistory.has(getPropId(p))?tradeHistoryHtml(p,f,detail):'';}
+function sizeMetaHtml(p){return p.households>0?p.households+'세대':p.households===0&&isLikelyNaholo(p)?'<span class="tag tag-danger" style="font-size:10px;padding:1px 4px">⚠️ 소단지 추정</span>':p.households===0?'<span style="color:var(--text-dim)">세대수 미확인</span>':'';}
+function buyCardHtml(p,c){
+  const bc=p.verdict==='매수가능'?'ok':p.verdict==='빠듯함'?'warn':'danger';
+  const meta=[];
+  if(p.station_name)meta.push((p.line?p.line+' ':'')+'도보 '+(p.walk_min||'?')+'분');
+  if(p.built_year)meta.push(p.built_year+'년');
+  if(p.area_py)meta.push(p.area_py+'평'+(p.area?'('+p.area+')':''));
+  const hm=sizeMetaHtml(p);if(hm)meta.push(hm);
+  const mColor=p.pMonthly>c.mr?'var(--red)':p.pMonthly>c.mr*0.85?'var(--yellow)':'var(--green)';
+  const details='대출 '+fmtShort(p.pLoan)+' · 자기 '+fmtShort(p.pEquityNeeded)+' · <span style="color:'+mColor+'">월 '+p.pMonthly+'만</span>';
+  const hH=openHistoryHtml(p,'price',false);
+  const regBadge=p.regZone==='투기과열'?'<span class="tag tag-reg tag-reg-hot">투기과열 LTV'+p.pLTV+'%</span>':'<span class="tag tag-reg tag-reg-free">비규제 LTV'+p.pLTV+'%</span>';
+  return '<div class="pc-line">'+bmBtn(p)+'<span class="pc-badge-sm '+bc+'">'+p.verdict+'</span>'+districtBadge(p.region)+'<span class="pc-cname">'+p.name+'</span><span class="pc-cregion">'+p.region+'</span>'+regBadge+'</div><div class="pc-line"><span class="pc-cmeta">'+meta.join(' · ')+'</span></div><div class="pc-line"><span class="pc-cprice">매매 '+fmtShort(p.price)+'</span><span class="pc-cdetails">'+details+'</span></div><div class="pc-cfoot"><span>'+historyBtn(p)+'</span>'+commuteHtml(p)+'<div class="pc-links">'+makeLinks(p)+'</div></div>'+(hH?'<div class="pc-history">'+hH+'</div>':'');
 }
+function rentCardHtml(p,c){
+  const bc=p.verdict==='가능'?'ok':p.verdict==='빠듯함'?'warn':'danger';
+  const typeIcon=p.rent_type==='월세'?'💳':'🔑';
+  const meta=[];
+  if(p.station_name)meta.push((p.line?p.line+' ':'')+'도보 '+(p.walk_min||'?')+'분');
+  if(p.built_year)meta.push(p.built_year+'년');
+  if(p.area_py)meta.push(p.area_py+'평'+(p.area?'('+p.area+')':''));
+  const hm=sizeMetaHtml(p);if(hm)meta.push(hm);
+  const needEq=Math.max(0,p.deposit-c.budget+c.equity);const loanAmt=p.deposit-needEq;const mi=Math.round(loanAmt*c.rr/100/12);
+  const miColor=mi<=50?'var(--green)':mi<=80?'var(--yellow)':'var(--red)';
+  const priceStr=p.rent_type==='월세'?'월세 '+fmtShort(p.deposit)+'/'+p.monthly_rent+'만':'전세 '+fmtShort(p.deposit);
+  const details='대출 '+fmtShort(loanAmt)+' · 자기 '+fmtShort(needEq)+' · <span style="color:'+miColor+'">이자 '+mi+'만</span>';
+  const hH=openHistoryHtml(p,'deposit',false);
+  const anomalyBadge=p.priceAnomaly?'<span class="tag tag-anomaly">⚠️ 이상가격</span>':'';
+  const cmpBtn=p.rent_type==='전세'?'<button class="expand-btn" onclick="showBuyCompare(\''+getPropId(p).replace(/'/g,"\\'")+'\')">📊 매수비교</button>':'';
+  return '<div class="pc-line">'+bmBtn(p)+'<span class="pc-badge-sm '+bc+'">'+p.verdict+'</span>'+anomalyBadge+jeonseRateBadge(p)+'<span class="pc-cname">'+typeIcon+' '+p.name+'</span><span class="pc-cregion">'+p.region+'</span></div><div class="pc-line"><span class="pc-cmeta">'+meta.join(' · ')+'</span></div><div class="pc-line"><span class="pc-cprice">'+priceStr+'</span><span class="pc-cdetails">'+details+'</span></div><div class="pc-cfoot"><span>'+historyBtn(p)+cmpBtn+'</span>'+commuteHtml(p)+'<div class="pc-links">'+makeLinks(p)+'</div></div>'+(hH?'<div class="pc-history">'+hH+'</div>':'');
+}
+function rowExtraHtml(p){const ex=[];if(p.built_year)ex.push(p.built_year+'년');const hm=sizeMetaHtml(p);if(hm)ex.push(hm);if(p.trade_count>1)ex.push(p.trade_count+'건');return ex;}
+function buyRowHtml(p,c){
+  const ex=rowExtraHtml(p),stTxt=p.station_name?(p.station_name+(p.walk_min?' '+p.walk_min+'분':'')):'—';
+  const tRegBadge=p.regZone==='투기과열'?'<span class="tag tag-reg tag-reg-hot">투기과열 '+p.pLTV+'%</span>':'<span class="tag tag-reg tag-reg-free">비규제 '+p.pLTV+'%</span>';
+  return '<td data-label="판정"><span class="tag '+p.verdictTag+'">'+p.verdict+'</span></td><td data-label="단지명"><strong>'+p.name+'</strong><br><span style="font-size:10px;color:var(--text-dim)">'+(p.line?p.line+' ':'')+p.station+(ex.length?' · '+ex.join(' · '):'')+'</span><br>'+historyBtn(p)+openHistoryHtml(p,'price',true)+'</td><td data-label="지역"><span class="tag tag-region">'+p.region+'</span> '+tRegBadge+'</td><td data-label="면적">'+fmtArea(p)+'</td><td data-label="매매가" class="mono">'+fmtShort(p.price)+'</td><td data-label="월상환" class="mono" style="color:'+(p.pMonthly>c.mr?'var(--red)':p.pMonthly>c.mr*0.85?'var(--yellow)':'var(--green)')+'">'+p.pMonthly+'만</td><td data-label="역세권">'+stTxt+'</td><td data-label="연식">'+(p.built_year||'—')+'</td><td data-label="세대">'+(p.households||'—')+'</td><td data-label="링크"><div class="link-icons">'+makeLinks(p)+'</div></td>';
+}
+function rentRowHtml(p){
+  const ex=rowExtraHtml(p),stTxt=p.station_name?(p.station_name+(p.walk_min?' '+p.walk_min+'분':'')):'—';
+  const typeTag=p.rent_type==='월세'?'<span class="tag tag-warn" style="font-size:10px">월세</span>':'<span class="tag tag-ok" style="font-size:10px">전세</span>';
+  const anomTag=p.priceAnomaly?' <span class="tag tag-anomaly" style="font-size:9px">⚠️ 이상</span>':'';
+  return '<td data-label="판정"><span class="tag '+p.verdictTag+'">'+p.verdict+'</span>'+anomTag+'</td><td data-label="단지명"><strong>'+p.name+'</strong>'+jeonseRateBadge(p)+'<br><span style="font-size:10px;color:var(--text-dim)">'+(p.line?p.line+' ':'')+p.station+(ex.length?' · '+ex.join(' · '):'')+'</span><br>'+historyBtn(p)+openHistoryHtml(p,'deposit',true)+'</td><td data-label="지역"><span class="tag tag-region">'+p.region+'</span></td><td data-label="면적">'+fmtArea(p)+'</td><td data-label="유형">'+typeTag+'</td><td data-label="보증금" class="mono">'+fmtShort(p.deposit)+'</td><td data-label="월세" class="mono">'+(p.monthly_rent>0?p.monthly_rent+'만':'—')+'</td><td data-label="역세권">'+stTxt+'</td><td data-label="연식">'+(p.built_year||'—')+'</td><td data-label="세대">'+(p.households||'—')+'</td><td data-label="링크"><div class="link-icons">'+makeLinks(p)+'</div></td>';
+}
+const VLISTS={};
+function vlist(name){
+  if(VLISTS[name])return VLISTS[name];
+  const cfg={buyCards:['propertyCards','div',buyCardHtml,120],rentCards:['rentPropertyCards','div',rentCardHtml,120],buyRows:['propertyBody','tr',buyRowHtml,64],rentRows:['rentPropertyBody','tr',rentRowHtml,64]}[name];
+  const host=document.getElementById(cfg[0]);if(!host)return null;
+  const kind=name.startsWith('buy')?'trade':'rent';
+  return VLISTS[name]=createVirtualList(host,{tag:cfg[1],cls:cfg[1]==='div'?'prop-card pc-compact':'',cols:host.closest('table')?.querySelectorAll('thead th').length||1,estimate:cfg[3],render:cfg[2],load:i=>loadRows(kind,i)});
+}
+function activeVList(){return VLISTS[(currentMode==='buy'?'buy':'rent')+(currentView==='card'?'Cards':'Rows')]||null;}
+function redrawVLists(){Object.values(VLISTS).forEach(v=>v.schedule());}
+function renderBuyCards(items,eq,mr){vlist('buyCards').setItems(items,{eq,mr});}
+function renderRentCards(items,equity,budget){vlist('rentCards').setItems(items,{equity,budget,rr:getVal('rentRate')});}
 
 function saveSettings(){
   const userSettings={
@@ -325,108 +389,106 @@ async function loadSettings(){
   if(s.married!==undefined){isMarried=s.married;document.querySelectorAll('.marriage-btn').forEach(b=>b.classList.toggle('active',(b.dataset.married==='1')===isMarried));}
   }catch(e){console.warn('settings.json 없음, 기본값 사용');}
 }
-function groupProperties(raw){
-  const g={};raw.forEach(i=>{const k=i.region+'_'+i.name+'_'+i.area_m2;if(!g[k])g[k]={name:i.name,region:i.region,area:Math.round(i.area_m2)+'㎡',area_py:i.area_py,regulated:i.regulated||false,station:i.walk_min?'도보 '+i.walk_min+'분':'역정보 없음',station_name:i.station||'',line:i.line||'',walk_min:i.walk_min,dong:i.dong||'',built_year:i.built_year||0,households:i.households||0,link:i.link||'',lat:i.lat||null,lon:i.lon||null,prices:[],floors:[],dates:[],trades:[]};g[k].prices.push(i.price);g[k].floors.push(i.floor);g[k].dates.push(i.trade_date);g[k].trades.push({price:i.price,floor:i.floor,date:i.trade_date});});
-  return Object.values(g).map(v=>{const avg=Math.round(v.prices.reduce((a,b)=>a+b,0)/v.prices.length);const tr=v.trades.sort((a,b)=>(b.date||'').localeCompare(a.date||''));return{name:v.name,region:v.region,area:v.area,area_py:v.area_py,price:avg,regulated:v.regulated,station:v.station,station_name:v.station_name,line:v.line,walk_min:v.walk_min,dong:v.dong,built_year:v.built_year,households:v.households,link:v.link,lat:v.lat,lon:v.lon,trade_count:v.prices.length,min_price:Math.min(...v.prices),max_price:Math.max(...v.prices),latest_date:v.dates.sort().reverse()[0]||'',price_per_py:v.area_py>0?Math.round(avg/v.area_py):0,trades:tr};}).sort((a,b)=>a.price-b.price);
-}
-function flagRentAnomalies(){
-  // 같은 지역 + 면적대(±5㎡) 전세 중위 보증금 대비 50% 미만 = 이상가격
-  const groups={};
-  RENT_PROPERTIES.forEach(p=>{
-    if(p.rent_type!=='전세')return;
-    const band=Math.round((parseFloat(p.area_py)||0)/5)*5;
-    const key=p.region+'_'+band;
-    if(!groups[key])groups[key]=[];
-    groups[key].push(p.deposit);
-  });
-  const medians={};
-  for(const [key,deps] of Object.entries(groups)){
-    if(deps.length<3)continue;
-    const s=[...deps].sort((a,b)=>a-b);
-    const m=Math.floor(s.length/2);
-    medians[key]=s.length%2!==0?s[m]:Math.round((s[m-1]+s[m])/2);
-  }
-  let cnt=0;
-  RENT_PROPERTIES.forEach(p=>{
-    const band=Math.round((parseFloat(p.area_py)||0)/5)*5;
-    const key=p.region+'_'+band;
-    const med=medians[key];
-    p.priceAnomaly=!!(med&&p.deposit<med*0.5);
-    if(p.priceAnomaly)cnt++;
-  });
-  if(cnt>0)console.log(`이상가격 감지: ${cnt}건 (중위 보증금 50% 미만)`);
-}
-function calcJeonseRate(){
-  if(!DATA_LOADED||PROPERTIES.length===0){RENT_PROPERTIES.forEach(p=>{p.jeonseRate=null;});return;}
-  // 매매 데이터를 name+area_py 기준으로 맵 구성 (같은 단지+면적 → 매매가)
-  const buyMap={};
-  PROPERTIES.forEach(p=>{const k=p.name+'_'+p.area_py;if(!buyMap[k])buyMap[k]=[];buyMap[k].push(p.price);});
-  let matched=0;
-  RENT_PROPERTIES.forEach(p=>{
-    if(p.rent_type!=='전세'){p.jeonseRate=null;return;}
-    // 1순위: 같은 단지명 + 같은 면적
-    const k1=p.name+'_'+p.area_py;
-    if(buyMap[k1]){const avg=Math.round(buyMap[k1].reduce((a,b)=>a+b,0)/buyMap[k1].length);p.jeonseRate=Math.round(p.deposit/avg*100);matched++;return;}
-    // 2순위: 같은 단지명 + 유사 면적 (±3평)
-    const py=parseFloat(p.area_py)||0;
-    for(const[bk,prices]of Object.entries(buyMap)){
-      if(!bk.startsWith(p.name+'_'))continue;
-      const bpy=parseFloat(bk.split('_')[1])||0;
-      if(Math.abs(bpy-py)<=3){const avg=Math.round(prices.reduce((a,b)=>a+b,0)/prices.length);p.jeonseRate=Math.round(p.deposit/avg*100);matched++;return;}
-    }
-    p.jeonseRate=null;
+// ─── 데이터 Worker 연결 ───
+// 데이터셋과 조회 결과는 data_worker.js가 보관·처리하고, 여기에는 건수와 조회 결과 중 현재 페이지의 행(RESULTS[kind].page),
+// 지도용 점 목록(RESULTS[kind].markers)만 둔다. '전체' 보기에서 아직 안 받은 행은 가상 목록이 그릴 때 구간 단위로 요청.
+// 필터 변경은 QUERY_DEBOUNCE_MS 동안 모아서 최신 상태만 보내고, 늦게 도착한 이전 요청 결과는 버린다.
+// Worker를 못 쓰면(file:// 등) 같은 처리(handleDataMessage)를 메인 스레드에서 실행.
+const QUERY_DEBOUNCE_MS=60;
+let DATA_VERSION=0,_dataPost=null,_lastNeed='',_replyId=0;
+const _query={trade:{seq:0,timer:null,cb:null},rent:{seq:0,timer:null,cb:null}};
+const RESULTS={trade:null,rent:null},_replies=new Map();
+function addRegionOptions(selId,regions){
+  const sel=document.getElementById(selId);if(!sel)return;
+  regions.forEach(r=>{if(![...sel.options].some(o=>o.value===r)){const o=document.createElement('option');o.value=r;o.textContent=r;sel.appendChild(o);}});
+}
+function dataFilters(){return{mode:currentMode,buyRegion:(document.getElementById('regionFilter')||{}).value||'',rentRegion:(document.getElementById('rentRegionFilter')||{}).value||'',district:districtFilterVal};}
+function applyDataset(m){
+  PROP_COUNT=m.counts.trade;RENT_COUNT=m.counts.rent;RENT_ANOMALY_COUNT=m.counts.rentAnomaly;DATA_LOADED=m.tradeLoaded;RENT_DATA_LOADED=m.rentLoaded;DATA_VERSION=m.version;
+  DATA_UPDATED_AT=m.updatedAt.trade;RENT_UPDATED_AT=m.updatedAt.rent;
+  addRegionOptions('regionFilter',[...new Set([...m.regions.trade,...m.regions.rent])].sort());
+  addRegionOptions('rentRegionFilter',m.regions.rent);
+}
+function loadData(){
+  return new Promise(resolve=>{
+    let first=true,worker=null;
+    const onMessage=m=>{
+      if(m.type==='data'){
+        applyDataset(m);
+        if(first){first=false;updateBookmarkCount();update();resolve();}
+        else{_preserveScroll=true;update();_preserveScroll=false;}
+      }else if(m.type==='result')onQueryResult(m);
+      else if(m.type==='reply'){const cb=_replies.get(m.id);_replies.delete(m.id);if(cb)cb(m);}
+    };
+    const local=()=>{_dataPost=m=>setTimeout(()=>handleDataMessage(m,onMessage),0);};
+    try{if(typeof Worker!=='undefined'&&location.protocol!=='file:')worker=new Worker('data_worker.js');}catch(e){worker=null;}
+    if(worker){
+      worker.onmessage=e=>onMessage(e.data);
+      // Worker 스크립트를 못 불러오면 메인 스레드로 전환
+      worker.onerror=()=>{if(!first)return;worker.terminate();local();_dataPost({type:'load',filters:dataFilters()});};
+      _dataPost=m=>worker.postMessage(m);
+    }else local();
+    _lastNeed=JSON.stringify(dataFilters());
+    _dataPost({type:'load',filters:dataFilters()});
   });
-  console.log(`전세가율 매칭: ${matched}/${RENT_PROPERTIES.filter(p=>p.rent_type==='전세').length}건`);
-}
-function groupRentProperties(raw){
-  const g={};raw.forEach(i=>{const k=i.region+'_'+i.name+'_'+i.area_m2+'_'+(i.rent_type||'전세');if(!g[k])g[k]={name:i.name,region:i.region,area:Math.round(i.area_m2)+'㎡',area_py:i.area_py,rent_type:i.rent_type||'전세',station:i.walk_min?'도보 '+i.walk_min+'분':'역정보 없음',station_name:i.station||'',line:i.line||'',walk_min:i.walk_min,dong:i.dong||'',built_year:i.built_year||0,households:i.households||0,lat:i.lat||null,lon:i.lon||null,deposits:[],monthlys:[],floors:[],dates:[],trades:[]};g[k].deposits.push(i.deposit||0);g[k].monthlys.push(i.monthly_rent||0);g[k].floors.push(i.floor);g[k].dates.push(i.trade_date);g[k].trades.push({deposit:i.deposit||0,monthly:i.monthly_rent||0,floor:i.floor,date:i.trade_date});});
-  return Object.values(g).map(v=>{const avgD=Math.round(v.deposits.reduce((a,b)=>a+b,0)/v.deposits.length);const avgM=Math.round(v.monthlys.reduce((a,b)=>a+b,0)/v.monthlys.length);const tr=v.trades.sort((a,b)=>(b.date||'').localeCompare(a.date||''));return{name:v.name,region:v.region,area:v.area,area_py:v.area_py,rent_type:v.rent_type,deposit:avgD,monthly_rent:avgM,station:v.station,station_name:v.station_name,line:v.line,walk_min:v.walk_min,dong:v.dong,built_year:v.built_year,households:v.households,lat:v.lat,lon:v.lon,trade_count:v.deposits.length,min_deposit:Math.min(...v.deposits),max_deposit:Math.max(...v.deposits),latest_date:v.dates.sort().reverse()[0]||'',trades:tr};}).sort((a,b)=>a.deposit-b.deposit);
-}
-async function loadData(){
-  let coordCache={};
-  try{const cr=await fetch('coord_cache.json');if(cr.ok)coordCache=await cr.json();}catch(e){}
-  try{const cr=await fetch('commute_time.json');if(cr.ok)COMMUTE_DATA=await cr.json();}catch(e){}
-  try{const r=await fetch('data.json');if(!r.ok)throw 0;const d=await r.json();DATA_UPDATED_AT=d.updated_at||'';PROPERTIES=groupProperties(d.properties||[]).filter(isInWatchlist);DATA_LOADED=true;
-  const regions=[...new Set(PROPERTIES.map(p=>p.region))].sort();const sel=document.getElementById('regionFilter');regions.forEach(r=>{const o=document.createElement('option');o.value=r;o.textContent=r;sel.appendChild(o);});
-  }catch(e){PROPERTIES=[];DATA_LOADED=false;}
-  try{const r=await fetch('data-rent.json');if(!r.ok)throw 0;const d=await r.json();RENT_UPDATED_AT=d.updated_at||'';RENT_PROPERTIES=groupRentProperties(d.properties||[]).filter(isInWatchlist);RENT_DATA_LOADED=RENT_PROPERTIES.length>0;
-  if(RENT_DATA_LOADED){flagRentAnomalies();calcJeonseRate();const rr=[...new Set(RENT_PROPERTIES.map(p=>p.region))].sort();const s1=document.getElementById('regionFilter'),s2=document.getElementById('rentRegionFilter');rr.forEach(r=>{if(![...s1.options].some(o=>o.value===r)){const o=document.createElement('option');o.value=r;o.textContent=r;s1.appendChild(o);}const o2=document.createElement('option');o2.value=r;o2.textContent=r;s2.appendChild(o2);});}
-  }catch(e){RENT_PROPERTIES=[];RENT_DATA_LOADED=false;}
-  // coord_cache 좌표 매핑 (캐시 키: "경기 수원시 장안구 동신2단지" 형태, 법정동 없음)
-  if(Object.keys(coordCache).length>0){
-    const ccEntries=Object.entries(coordCache);
-    // 지역명 정규화: "수원시 장안구" → "수원 장안구" (시 제거로 축약형 매칭)
-    const normR=s=>s.replace(/시(\s|$)/g,'$1').replace(/\s+/g,' ').trim();
-    [PROPERTIES,RENT_PROPERTIES].forEach(props=>{
-      props.forEach(p=>{
-        if(p.lat&&p.lon)return;
-        // 1순위: name으로 끝나고 정규화된 region 포함
-        const nr=normR(p.region);
-        for(const[k,v]of ccEntries){if(k.endsWith(p.name)&&normR(k).includes(nr)){p.lat=v.lat;p.lon=v.lon;break;}}
-        // 2순위: dong+name suffix (기존 키 호환)
-        if(!p.lat){const suffix=p.dong+' '+p.name;for(const[k,v]of ccEntries){if(k.endsWith(suffix)){p.lat=v.lat;p.lon=v.lon;break;}}}
-      });
-    });
-  }
-  // 출퇴근 소요시간 매핑
-  [PROPERTIES,RENT_PROPERTIES].forEach(props=>{
-    props.forEach(p=>{const c=matchCommute(p);p.commuteSubway=c?c.subway:null;p.commuteTransit=c?c.transit:null;});
+}
+// 모드·지역 필터가 바뀌었을 때만 필요한 shard 요청
+function requestVisibleData(){
+  if(!_dataPost)return;
+  const f=dataFilters(),key=JSON.stringify(f);
+  if(key===_lastNeed)return;
+  _lastNeed=key;_dataPost({type:'need',filters:f});
+}
+function requestQuery(kind,q,cb){
+  const st=_query[kind];
+  st.seq++;st.cb=cb;
+  if(st.timer)clearTimeout(st.timer);
+  const seq=st.seq;
+  st.timer=setTimeout(()=>{st.timer=null;if(_dataPost)_dataPost({type:'query',kind,seq,version:DATA_VERSION,q});},QUERY_DEBOUNCE_MS);
+}
+function onQueryResult(m){
+  const st=_query[m.kind];
+  // 더 새 요청이 있거나 그 사이 데이터셋이 바뀌었으면 버림 (데이터 변경 시 update()가 다시 요청)
+  if(m.seq!==st.seq||m.version!==DATA_VERSION)return;
+  const page=new Array(m.count);m.rows.forEach((p,k)=>{page[k]=p;});
+  RESULTS[m.kind]={seq:m.seq,total:m.total,start:m.start,page,markers:m.markers,loading:new Set()};
+  st.cb(m);
+}
+// 요청 id로 답을 받는 Worker 조회 (rows·match·uncoded)
+function dataRequest(msg){
+  if(!_dataPost)return Promise.resolve({});
+  return new Promise(resolve=>{const id=++_replyId;_replies.set(id,resolve);_dataPost({...msg,id});});
+}
+// 페이지 안 i번째 행이 속한 ROW_WINDOW 구간을 요청해 채우고 목록을 다시 그림
+function loadRows(kind,i){
+  const res=RESULTS[kind];if(!res)return;
+  const c=Math.floor(i/ROW_WINDOW)*ROW_WINDOW;if(res.loading.has(c))return;res.loading.add(c);
+  dataRequest({type:'rows',kind,seq:res.seq,start:res.start+c,end:res.start+Math.min(c+ROW_WINDOW,res.page.length)}).then(m=>{
+    if(RESULTS[kind]!==res||!m.rows)return;
+    m.rows.forEach((p,k)=>{res.page[c+k]=p;});
+    const vl=activeVList();if(vl)vl.refresh();
+    if(_focusedPropId)restoreFocus();
   });
-  updateBookmarkCount();
-  update();
 }
+// 조회 결과 row번째 행 (받아 둔 페이지에 있으면 바로, 없으면 Worker에 요청)
+function propAt(kind,row){
+  const res=RESULTS[kind];if(!res)return Promise.resolve(null);
+  const p=res.page[row-res.start];if(p)return Promise.resolve(p);
+  return dataRequest({type:'rows',kind,seq:res.seq,start:row,end:row+1}).then(m=>m.rows&&m.rows[0]||null);
+}
+function queryBounds(){if(!mapBoundsFilter||!mapBounds)return null;const sw=mapBounds.getSouthWest(),ne=mapBounds.getNorthEast();return[sw.getLat(),sw.getLng(),ne.getLat(),ne.getLng()];}
 function update(){
+  requestVisibleData();
   if(currentMode==='buy')updateBuy();else updateRent();
   updatePolicy();updatePolicyTimeline();updateStatus();updateMarriageBar();
   const sl=document.getElementById('splitLayout');
-  if(sl){if(currentMode==='rent'&&(!RENT_DATA_LOADED||RENT_PROPERTIES.length===0))sl.style.display='none';else sl.style.display='';}
-  if(mapInitialized)updateMapMarkers();
+  if(sl){if(currentMode==='rent'&&(!RENT_DATA_LOADED||RENT_COUNT===0))sl.style.display='none';else sl.style.display='';}
   saveSettings();
 }
 function updateStatus(){
   const s=document.getElementById('dataStatus');
-  if(currentMode==='buy'){if(DATA_LOADED){s.textContent='📊 '+PROPERTIES.length+'개 단지 · 갱신: '+DATA_UPDATED_AT;s.style.color='var(--green)';}else{s.textContent='⚠️ 배치 실행 후 데이터 표시';s.style.color='var(--yellow)';}}
-  else{if(RENT_DATA_LOADED){s.textContent='🔑 전세 '+RENT_PROPERTIES.length+'개 단지 · 갱신: '+RENT_UPDATED_AT;s.style.color='var(--green)';}else{s.textContent='🔑 전세 시뮬레이션 모드 · 실거래 데이터 대기 중';s.style.color='var(--accent2)';}}
+  if(currentMode==='buy'){if(DATA_LOADED){s.textContent='📊 '+PROP_COUNT+'개 단지 · 갱신: '+DATA_UPDATED_AT;s.style.color='var(--green)';}else{s.textContent='⚠️ 배치 실행 후 데이터 표시';s.style.color='var(--yellow)';}}
+  else{if(RENT_DATA_LOADED){s.textContent='🔑 전세 '+RENT_COUNT+'개 단지 · 갱신: '+RENT_UPDATED_AT;s.style.color='var(--green)';}else{s.textContent='🔑 전세 시뮬레이션 모드 · 실거래 데이터 대기 중';s.style.color='var(--accent2)';}}
 }
 function updateBuy(){
   const i1=getVal('income1'),i2=getVal('income2'),ti=i1+i2,cash=getVal('cash'),interior=getVal('interior'),eq=Math.max(0,cash-interior);
@@ -451,47 +513,27 @@ function updateBuy(){
   let bn='LTV';if(fL===dsrL)bn='DSR';if(fL===mlL)bn='월상환';document.getElementById('loanBadge').textContent='병목: '+bn;
   updatePropTable(eq,fL,eLTV,rate,term,mr);
 }
-function isLikelyNaholo(item){if(item.households>0)return false;if(/\(\d+(-\d+)?\)/.test(item.name)&&!item.name.includes('단지'))return true;if(item.name.length<=3&&!item.name.includes('단지')&&!item.name.includes('주공'))return true;return false;}
-function commuteMatch(p,cv){if(!cv)return true;if(cv==='transit60')return p.commuteTransit!=null&&p.commuteTransit<=60;if(cv==='subway60')return p.commuteSubway!=null&&p.commuteSubway<=60;if(cv==='transit45')return p.commuteTransit!=null&&p.commuteTransit<=45;return true;}
 function updatePropTable(eq,fL,eLTV,rate,term,mr){
-  const scrollEl=document.getElementById('splitList'),savedScroll=_preserveScroll&&scrollEl?scrollEl.scrollTop:0;
-  const sq=document.getElementById('searchInput').value.toLowerCase(),rv=document.getElementById('regionFilter').value,av=(document.getElementById('areaFilter')||{}).value||'',vv=(document.getElementById('buyVerdictSelect')||{}).value||'',cv=(document.getElementById('buyCommuteFilter')||{}).value||'',byv=(document.getElementById('buyBuiltYearFilter')||{}).value||'',sv=(document.getElementById('buySortSelect')||{}).value||'value',hhv=parseInt((document.getElementById('buyHouseholdFilter')||{}).value||'0')||0;
-  let f=PROPERTIES.filter(p=>{if(sq&&!(p.name+' '+p.region+' '+p.dong).toLowerCase().includes(sq))return false;if(rv&&p.region!==rv)return false;if(!areaMatch(p.area_py,av))return false;if(!builtYearMatch(p.built_year,byv))return false;if(!commuteMatch(p,cv))return false;if(hhv>0&&(p.households===0||p.households<hhv))return false;if(document.getElementById('buyExcludeNaholo')?.checked!==false&&isLikelyNaholo(p))return false;return true;});
-  const autoLtv=document.getElementById('autoLtvCheckbox')?.checked!==false;
-  const wv=f.map(p=>{const reg=getRegulation(p.region);const pL=autoLtv?reg.ltv:(p.regulated?Math.min(eLTV,50):eLTV);const pLn=Math.min(Math.floor(p.price*pL/100),fL),pEq=p.price-pLn,pM=Math.floor(monthlyPayment(pLn,rate,term));let v,vt;if(pEq>eq){v='자금부족';vt='tag-danger';}else if(pM>mr){v='상환초과';vt='tag-danger';}else if(pM>mr*0.85){v='빠듯함';vt='tag-warn';}else{v='매수가능';vt='tag-ok';}return{...p,pLTV:pL,pLoan:pLn,pEquityNeeded:pEq,pMonthly:pM,verdict:v,verdictTag:vt,regZone:reg.zone};});
-  let filtered=vv?wv.filter(p=>p.verdict===vv):wv;
-  if(districtFilterVal){if(DISTRICT_GROUPS[districtFilterVal]){filtered=filtered.filter(p=>DISTRICT_GROUPS[districtFilterVal].includes(p.region));}else{filtered=filtered.filter(p=>p.region===districtFilterVal);}}
-  if(mapBoundsFilter&&mapBounds)filtered=filtered.filter(p=>inBounds(p));
-  const bmOnly=document.getElementById('buyBmOnly')?.checked;if(bmOnly)filtered=filtered.filter(p=>isBookmarked(getPropId(p)));
-  const vo={'매수가능':0,'빠듯함':1,'상환초과':2,'자금부족':2};
-  if(sv==='value')filtered.sort((a,b)=>(vo[a.verdict]??9)-(vo[b.verdict]??9)||(parseFloat(b.area_py)||0)-(parseFloat(a.area_py)||0));
-  else if(sv==='price-asc')filtered.sort((a,b)=>a.price-b.price);else if(sv==='price-desc')filtered.sort((a,b)=>b.price-a.price);
-  else if(sv==='area-desc')filtered.sort((a,b)=>(parseFloat(b.area_py)||0)-(parseFloat(a.area_py)||0));
-  else if(sv==='walk')filtered.sort((a,b)=>(a.walk_min||999)-(b.walk_min||999));
-  else if(sv==='commute')filtered.sort((a,b)=>(a.commuteTransit||999)-(b.commuteTransit||999));
-  else if(sv==='latest')filtered.sort((a,b)=>(b.latest_date||'').localeCompare(a.latest_date||''));
-  filteredBuyProps=filtered;
+  const scrollEl=document.getElementById('splitList'),preserve=_preserveScroll,savedScroll=preserve&&scrollEl?scrollEl.scrollTop:0;
+  const q={sq:document.getElementById('searchInput').value,rv:document.getElementById('regionFilter').value,av:(document.getElementById('areaFilter')||{}).value||'',vv:(document.getElementById('buyVerdictSelect')||{}).value||'',cv:(document.getElementById('buyCommuteFilter')||{}).value||'',byv:(document.getElementById('buyBuiltYearFilter')||{}).value||'',sv:(document.getElementById('buySortSelect')||{}).value||'value',hhv:parseInt((document.getElementById('buyHouseholdFilter')||{}).value||'0')||0,
+    excludeNaholo:document.getElementById('buyExcludeNaholo')?.checked!==false,autoLtv:document.getElementById('autoLtvCheckbox')?.checked!==false,eLTV,fL,eq,rate,term,mr,district:districtFilterVal,bounds:queryBounds(),bmOnly:!!document.getElementById('buyBmOnly')?.checked,bookmarks:[...BOOKMARKS],page:currentPage,size:pageSize};
+  requestQuery('trade',q,m=>renderPropTable(m,eq,mr,scrollEl,preserve,savedScroll));
+}
+function renderPropTable(m,eq,mr,scrollEl,preserve,savedScroll){
   highlightSelects();
-  const ti=filtered.length,tp=Math.max(1,Math.ceil(ti/pageSize));if(currentPage>tp)currentPage=tp;const si=(currentPage-1)*pageSize,pi=filtered.slice(si,si+pageSize);
+  currentPage=m.page;
+  const ti=m.total,ps=pageLen(ti),tp=Math.max(1,Math.ceil(ti/ps)),si=m.start,pi=RESULTS.trade.page;
   const cardEl=document.getElementById('propertyCards'),tableEl=document.getElementById('buyTableWrap');
   if(currentView==='card'){cardEl.style.display='';tableEl.style.display='none';renderBuyCards(pi,eq,mr);}
   else{cardEl.style.display='none';tableEl.style.display='';
-  const tb=document.getElementById('propertyBody');tb.innerHTML='';
-  pi.forEach(p=>{const ex=[];if(p.built_year)ex.push(p.built_year+'년');if(p.households>0)ex.push(p.households+'세대');else if(p.households===0&&isLikelyNaholo(p))ex.push('<span class="tag tag-danger" style="font-size:10px;padding:1px 4px">⚠️ 소단지 추정</span>');else if(p.households===0)ex.push('<span style="color:var(--text-dim)">세대수 미확인</span>');if(p.trade_count>1)ex.push(p.trade_count+'건');
-    const tBtn=p.trade_count>1?'<button class="expand-btn" onclick="toggleHistory(this)">▶ 거래내역 '+p.trade_count+'건</button>':'';
-    let hH='';if(p.trade_count>1){const rows=p.trades.map((t,i)=>{let d='';if(i<p.trades.length-1){const df=t.price-p.trades[i+1].price;d=df>0?'<span class="trade-delta up">+'+fmtShort(df)+'</span>':df<0?'<span class="trade-delta down">'+fmtShort(df)+'</span>':'<span class="trade-delta same">±0</span>';}return '<div class="trade-row"><span class="trade-date">'+(t.date||'날짜없음')+'</span><span class="trade-price">'+fmtShort(t.price)+'</span><span class="trade-floor">'+t.floor+'층</span>'+d+'</div>';}).join('');const pd=p.max_price-p.min_price;hH='<div class="trade-history"><div class="trade-history-title"><span>📊 거래 히스토리</span><span style="font-size:10px;color:var(--text-dim)">'+(pd>0?'변동폭: '+fmtShort(pd):'동일가')+'</span></div>'+rows+'</div>';}
-    const stTxt=p.station_name?(p.station_name+(p.walk_min?' '+p.walk_min+'분':'')):'—';
-    const tr=document.createElement('tr');tr.dataset.propId=getPropId(p);tr.addEventListener('mouseenter',()=>bounceMarker(getMarkerKey(p)));tr.addEventListener('mouseleave',()=>stopBounce());
-    const tRegBadge=p.regZone==='투기과열'?'<span class="tag tag-reg tag-reg-hot">투기과열 '+p.pLTV+'%</span>':'<span class="tag tag-reg tag-reg-free">비규제 '+p.pLTV+'%</span>';
-    tr.innerHTML='<td data-label="판정"><span class="tag '+p.verdictTag+'">'+p.verdict+'</span></td><td data-label="단지명"><strong>'+p.name+'</strong><br><span style="font-size:10px;color:var(--text-dim)">'+(p.line?p.line+' ':'')+p.station+(ex.length?' · '+ex.join(' · '):'')+'</span><br>'+tBtn+hH+'</td><td data-label="지역"><span class="tag tag-region">'+p.region+'</span> '+tRegBadge+'</td><td data-label="면적">'+fmtArea(p)+'</td><td data-label="매매가" class="mono">'+fmtShort(p.price)+'</td><td data-label="월상환" class="mono" style="color:'+(p.pMonthly>mr?'var(--red)':p.pMonthly>mr*0.85?'var(--yellow)':'var(--green)')+'">'+p.pMonthly+'만</td><td data-label="역세권">'+stTxt+'</td><td data-label="연식">'+(p.built_year||'—')+'</td><td data-label="세대">'+(p.households||'—')+'</td><td data-label="링크"><div class="link-icons">'+makeLinks(p)+'</div></td>';
-    tb.appendChild(tr);
-  });}
-  document.getElementById('propertyBadge').textContent=DATA_LOADED?(mapBoundsFilter&&mapBounds?'지도 영역 내 '+ti+'건':ti+'/'+PROPERTIES.length+'개 표시'):'데이터 없음';
-  document.getElementById('pageInfo').textContent=ti>0?(si+1)+'-'+Math.min(si+pageSize,ti)+' / '+ti+'건':'0건';
+  vlist('buyRows').setItems(pi,{eq,mr});}
+  document.getElementById('propertyBadge').textContent=DATA_LOADED?(mapBoundsFilter&&mapBounds?'지도 영역 내 '+ti+'건':ti+'/'+PROP_COUNT+'개 표시'):'데이터 없음';
+  document.getElementById('pageInfo').textContent=ti>0?(si+1)+'-'+(si+m.count)+' / '+ti+'건':'0건';
   const pb=document.getElementById('pageBtns');pb.innerHTML='';
   if(tp>1){const pv=document.createElement('button');pv.className='page-btn';pv.textContent='◀';pv.disabled=currentPage<=1;pv.onclick=()=>{currentPage--;update();};pb.appendChild(pv);for(let i=1;i<=tp;i++){if(tp>7&&i>2&&i<tp-1&&Math.abs(i-currentPage)>1){if(i===3||i===tp-2){const d=document.createElement('span');d.className='page-info';d.textContent='…';pb.appendChild(d);}continue;}const b=document.createElement('button');b.className='page-btn'+(i===currentPage?' active':'');b.textContent=i;b.onclick=()=>{currentPage=i;update();};pb.appendChild(b);}const nx=document.createElement('button');nx.className='page-btn';nx.textContent='▶';nx.disabled=currentPage>=tp;nx.onclick=()=>{currentPage++;update();};pb.appendChild(nx);}
-  if(_preserveScroll&&scrollEl)scrollEl.scrollTop=savedScroll;
+  if(preserve&&scrollEl)scrollEl.scrollTop=savedScroll;
   if(_focusedPropId)setTimeout(restoreFocus,50);
+  if(mapInitialized)updateMapMarkers();
 }
 function updateRent(){
   const i1=getVal('income1'),i2=getVal('income2'),ti=i1+i2,cash=getVal('cash'),eq=cash;
@@ -511,55 +553,34 @@ function updateRent(){
   updateRentTable(eq,rb);
 }
 function updateRentTable(equity,budget){
-  const scrollEl=document.getElementById('splitList'),savedScroll=_preserveScroll&&scrollEl?scrollEl.scrollTop:0;
+  const scrollEl=document.getElementById('splitList'),preserve=_preserveScroll,savedScroll=preserve&&scrollEl?scrollEl.scrollTop:0;
   const placeholder=document.getElementById('rentPlaceholder');
   const tableWrap=document.getElementById('rentTableWrap');
-  if(!RENT_DATA_LOADED||RENT_PROPERTIES.length===0){if(placeholder)placeholder.style.display='';if(tableWrap)tableWrap.style.display='none';return;}
+  if(!RENT_DATA_LOADED||RENT_COUNT===0){if(placeholder)placeholder.style.display='';if(tableWrap)tableWrap.style.display='none';if(mapInitialized)updateMapMarkers();return;}
   if(placeholder)placeholder.style.display='none';if(tableWrap)tableWrap.style.display='';
   const tabBtnProp=document.getElementById('tabBtnProperties');tabBtnProp.style.display='';tabBtnProp.textContent='📊 전세 실거래';
-  const sq=(document.getElementById('rentSearchInput')||{}).value||'';const rf=(document.getElementById('rentRegionFilter')||{}).value||'';
-  const rav=(document.getElementById('rentAreaFilter')||{}).value||'',rvv=(document.getElementById('rentVerdictSelect')||{}).value||'',rtv=(document.getElementById('rentTypeSelect')||{}).value||'',rbyv=(document.getElementById('rentBuiltYearFilter')||{}).value||'',rcv=(document.getElementById('rentCommuteFilter')||{}).value||'',rsv=(document.getElementById('rentSortSelect')||{}).value||'value',rhhv=parseInt((document.getElementById('rentHouseholdFilter')||{}).value||'0')||0;
-  const showAnomaly=document.getElementById('rentShowAnomaly')?.checked||false;
-  let anomalyHidden=0;
-  let f=RENT_PROPERTIES.filter(p=>{if(!showAnomaly&&p.priceAnomaly){anomalyHidden++;return false;}if(sq&&!(p.name+' '+p.region+' '+p.dong).toLowerCase().includes(sq.toLowerCase()))return false;if(rf&&p.region!==rf)return false;if(rtv&&p.rent_type!==rtv)return false;if(!areaMatch(p.area_py,rav))return false;if(!builtYearMatch(p.built_year,rbyv))return false;if(!commuteMatch(p,rcv))return false;if(rhhv>0&&(p.households===0||p.households<rhhv))return false;if(document.getElementById('rentExcludeNaholo')?.checked!==false&&isLikelyNaholo(p))return false;return true;});
-  const wv=f.map(p=>{let v,vt;if(p.deposit>budget){v='예산초과';vt='tag-danger';}else if(p.deposit>budget*0.9){v='빠듯함';vt='tag-warn';}else{v='가능';vt='tag-ok';}return{...p,verdict:v,verdictTag:vt};});
-  let filtered=rvv?wv.filter(p=>p.verdict===rvv):wv;
-  if(mapBoundsFilter&&mapBounds)filtered=filtered.filter(p=>inBounds(p));
-  const bmOnly=document.getElementById('rentBmOnly')?.checked;if(bmOnly)filtered=filtered.filter(p=>isBookmarked(getPropId(p)));
-  const rvo={'가능':0,'빠듯함':1,'예산초과':2};
-  if(rsv==='value')filtered.sort((a,b)=>(rvo[a.verdict]??9)-(rvo[b.verdict]??9)||(parseFloat(b.area_py)||0)-(parseFloat(a.area_py)||0));
-  else if(rsv==='price-asc')filtered.sort((a,b)=>a.deposit-b.deposit);else if(rsv==='price-desc')filtered.sort((a,b)=>b.deposit-a.deposit);
-  else if(rsv==='area-desc')filtered.sort((a,b)=>(parseFloat(b.area_py)||0)-(parseFloat(a.area_py)||0));
-  else if(rsv==='walk')filtered.sort((a,b)=>(a.walk_min||999)-(b.walk_min||999));
-  else if(rsv==='commute')filtered.sort((a,b)=>(a.commuteTransit||999)-(b.commuteTransit||999));
-  else if(rsv==='latest')filtered.sort((a,b)=>(b.latest_date||'').localeCompare(a.latest_date||''));
-  filteredRentProps=filtered;
+  const q={sq:(document.getElementById('rentSearchInput')||{}).value||'',rf:(document.getElementById('rentRegionFilter')||{}).value||'',
+    rav:(document.getElementById('rentAreaFilter')||{}).value||'',rvv:(document.getElementById('rentVerdictSelect')||{}).value||'',rtv:(document.getElementById('rentTypeSelect')||{}).value||'',rbyv:(document.getElementById('rentBuiltYearFilter')||{}).value||'',rcv:(document.getElementById('rentCommuteFilter')||{}).value||'',rsv:(document.getElementById('rentSortSelect')||{}).value||'value',rhhv:parseInt((document.getElementById('rentHouseholdFilter')||{}).value||'0')||0,
+    showAnomaly:document.getElementById('rentShowAnomaly')?.checked||false,excludeNaholo:document.getElementById('rentExcludeNaholo')?.checked!==false,budget,bounds:queryBounds(),bmOnly:!!document.getElementById('rentBmOnly')?.checked,bookmarks:[...BOOKMARKS],page:rentPage,size:pageSize};
+  requestQuery('rent',q,m=>renderRentTable(m,equity,budget,scrollEl,preserve,savedScroll));
+}
+function renderRentTable(m,equity,budget,scrollEl,preserve,savedScroll){
   highlightSelects();
-  const ti=filtered.length,tp=Math.max(1,Math.ceil(ti/pageSize));if(rentPage>tp)rentPage=tp;const si=(rentPage-1)*pageSize,pi=filtered.slice(si,si+pageSize);
+  rentPage=m.page;
+  const ti=m.total,ps=pageLen(ti),tp=Math.max(1,Math.ceil(ti/ps)),si=m.start,pi=RESULTS.rent.page,anomalyHidden=m.anomalyHidden;
   const cardEl=document.getElementById('rentPropertyCards'),tableEl=document.getElementById('rentTableWrapInner');
   if(currentView==='card'){cardEl.style.display='';tableEl.style.display='none';renderRentCards(pi,equity,budget);}
   else{cardEl.style.display='none';tableEl.style.display='';
-  const tb=document.getElementById('rentPropertyBody');if(!tb)return;tb.innerHTML='';
-  pi.forEach(p=>{const ex=[];if(p.built_year)ex.push(p.built_year+'년');if(p.households>0)ex.push(p.households+'세대');else if(p.households===0&&isLikelyNaholo(p))ex.push('<span class="tag tag-danger" style="font-size:10px;padding:1px 4px">⚠️ 소단지 추정</span>');else if(p.households===0)ex.push('<span style="color:var(--text-dim)">세대수 미확인</span>');if(p.trade_count>1)ex.push(p.trade_count+'건');
-    const typeTag=p.rent_type==='월세'?'<span class="tag tag-warn" style="font-size:10px">월세</span>':'<span class="tag tag-ok" style="font-size:10px">전세</span>';
-    const tBtn=p.trade_count>1?'<button class="expand-btn" onclick="toggleHistory(this)">▶ 거래내역 '+p.trade_count+'건</button>':'';
-    let hH='';if(p.trade_count>1){const rows=p.trades.map((t,i)=>{let d='';if(i<p.trades.length-1){const df=t.deposit-p.trades[i+1].deposit;d=df>0?'<span class="trade-delta up">+'+fmtShort(df)+'</span>':df<0?'<span class="trade-delta down">'+fmtShort(df)+'</span>':'<span class="trade-delta same">±0</span>';}return '<div class="trade-row"><span class="trade-date">'+(t.date||'날짜없음')+'</span><span class="trade-price">'+fmtShort(t.deposit)+'</span><span class="trade-floor">'+t.floor+'층</span>'+d+'</div>';}).join('');const pd=p.max_deposit-p.min_deposit;hH='<div class="trade-history"><div class="trade-history-title"><span>📊 거래 히스토리</span><span style="font-size:10px;color:var(--text-dim)">'+(pd>0?'변동폭: '+fmtShort(pd):'동일가')+'</span></div>'+rows+'</div>';}
-    const stTxt=p.station_name?(p.station_name+(p.walk_min?' '+p.walk_min+'분':'')):'—';
-    const tr=document.createElement('tr');tr.dataset.propId=getPropId(p);tr.addEventListener('mouseenter',()=>bounceMarker(getMarkerKey(p)));tr.addEventListener('mouseleave',()=>stopBounce());
-    const anomTag=p.priceAnomaly?' <span class="tag tag-anomaly" style="font-size:9px">⚠️ 이상</span>':'';
-    const jrTag=jeonseRateBadge(p);
-    tr.innerHTML='<td data-label="판정"><span class="tag '+p.verdictTag+'">'+p.verdict+'</span>'+anomTag+'</td><td data-label="단지명"><strong>'+p.name+'</strong>'+jrTag+'<br><span style="font-size:10px;color:var(--text-dim)">'+(p.line?p.line+' ':'')+p.station+(ex.length?' · '+ex.join(' · '):'')+'</span><br>'+tBtn+hH+'</td><td data-label="지역"><span class="tag tag-region">'+p.region+'</span></td><td data-label="면적">'+fmtArea(p)+'</td><td data-label="유형">'+typeTag+'</td><td data-label="보증금" class="mono">'+fmtShort(p.deposit)+'</td><td data-label="월세" class="mono">'+(p.monthly_rent>0?p.monthly_rent+'만':'—')+'</td><td data-label="역세권">'+stTxt+'</td><td data-label="연식">'+(p.built_year||'—')+'</td><td data-label="세대">'+(p.households||'—')+'</td><td data-label="링크"><div class="link-icons">'+makeLinks(p)+'</div></td>';
-    tb.appendChild(tr);
-  });}
-  const totalAnomaly=RENT_PROPERTIES.filter(p=>p.priceAnomaly).length;
-  const atl=document.getElementById('anomalyToggleLabel');if(atl)atl.style.display=totalAnomaly>0?'':'none';
+  const vl=vlist('rentRows');if(vl)vl.setItems(pi,{equity,budget});}
+  const atl=document.getElementById('anomalyToggleLabel');if(atl)atl.style.display=RENT_ANOMALY_COUNT>0?'':'none';
   const anomalyLabel=anomalyHidden>0?' (이상가격 '+anomalyHidden+'건 숨김)':'';
-  document.getElementById('rentPropertyBadge').textContent=(mapBoundsFilter&&mapBounds?'지도 영역 내 '+ti+'건':ti+'/'+RENT_PROPERTIES.length+'개 표시')+anomalyLabel;
-  document.getElementById('rentPageInfo').textContent=ti>0?(si+1)+'-'+Math.min(si+pageSize,ti)+' / '+ti+'건':'0건';
+  document.getElementById('rentPropertyBadge').textContent=(mapBoundsFilter&&mapBounds?'지도 영역 내 '+ti+'건':ti+'/'+RENT_COUNT+'개 표시')+anomalyLabel;
+  document.getElementById('rentPageInfo').textContent=ti>0?(si+1)+'-'+(si+m.count)+' / '+ti+'건':'0건';
   const pb=document.getElementById('rentPageBtns');pb.innerHTML='';
   if(tp>1){const pv=document.createElement('button');pv.className='page-btn';pv.textContent='◀';pv.disabled=rentPage<=1;pv.onclick=()=>{rentPage--;update();};pb.appendChild(pv);for(let i=1;i<=tp;i++){if(tp>7&&i>2&&i<tp-1&&Math.abs(i-rentPage)>1){if(i===3||i===tp-2){const d=document.createElement('span');d.className='page-info';d.textContent='…';pb.appendChild(d);}continue;}const b=document.createElement('button');b.className='page-btn'+(i===rentPage?' active':'');b.textContent=i;b.onclick=()=>{rentPage=i;update();};pb.appendChild(b);}const nx=document.createElement('button');nx.className='page-btn';nx.textContent='▶';nx.disabled=rentPage>=tp;nx.onclick=()=>{rentPage++;update();};pb.appendChild(nx);}
-  if(_preserveScroll&&scrollEl)scrollEl.scrollTop=savedScroll;
+  if(preserve&&scrollEl)scrollEl.scrollTop=savedScroll;
   if(_focusedPropId)setTimeout(restoreFocus,50);
+  if(mapInitialized)updateMapMarkers();
 }
 function updatePolicyTimeline(){
   const tl=document.getElementById('policyTimeline');
@@ -625,8 +646,8 @@ const rsi=document.getElementById('rentSearchInput');if(rsi)rsi.addEventListener
 const rrf=document.getElementById('rentRegionFilter');if(rrf)rrf.addEventListener('change',()=>{_focusedPropId=null;rentPage=1;update();});
 
 // ─── 카카오맵 ───
-let kakaoMap=null,mapMarkers=[],mapInfoWindow=null,mapFilterVal='',mapInitialized=false,geocodingDone=false,mapBoundsFilter=true,mapBounds=null,mapFullscreen=false,mapIdleTimer=null,_preserveScroll=false,_focusedPropId=null,_autoScrolling=false;
-(function(){const sl=document.getElementById('splitList');if(sl)sl.addEventListener('scroll',()=>{if(!_autoScrolling)_focusedPropId=null;},{passive:true});})();
+let kakaoMap=null,mapInfoWindow=null,mapFilterVal='',mapInitialized=false,geocodingDone=false,mapBoundsFilter=true,mapBounds=null,mapFullscreen=false,mapIdleTimer=null,_preserveScroll=false,_focusedPropId=null,_focusedRow=0,_autoScrolling=false;
+(function(){const sl=document.getElementById('splitList');if(sl)sl.addEventListener('scroll',()=>{if(!_autoScrolling)_focusedPropId=null;redrawVLists();},{passive:true});window.addEventListener('scroll',redrawVLists,{passive:true});window.addEventListener('resize',redrawVLists);})();
 function toggleMapFullscreen(){
   mapFullscreen=!mapFullscreen;
   const layout=document.getElementById('splitLayout'),btn=document.getElementById('mapFullscreenBtn'),mapEl=document.querySelector('.split-map');
@@ -683,18 +704,13 @@ const MAP_STATIONS=[
 function setMapFilter(btn){document.querySelectorAll('#mapVerdictChips .filter-chip').forEach(b=>b.classList.remove('active'));btn.classList.add('active');mapFilterVal=btn.dataset.val;updateMapMarkers();}
 function toggleMapBounds(on){_focusedPropId=null;mapBoundsFilter=on;if(on&&kakaoMap){mapBounds=kakaoMap.getBounds();}else{mapBounds=null;}currentPage=1;rentPage=1;update();}
 function onMapIdle(){if(!mapBoundsFilter||!kakaoMap)return;if(mapIdleTimer)clearTimeout(mapIdleTimer);mapIdleTimer=setTimeout(()=>{mapBounds=kakaoMap.getBounds();_preserveScroll=true;update();_preserveScroll=false;},500);}
-function inBounds(p){if(!mapBounds||!p.lat||!p.lon)return true;const sw=mapBounds.getSouthWest(),ne=mapBounds.getNorthEast();return p.lat>=sw.getLat()&&p.lat<=ne.getLat()&&p.lon>=sw.getLng()&&p.lon<=ne.getLng();}
 function geocodeUnmatchedProps(){
   if(geocodingDone)return;
   geocodingDone=true;
-  const allProps=[...PROPERTIES,...RENT_PROPERTIES];
-  // 중복 제거: dong+name 기준
-  const seen={};const toGeocode=[];
-  allProps.forEach(p=>{
-    if(p.lat&&p.lon)return;
-    const k=p.region+'_'+p.dong+'_'+p.name;if(seen[k])return;seen[k]=p;
-    toGeocode.push(p);
-  });
+  // 좌표 없는 단지 목록(지역·동·단지명 중복 제거)은 Worker에서 받고, 찾은 좌표는 Worker 데이터셋에 반영
+  dataRequest({type:'uncoded'}).then(m=>geocodePlaces(m.items||[]));
+}
+function geocodePlaces(toGeocode){
   if(toGeocode.length===0)return;
   const ps=new kakao.maps.services.Places();
   let idx=0,found=0;
@@ -709,8 +725,7 @@ function geocodeUnmatchedProps(){
     ps.keywordSearch(query,function(data,status){
       if(status===kakao.maps.services.Status.OK&&data.length>0){
         const lat=parseFloat(data[0].y),lon=parseFloat(data[0].x);
-        // 같은 dong+name을 공유하는 모든 속성에 좌표 적용
-        allProps.forEach(ap=>{if(ap.region===p.region&&ap.dong===p.dong&&ap.name===p.name&&!ap.lat){ap.lat=lat;ap.lon=lon;}});
+        if(_dataPost)_dataPost({type:'coords',items:[{region:p.region,dong:p.dong,name:p.name,lat,lon}]});
         found++;
       }
       if(idx%30===0&&found>0){_preserveScroll=true;update();_preserveScroll=false;found=0;}
@@ -726,6 +741,7 @@ function initMapIfNeeded(){
     const container=document.getElementById('mapContainer');
     kakaoMap=new kakao.maps.Map(container,{center:new kakao.maps.LatLng(37.6504,127.0770),level:4});
     kakao.maps.event.addListener(kakaoMap,'idle',onMapIdle);
+    kakao.maps.event.addListener(kakaoMap,'idle',refreshMarkerLayer);
     kakao.maps.event.addListener(kakaoMap,'click',()=>{hideFullscreenPopup();});
     mapInfoWindow=new kakao.maps.InfoWindow({zIndex:1});
     // 역 마커
@@ -740,33 +756,94 @@ function initMapIfNeeded(){
   });
 }
 function getMarkerSVG(color,bm){return 'data:image/svg+xml;charset=utf-8,'+encodeURIComponent('<svg xmlns="http://www.w3.org/2000/svg" width="24" height="32"><path d="M12 0C5.4 0 0 5.4 0 12c0 9 12 20 12 20s12-11 12-20C24 5.4 18.6 0 12 0z" fill="'+color+'"'+(bm?' stroke="#FFD700" stroke-width="2"':'')+'/>'+(bm?'<text x="12" y="15" text-anchor="middle" fill="#FFD700" font-size="14" font-weight="bold">★</text>':'<circle cx="12" cy="11" r="5" fill="white" opacity="0.9"/>')+'</svg>');}
+// ─── 지도 마커 레이어 (클러스터링) ───
+// 필터 결과 전체를 점 목록으로만 들고, 화면(+MARKER_MARGIN)에 걸친 마커·클러스터만 지도 객체로 만든다.
+// 클러스터는 레벨별 고정 격자(MARKER_CLUSTER_PX 픽셀 칸)로 묶어 레벨마다 한 번만 계산해 두고,
+// 이동 시에는 새로 들어온 칸만 만들고 벗어난 칸만 지운다. CLUSTER_MIN_LEVEL 미만(확대)에서는 개별 마커.
+const MARKER_CLUSTER_PX=64,CLUSTER_MIN_LEVEL=6,MARKER_MARGIN=0.25;
+let _mapPoints=[],_mapGrids={},_degPerPxAt={};
+const _mapLayer=new Map(),_clusterOfMarker=new Map();
+// 점 목록은 Worker 조회 결과의 markers ({key, id, row, lat, lon, verdict, region} — 마커 키별 첫 행)
 function updateMapMarkers(){
   if(!kakaoMap)return;
-  mapMarkers.forEach(m=>m.setMap(null));mapMarkers=[];markerMap={};
-  const props=currentMode==='buy'?filteredBuyProps:filteredRentProps;
-  if(!props||props.length===0){document.getElementById('mapBadge').textContent='매물 데이터 없음';return;}
-  const seen={};let cnt=0;
-  props.forEach(p=>{
-    if(!p.lat||!p.lon)return;
-    const mKey=getMarkerKey(p);if(seen[mKey])return;seen[mKey]=true;
-    const verdict=currentMode==='buy'?(p.verdict==='매수가능'?'ok':p.verdict==='빠듯함'?'warn':'danger'):(p.verdict==='가능'?'ok':p.verdict==='빠듯함'?'warn':'danger');
-    if(mapFilterVal&&verdict!==mapFilterVal)return;
-    const color=getDistrictColor(p.region);const bm=isBookmarked(getPropId(p));
-    const img=new kakao.maps.MarkerImage(getMarkerSVG(color,bm),new kakao.maps.Size(24,32));
-    const marker=new kakao.maps.Marker({map:kakaoMap,position:new kakao.maps.LatLng(p.lat,p.lon),image:img});
+  const res=RESULTS[currentMode==='buy'?'trade':'rent'];
+  _mapPoints=res?res.markers.filter(pt=>!mapFilterVal||pt.verdict===mapFilterVal):[];
+  _mapGrids={};
+  refreshMarkerLayer();
+  document.getElementById('mapBadge').textContent=res&&res.total?_mapPoints.length+'개 매물 표시':'매물 데이터 없음';
+}
+// 레벨별 격자: 칸 키 → {lat,lon(평균), n, pts, best}
+function markerGrid(level){
+  if(_mapGrids[level])return _mapGrids[level];
+  if(!_degPerPxAt[level]){
+    // 지도가 숨겨져 폭이 0이면 계산을 미룸 (다시 보일 때 relayout → idle에서 재계산)
+    const b=kakaoMap.getBounds(),w=document.getElementById('mapContainer').clientWidth;if(!w)return new Map();
+    _degPerPxAt[level]=(b.getNorthEast().getLng()-b.getSouthWest().getLng())/w;
+  }
+  const cellLon=_degPerPxAt[level]*MARKER_CLUSTER_PX,cellLat=cellLon*Math.cos(37.5*Math.PI/180);
+  const cells=new Map(),rank={ok:0,warn:1,danger:2};
+  _mapPoints.forEach(pt=>{
+    const k=level<CLUSTER_MIN_LEVEL?'m:'+pt.key:'c:'+level+':'+Math.floor(pt.lon/cellLon)+','+Math.floor(pt.lat/cellLat);
+    let c=cells.get(k);if(!c){c={lat:0,lon:0,n:0,pts:[],best:'danger'};cells.set(k,c);}
+    c.lat+=pt.lat;c.lon+=pt.lon;c.n++;c.pts.push(pt);if(rank[pt.verdict]<rank[c.best])c.best=pt.verdict;
+  });
+  cells.forEach(c=>{c.lat/=c.n;c.lon/=c.n;});
+  return _mapGrids[level]=cells;
+}
+function refreshMarkerLayer(){
+  if(!kakaoMap)return;
+  const level=kakaoMap.getLevel(),cells=markerGrid(level),b=kakaoMap.getBounds(),sw=b.getSouthWest(),ne=b.getNorthEast();
+  const mLat=(ne.getLat()-sw.getLat())*MARKER_MARGIN,mLon=(ne.getLng()-sw.getLng())*MARKER_MARGIN;
+  const s=sw.getLat()-mLat,n=ne.getLat()+mLat,w=sw.getLng()-mLon,e=ne.getLng()+mLon;
+  const want=new Map();_clusterOfMarker.clear();
+  cells.forEach((c,k)=>{
+    if(c.lat<s||c.lat>n||c.lon<w||c.lon>e)return;
+    if(c.n===1){const pt=c.pts[0];want.set('m:'+pt.key,{pt});}
+    else{want.set(k,{c});c.pts.forEach(pt=>_clusterOfMarker.set(pt.key,k));}
+  });
+  _mapLayer.forEach((ent,id)=>{if(!want.has(id)){if(_bounceEl&&ent.el===_bounceEl)_bounceEl=null;ent.obj.setMap(null);_mapLayer.delete(id);if(ent.mKey)delete markerMap[ent.mKey];}});
+  want.forEach((w,id)=>{
+    const ent=_mapLayer.get(id);
+    if(w.pt){
+      const pt=w.pt,color=getDistrictColor(pt.region),bm=isBookmarked(pt.id),sig=color+'|'+bm;
+      if(ent&&ent.sig===sig){ent.pt=pt;return;}
+      if(ent)ent.obj.setMap(null);
+      _mapLayer.set(id,createPropMarker(pt,sig));
+    }else{
+      const c=w.c,sig=c.n+'|'+c.best;
+      if(ent&&ent.sig===sig)return;
+      if(ent)ent.obj.setMap(null);
+      _mapLayer.set(id,createClusterOverlay(c,sig,level));
+    }
+  });
+}
+function createPropMarker(pt,sig){
+  const color=getDistrictColor(pt.region),bm=isBookmarked(pt.id),mKey=pt.key;
+  const img=new kakao.maps.MarkerImage(getMarkerSVG(color,bm),new kakao.maps.Size(24,32));
+  const marker=new kakao.maps.Marker({map:kakaoMap,position:new kakao.maps.LatLng(pt.lat,pt.lon),image:img});
+  const ent={obj:marker,sig,pt,mKey};
+  // 팝업에 쓸 행 객체는 클릭할 때 받아 옴 (현재 페이지 밖이면 Worker에 요청)
+  kakao.maps.event.addListener(marker,'click',()=>propAt(currentMode==='buy'?'trade':'rent',ent.pt.row).then(p=>{
+    if(!p)return;
+    if(mapFullscreen){showFullscreenPopup(p);return;}
+    if(isMobile()){showMobileMapPopup(p);return;}
     const priceStr=currentMode==='buy'?fmtShort(p.price):fmtShort(p.deposit);
     const label=currentMode==='buy'?'매매 ':'보증금 ';
-    kakao.maps.event.addListener(marker,'click',()=>{
-      if(mapFullscreen){showFullscreenPopup(p);return;}
-      if(isMobile()){showMobileMapPopup(p);return;}
-      mapInfoWindow.setContent('<div style="padding:8px 12px;font-size:12px;line-height:1.5;max-width:220px"><strong>'+p.name+'</strong><br><span style="color:#666">'+p.region+' · '+p.area+'</span><br><span style="font-weight:700">'+label+priceStr+'</span>'+(p.station?' · '+p.station:'')+'</div>');
-      mapInfoWindow.open(kakaoMap,marker);
-      focusCard(mKey);
-    });
-    markerMap[mKey]=marker;
-    mapMarkers.push(marker);cnt++;
-  });
-  document.getElementById('mapBadge').textContent=cnt+'개 매물 표시';
+    mapInfoWindow.setContent('<div style="padding:8px 12px;font-size:12px;line-height:1.5;max-width:220px"><strong>'+p.name+'</strong><br><span style="color:#666">'+p.region+' · '+p.area+'</span><br><span style="font-weight:700">'+label+priceStr+'</span>'+(p.station?' · '+p.station:'')+'</div>');
+    mapInfoWindow.open(kakaoMap,marker);
+    focusCard(mKey);
+  }));
+  markerMap[mKey]=marker;
+  return ent;
+}
+function createClusterOverlay(c,sig,level){
+  const el=document.createElement('div');
+  el.className='map-cluster '+c.best+(c.n>=100?' lg':c.n>=10?' md':'');el.textContent=c.n;
+  const pos=new kakao.maps.LatLng(c.lat,c.lon);
+  // 클릭 시 해당 위치를 기준으로 확대
+  el.addEventListener('click',()=>kakaoMap.setLevel(Math.max(1,level-2),{anchor:pos}));
+  const overlay=new kakao.maps.CustomOverlay({map:kakaoMap,position:pos,content:el,xAnchor:0.5,yAnchor:0.5,zIndex:2});
+  return{obj:overlay,sig,el};
 }
 let mobileSplitMode='list';
 function isMobile(){return window.innerWidth<=768;}
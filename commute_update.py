@@ -1,12 +1,15 @@
 """
 출퇴근 소요시간 자동 수집 스크립트
-coord_cache.json + data.json → ODsay API → commute_time.json 업데이트
+monitor.db(좌표 + 최근 매매/전월세) → ODsay API → commute_time.json 업데이트
 """
 
 import json
 import time
 import requests
 import os
+from datetime import datetime, timezone, timedelta
+
+import store as store_db
 
 # 도착지: 강남역 미림타워
 DEST_LNG = 127.0283
@@ -19,25 +22,11 @@ def load_config():
     with open("config.json", "r", encoding="utf-8") as f:
         return json.load(f)
 
-def load_coord_cache():
-    """coord_cache.json에서 매물 좌표 로드"""
-    try:
-        with open("coord_cache.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return {}
-
-def load_data():
-    """data.json + data-rent.json에서 매물 목록 로드 → 동(dong) 단위로 중복 제거"""
-    props = []
-    for fname in ["data.json", "data-rent.json"]:
-        try:
-            with open(fname, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                props.extend(data.get("properties", []))
-        except:
-            pass
-    return props
+def load_data(db):
+    """DB에서 대시보드 기간(최근 90일)의 매매 + 전월세 매물 목록 로드"""
+    kst = timezone(timedelta(hours=9))
+    cutoff = store_db.dashboard_cutoff(datetime.now(kst))
+    return db.properties("trade", since=cutoff) + db.properties("rent", since=cutoff)
 
 def load_existing_commute():
     """기존 commute_time.json 로드"""
@@ -147,13 +136,15 @@ def main():
         print("ODsay API 키가 config.json에 없습니다.")
         return
 
-    coord_cache = load_coord_cache()
-    properties = load_data()
+    db = store_db.open_store()
+    coord_cache = dict(db.coords)
+    properties = load_data(db)
+    db.close()
     commute = load_existing_commute()
     existing_data = commute.get("data", {})
 
     if not properties:
-        print("data.json에서 매물을 로드할 수 없습니다.")
+        print("monitor.db에서 매물을 로드할 수 없습니다.")
         return
 
     # 동(dong) 단위로 중복 제거
@@ -225,7 +216,6 @@ def main():
         success += 1
 
     # 저장
-    from datetime import datetime, timezone, timedelta
     kst = timezone(timedelta(hours=9))
     commute["updated"] = datetime.now(kst).strftime("%Y-%m-%d %H:%M")
     commute["data"] = existing_data
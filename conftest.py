@@ -0,0 +1,2 @@
+# test_api.py / test_naver_api.py는 import 시점에 실제 API를 호출하는 수동 확인용 스크립트 → pytest 수집 제외
+collect_ignore = ["test_api.py", "test_naver_api.py"]
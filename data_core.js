@@ -0,0 +1,410 @@
+// 대시보드 데이터 처리 공통 모듈 — data_worker.js(Web Worker)가 데이터셋을 들고 처리하고,
+// Worker를 못 쓰는 환경에서는 app.js가 같은 함수를 메인 스레드에서 호출한다.
+// DOM·카카오맵에 의존하지 않는 것만 둔다: 로드(shard/IndexedDB), 그룹핑, 이상가격·전세가율, 좌표·출퇴근 매핑, 필터·판정·정렬.
+
+// 관심 지역(Watchlist) — 이 지역만 대시보드에 표시. data.json은 보존됨.
+const WATCHLIST_DISTRICTS=['노원구','도봉구','강북구','중랑구'];
+function isInWatchlist(item){
+  const sgg=item.sgg_name||item.region||'';
+  return WATCHLIST_DISTRICTS.some(d=>sgg.includes(d));
+}
+
+// ─── 지역별 규제등급 매핑 (2025.10.15 대책 기준) ───
+const REGULATION_MAP={
+  // 서울 투기과열지구 (LTV 40%) — 서울 전역은 fallback 처리
+  '서울 강남구':{zone:'투기과열',ltv:40},'서울 서초구':{zone:'투기과열',ltv:40},'서울 송파구':{zone:'투기과열',ltv:40},
+  '서울 강동구':{zone:'투기과열',ltv:40},'서울 관악구':{zone:'투기과열',ltv:40},'서울 금천구':{zone:'투기과열',ltv:40},
+  '서울 노원구':{zone:'투기과열',ltv:40},'서울 도봉구':{zone:'투기과열',ltv:40},
+  '서울 강북구':{zone:'투기과열',ltv:40},'서울 중랑구':{zone:'투기과열',ltv:40},
+  '서울 광진구':{zone:'투기과열',ltv:40},'서울 동대문구':{zone:'투기과열',ltv:40},'서울 양천구':{zone:'투기과열',ltv:40},
+};
+function getRegulation(region){
+  if(!region)return{zone:'비규제',ltv:70};
+  if(REGULATION_MAP[region])return REGULATION_MAP[region];
+  if(region.startsWith('서울'))return{zone:'투기과열',ltv:40};
+  return{zone:'비규제',ltv:70};
+}
+const DISTRICT_GROUPS={
+  '동북권':['서울 노원구','서울 도봉구','서울 강북구','서울 중랑구','서울 광진구','서울 동대문구'],
+  '남서권':['서울 양천구','서울 관악구','서울 금천구'],
+};
+
+let COMMUTE_DATA={};
+function monthlyPayment(p,r,y){if(p<=0)return 0;const mr=r/100/12,n=y*12;if(mr===0)return p/n;return p*mr*Math.pow(1+mr,n)/(Math.pow(1+mr,n)-1);}
+function getPropId(p){return (p.name+'_'+(p.dong||'')+'_'+(p.area_py||'')).replace(/\s/g,'');}
+function getMarkerKey(p){return p.name+'_'+p.region;}
+function areaMatch(py,val){if(!val)return true;const p=parseFloat(py)||0;if(val==='small')return p<=18;if(val==='mid')return p>18&&p<=25;if(val==='large')return p>25;return true;}
+function builtYearMatch(by,val){if(!val)return true;if(!by)return false;const cy=new Date().getFullYear();if(val==='old')return cy-by>=20;return cy-by<=parseInt(val);}
+function isLikelyNaholo(item){if(item.households>0)return false;if(/\(\d+(-\d+)?\)/.test(item.name)&&!item.name.includes('단지'))return true;if(item.name.length<=3&&!item.name.includes('단지')&&!item.name.includes('주공'))return true;return false;}
+function commuteMatch(p,cv){if(!cv)return true;if(cv==='transit60')return p.commuteTransit!=null&&p.commuteTransit<=60;if(cv==='subway60')return p.commuteSubway!=null&&p.commuteSubway<=60;if(cv==='transit45')return p.commuteTransit!=null&&p.commuteTransit<=45;return true;}
+function matchCommute(p){
+  if(!COMMUTE_DATA.data)return null;const d=COMMUTE_DATA.data;
+  const key=p.region+' '+p.dong;if(d[key])return d[key];
+  const normR=s=>s.replace(/시(\s|$)/g,'$1').replace(/^경기\s+/,'').replace(/\s+/g,' ').trim();
+  const nk=normR(key);for(const[k,v]of Object.entries(d)){if(normR(k)===nk)return v;}
+  return null;
+}
+// 지역명 정규화: "수원시 장안구" → "수원 장안구" (시 제거로 축약형 매칭)
+const normRegion=s=>s.replace(/시(\s|$)/g,'$1').replace(/\s+/g,' ').trim();
+// coord_cache 접미사 인덱스 (main.py build_coord_index와 같은 규칙): 키의 단어 경계 접미사("단지명","법정동 단지명",…) → [[정규화 키,좌표],…]
+function buildCoordIndex(cc){
+  const idx=new Map();
+  for(const[k,v]of Object.entries(cc)){const w=k.split(/\s+/),nk=normRegion(k);for(let i=0;i<w.length;i++){const s=w.slice(i).join(' ');let a=idx.get(s);if(!a)idx.set(s,a=[]);a.push([nk,v]);}}
+  return idx;
+}
+function findCachedCoord(idx,p){
+  // 1순위: name으로 끝나고 정규화된 region 포함
+  const nr=normRegion(p.region||'');
+  for(const[nk,v]of idx.get(p.name)||[]){if(nk.includes(nr))return v;}
+  // 2순위: dong+name suffix (기존 키 호환)
+  const c=idx.get(((p.dong||'')+' '+p.name).trim());
+  return c?c[0][1]:null;
+}
+function groupProperties(raw){
+  const g={};raw.forEach(i=>{const k=i.region+'_'+i.name+'_'+i.area_m2;if(!g[k])g[k]={name:i.name,region:i.region,area:Math.round(i.area_m2)+'㎡',area_py:i.area_py,regulated:i.regulated||false,station:i.walk_min?'도보 '+i.walk_min+'분':'역정보 없음',station_name:i.station||'',line:i.line||'',walk_min:i.walk_min,dong:i.dong||'',built_year:i.built_year||0,households:i.households||0,link:i.link||'',lat:i.lat||null,lon:i.lon||null,prices:[],floors:[],dates:[],trades:[]};g[k].prices.push(i.price);g[k].floors.push(i.floor);g[k].dates.push(i.trade_date);g[k].trades.push({price:i.price,floor:i.floor,date:i.trade_date});});
+  return Object.values(g).map(v=>{const avg=Math.round(v.prices.reduce((a,b)=>a+b,0)/v.prices.length);const tr=v.trades.sort((a,b)=>(b.date||'').localeCompare(a.date||''));return{name:v.name,region:v.region,area:v.area,area_py:v.area_py,price:avg,regulated:v.regulated,station:v.station,station_name:v.station_name,line:v.line,walk_min:v.walk_min,dong:v.dong,built_year:v.built_year,households:v.households,link:v.link,lat:v.lat,lon:v.lon,trade_count:v.prices.length,min_price:Math.min(...v.prices),max_price:Math.max(...v.prices),latest_date:v.dates.sort().reverse()[0]||'',price_per_py:v.area_py>0?Math.round(avg/v.area_py):0,trades:tr};}).sort((a,b)=>a.price-b.price);
+}
+function groupRentProperties(raw){
+  const g={};raw.forEach(i=>{const k=i.region+'_'+i.name+'_'+i.area_m2+'_'+(i.rent_type||'전세');if(!g[k])g[k]={name:i.name,region:i.region,area:Math.round(i.area_m2)+'㎡',area_py:i.area_py,rent_type:i.rent_type||'전세',station:i.walk_min?'도보 '+i.walk_min+'분':'역정보 없음',station_name:i.station||'',line:i.line||'',walk_min:i.walk_min,dong:i.dong||'',built_year:i.built_year||0,households:i.households||0,lat:i.lat||null,lon:i.lon||null,deposits:[],monthlys:[],floors:[],dates:[],trades:[]};g[k].deposits.push(i.deposit||0);g[k].monthlys.push(i.monthly_rent||0);g[k].floors.push(i.floor);g[k].dates.push(i.trade_date);g[k].trades.push({deposit:i.deposit||0,monthly:i.monthly_rent||0,floor:i.floor,date:i.trade_date});});
+  return Object.values(g).map(v=>{const avgD=Math.round(v.deposits.reduce((a,b)=>a+b,0)/v.deposits.length);const avgM=Math.round(v.monthlys.reduce((a,b)=>a+b,0)/v.monthlys.length);const tr=v.trades.sort((a,b)=>(b.date||'').localeCompare(a.date||''));return{name:v.name,region:v.region,area:v.area,area_py:v.area_py,rent_type:v.rent_type,deposit:avgD,monthly_rent:avgM,station:v.station,station_name:v.station_name,line:v.line,walk_min:v.walk_min,dong:v.dong,built_year:v.built_year,households:v.households,lat:v.lat,lon:v.lon,trade_count:v.deposits.length,min_deposit:Math.min(...v.deposits),max_deposit:Math.max(...v.deposits),latest_date:v.dates.sort().reverse()[0]||'',trades:tr};}).sort((a,b)=>a.deposit-b.deposit);
+}
+function flagRentAnomalies(rent){
+  // 같은 지역 + 면적대(±5㎡) 전세 중위 보증금 대비 50% 미만 = 이상가격
+  const groups={};
+  rent.forEach(p=>{
+    if(p.rent_type!=='전세')return;
+    const band=Math.round((parseFloat(p.area_py)||0)/5)*5;
+    const key=p.region+'_'+band;
+    if(!groups[key])groups[key]=[];
+    groups[key].push(p.deposit);
+  });
+  const medians={};
+  for(const [key,deps] of Object.entries(groups)){
+    if(deps.length<3)continue;
+    const s=[...deps].sort((a,b)=>a-b);
+    const m=Math.floor(s.length/2);
+    medians[key]=s.length%2!==0?s[m]:Math.round((s[m-1]+s[m])/2);
+  }
+  let cnt=0;
+  rent.forEach(p=>{
+    const band=Math.round((parseFloat(p.area_py)||0)/5)*5;
+    const key=p.region+'_'+band;
+    const med=medians[key];
+    p.priceAnomaly=!!(med&&p.deposit<med*0.5);
+    if(p.priceAnomaly)cnt++;
+  });
+  if(cnt>0)console.log(`이상가격 감지: ${cnt}건 (중위 보증금 50% 미만)`);
+}
+// 전세가율: 같은 단지(지역+동+이름)의 매매 평형을 평형순 [평형, 평균가] 배열로 색인하고
+// 이진 탐색으로 가장 가까운 평형(±JEONSE_AREA_TOL_PY, 동률이면 작은 평형)을 찾는다. main.py jeonse_rate와 같은 규칙.
+const JEONSE_AREA_TOL_PY=3;
+function buildJeonseIndex(buy){
+  const g=new Map();
+  buy.forEach(p=>{const k=p.region+'|'+p.dong+'|'+p.name,py=parseFloat(p.area_py)||0;let m=g.get(k);if(!m)g.set(k,m=new Map());const a=m.get(py);if(a)a.push(p.price);else m.set(py,[p.price]);});
+  const idx=new Map();
+  g.forEach((m,k)=>{const areas=[...m.keys()].sort((a,b)=>a-b);idx.set(k,{areas,prices:areas.map(a=>{const v=m.get(a);return Math.round(v.reduce((s,x)=>s+x,0)/v.length);})});});
+  return idx;
+}
+// 평형순 배열 a에서 py에 가장 가까운 번호 (±JEONSE_AREA_TOL_PY 밖이면 -1)
+function nearestArea(a,py){
+  let lo=0,hi=a.length;while(lo<hi){const m=(lo+hi)>>1;if(a[m]<py)lo=m+1;else hi=m;}
+  let best=-1;
+  for(const j of[lo-1,lo])if(j>=0&&j<a.length&&Math.abs(a[j]-py)<=JEONSE_AREA_TOL_PY&&(best<0||Math.abs(a[j]-py)<Math.abs(a[best]-py)))best=j;
+  return best;
+}
+function lookupJeonseRate(idx,p){
+  const e=idx.get(p.region+'|'+p.dong+'|'+p.name);if(!e)return null;
+  const best=nearestArea(e.areas,parseFloat(p.area_py)||0);
+  return best<0||!e.prices[best]?null:Math.round(p.deposit/e.prices[best]*100);
+}
+function calcJeonseRate(buy,rent){
+  const idx=buildJeonseIndex(buy);
+  let matched=0,total=0;
+  rent.forEach(p=>{
+    if(p.rent_type!=='전세'){p.jeonseRate=null;return;}
+    total++;p.jeonseRate=lookupJeonseRate(idx,p);if(p.jeonseRate!=null)matched++;
+  });
+  console.log(`전세가율 매칭: ${matched}/${total}건`);
+}
+// 열 단위 shard(main.py encode_columnar) → 레코드 배열
+function decodeColumnar(d){
+  const n=d.count,cols=d.columns,dicts=d.dicts||{},out=new Array(n);
+  for(let i=0;i<n;i++){
+    const o={};
+    for(const f of d.fields){const v=cols[f][i];o[f]=dicts[f]?dicts[f][v]:v;}
+    out[i]=o;
+  }
+  return out;
+}
+// main.py summarize_complexes 단지 요약 → groupProperties / groupRentProperties와 같은 모양
+function fromSummary(kind,s){
+  const p={name:s.name,region:s.region,area:Math.round(s.area_m2)+'㎡',area_py:s.area_py,station:s.walk_min?'도보 '+s.walk_min+'분':'역정보 없음',station_name:s.station,line:s.line,walk_min:s.walk_min,dong:s.dong,built_year:s.built_year,households:s.households,lat:s.lat,lon:s.lon,trade_count:s.trade_count,latest_date:s.latest_date};
+  if(kind==='trade'){
+    Object.assign(p,{price:s.price,median_price:s.median_price,min_price:s.min_price,max_price:s.max_price,price_per_py:s.price_per_py,regulated:!!s.regulated,link:'https://m.land.naver.com/search/result/'+encodeURIComponent(s.dong+' '+s.name)});
+    p.trades=s.history.map(([date,price,floor])=>({price,floor,date}));
+  }else{
+    Object.assign(p,{rent_type:s.rent_type,deposit:s.deposit,monthly_rent:s.monthly_rent,median_deposit:s.median_deposit,min_deposit:s.min_deposit,max_deposit:s.max_deposit});
+    if('jeonse_rate' in s)p.jeonseRate=s.jeonse_rate;
+    p.trades=s.history.map(([date,deposit,monthly,floor])=>({deposit,monthly,floor,date}));
+  }
+  // main.py 가격 분포(price_stats.py) 기준 이상가격·로버스트 z
+  if('anomaly' in s){p.priceAnomaly=!!s.anomaly;p.priceZ=s.price_z;}
+  return p;
+}
+// ─── IndexedDB shard 캐시: 지난 방문의 shard를 보관 → manifest hash가 바뀐 지역만 다시 받음 ───
+const IDB_NAME='rem-dashboard',IDB_STORE='shards';
+let _idb=null;
+function idb(){
+  if(!_idb)_idb=new Promise(res=>{
+    if(typeof indexedDB==='undefined')return res(null);
+    try{const rq=indexedDB.open(IDB_NAME,1);rq.onupgradeneeded=()=>rq.result.createObjectStore(IDB_STORE);rq.onsuccess=()=>res(rq.result);rq.onerror=()=>res(null);}catch(e){res(null);}
+  });
+  return _idb;
+}
+async function idbGet(key){
+  const db=await idb();if(!db)return null;
+  return new Promise(res=>{try{const rq=db.transaction(IDB_STORE).objectStore(IDB_STORE).get(key);rq.onsuccess=()=>res(rq.result||null);rq.onerror=()=>res(null);}catch(e){res(null);}});
+}
+async function idbPut(key,val){const db=await idb();if(!db)return;try{db.transaction(IDB_STORE,'readwrite').objectStore(IDB_STORE).put(val,key);}catch(e){}}
+// manifest에서 빠진 지역(수집 중단 등)의 캐시 정리
+async function idbPrune(keep){
+  const db=await idb();if(!db)return;
+  try{const st=db.transaction(IDB_STORE,'readwrite').objectStore(IDB_STORE);const rq=st.getAllKeys();rq.onsuccess=()=>rq.result.forEach(k=>{if(!keep.has(k))st.delete(k);});}catch(e){}
+}
+// gzip 미리 압축본 우선 (DecompressionStream 미지원·실패 시 .json)
+async function fetchShardNetwork(s){
+  if(s.gz&&typeof DecompressionStream!=='undefined'){
+    try{const r=await fetch('data/'+s.gz+'?v='+s.hash);if(r.ok)return await new Response(r.body.pipeThrough(new DecompressionStream('gzip'))).json();}catch(e){}
+  }
+  const r=await fetch('data/'+s.file+'?v='+s.hash);if(!r.ok)throw 0;return r.json();
+}
+async function fetchShard(s){
+  const cached=await idbGet(s.file);
+  if(cached&&cached.hash===s.hash)return cached.data;
+  const d=await fetchShardNetwork(s);
+  idbPut(s.file,{hash:s.hash,data:d});
+  return d;
+}
+
+// ─── 데이터셋 ───
+// version: 목록이 다시 만들어질 때마다 증가. 조회 결과의 행 번호는 같은 version의 trade/rent 배열 기준.
+const DS={trade:[],rent:[],tradeLoaded:false,rentLoaded:false,updatedAt:{trade:'',rent:''},manifest:null,shards:{trade:{},rent:{}},pending:{trade:{},rent:{}},coordIndex:null,version:0};
+// 좌표·출퇴근 보완 (coord_cache 인덱스는 loadDataset에서 1회 구성)
+function attachExtras(props){
+  props.forEach(p=>{
+    if(DS.coordIndex&&!(p.lat&&p.lon)){const v=findCachedCoord(DS.coordIndex,p);if(v){p.lat=v.lat;p.lon=v.lon;}}
+    const c=matchCommute(p);p.commuteSubway=c?c.subway:null;p.commuteTransit=c?c.transit:null;
+  });
+  return props;
+}
+// ─── 지역별 분할 데이터 (data/manifest.json → data/{trade|rent}-{코드}.json) ───
+// 현재 모드·필터에 필요한 지역 shard만 먼저 받아 그리고, 나머지는 첫 화면 이후 백그라운드로 로드
+// filters: app.js dataFilters() — {mode, buyRegion, rentRegion, district}
+function manifestRegions(kind){return DS.manifest&&DS.manifest[kind]?DS.manifest[kind].shards.map(s=>s.region).filter(r=>isInWatchlist({region:r})):[];}
+function wantedRegions(kind,filters){
+  const all=manifestRegions(kind);
+  const rv=kind==='trade'?filters.buyRegion:filters.rentRegion;
+  if(rv)return all.filter(r=>r===rv);
+  if(kind==='trade'&&filters.district){const g=DISTRICT_GROUPS[filters.district]||[filters.district];return all.filter(r=>g.includes(r));}
+  return all;
+}
+function loadShard(kind,region){
+  if(DS.shards[kind][region])return Promise.resolve();
+  if(DS.pending[kind][region])return DS.pending[kind][region];
+  const s=DS.manifest[kind].shards.find(x=>x.region===region);
+  return DS.pending[kind][region]=fetchShard(s).then(d=>{
+    // 단지별 집계는 main.py에서 끝난 상태 → 모양만 맞춤
+    const summaries=d.format==='columnar'?decodeColumnar(d):(d.complexes||[]);
+    DS.shards[kind][region]=attachExtras(summaries.map(s=>fromSummary(kind,s)).filter(isInWatchlist));
+  }).catch(()=>{DS.shards[kind][region]=[];}).finally(()=>{delete DS.pending[kind][region];});
+}
+function rebuildFromShards(){
+  DS.trade=Object.values(DS.shards.trade).flat().sort((a,b)=>a.price-b.price);
+  DS.rent=Object.values(DS.shards.rent).flat().sort((a,b)=>a.deposit-b.deposit);
+  DS.tradeLoaded=!!DS.manifest.trade;DS.rentLoaded=DS.rent.length>0;
+  // 이상가격·전세가율은 main.py가 shard에 미리 계산해 둠 (예전 manifest만 여기서 계산)
+  const mr=DS.manifest.rent||{};
+  if(DS.rentLoaded){if(!mr.anomaly)flagRentAnomalies(DS.rent);if(!mr.jeonse_rate)calcJeonseRate(DS.trade,DS.rent);}
+  DS.version++;
+}
+// 아직 안 받은 shard가 있으면 받아서 목록 재구성 → true
+async function ensureShards(kind,regions){
+  const missing=regions.filter(r=>!DS.shards[kind][r]);
+  if(!missing.length)return false;
+  await Promise.all(missing.map(r=>loadShard(kind,r)));
+  rebuildFromShards();
+  return true;
+}
+// 현재 화면에 필요한 shard (전세가율이 미리 계산되지 않은 예전 manifest면 같은 지역 매매 shard도)
+function ensureVisibleShards(filters){
+  if(!DS.manifest)return Promise.resolve(false);
+  const kind=filters.mode==='buy'?'trade':'rent',regions=wantedRegions(kind,filters);
+  const jobs=[ensureShards(kind,regions)];
+  if(kind==='rent'&&!(DS.manifest.rent&&DS.manifest.rent.jeonse_rate))jobs.push(ensureShards('trade',manifestRegions('trade').filter(r=>regions.includes(r))));
+  return Promise.all(jobs).then(r=>r.some(Boolean));
+}
+// 목록 배열은 넘기지 않고 건수·지역 목록만 (행은 조회 결과 구간 단위로 resultRows가 보냄)
+function datasetMessage(){
+  const regions=DS.manifest?{trade:manifestRegions('trade'),rent:manifestRegions('rent')}:{trade:[...new Set(DS.trade.map(p=>p.region))].sort(),rent:[...new Set(DS.rent.map(p=>p.region))].sort()};
+  const counts={trade:DS.trade.length,rent:DS.rent.length,rentAnomaly:DS.rent.filter(p=>p.priceAnomaly).length};
+  return{type:'data',version:DS.version,counts,tradeLoaded:DS.tradeLoaded,rentLoaded:DS.rentLoaded,updatedAt:DS.updatedAt,regions};
+}
+async function loadDataset(filters,post){
+  const getJson=url=>fetch(url).then(r=>r.ok?r.json():null).catch(()=>null);
+  const [coordCache,commute,manifest]=await Promise.all([getJson('coord_cache.json'),getJson('commute_time.json'),getJson('data/manifest.json')]);
+  if(commute)COMMUTE_DATA=commute;
+  // coord_cache 좌표 매핑 (캐시 키: "경기 수원시 장안구 동신2단지" 형태, 법정동 없음)
+  if(coordCache&&Object.keys(coordCache).length>0)DS.coordIndex=buildCoordIndex(coordCache);
+  if(manifest){
+    DS.manifest=manifest;
+    DS.updatedAt={trade:manifest.updated_at||'',rent:manifest.updated_at||''};
+    idbPrune(new Set(['trade','rent'].flatMap(k=>manifest[k]?manifest[k].shards.map(s=>s.file):[])));
+    await ensureVisibleShards(filters);
+    rebuildFromShards();
+    post(datasetMessage());
+    // 나머지 지역·모드는 첫 화면 이후에
+    const more=await Promise.all([ensureShards('trade',manifestRegions('trade')),ensureShards('rent',manifestRegions('rent'))]);
+    if(more.some(Boolean))post(datasetMessage());
+    return;
+  }
+  // 분할 산출물이 없으면 기존 통짜 파일
+  const [d,dr]=await Promise.all([getJson('data.json'),getJson('data-rent.json')]);
+  if(d){DS.updatedAt.trade=d.updated_at||'';DS.trade=attachExtras(groupProperties(d.properties||[]).filter(isInWatchlist));DS.tradeLoaded=true;}
+  if(dr){DS.updatedAt.rent=dr.updated_at||'';DS.rent=attachExtras(groupRentProperties(dr.properties||[]).filter(isInWatchlist));DS.rentLoaded=DS.rent.length>0;}
+  if(DS.rentLoaded){flagRentAnomalies(DS.rent);calcJeonseRate(DS.trade,DS.rent);}
+  DS.version++;
+  post(datasetMessage());
+}
+// 메인 스레드에서 카카오 검색으로 찾은 좌표 반영 (같은 지역·동·단지명 전부)
+function applyCoords(items){
+  const byKey={};items.forEach(c=>{byKey[c.region+'_'+c.dong+'_'+c.name]=c;});
+  [DS.trade,DS.rent].forEach(props=>props.forEach(p=>{const c=byKey[p.region+'_'+p.dong+'_'+p.name];if(c&&!p.lat){p.lat=c.lat;p.lon=c.lon;}}));
+}
+// 좌표가 없는 단지 (지역·동·단지명 기준 중복 제거) → 메인 스레드 카카오 검색 대상
+function uncodedPlaces(){
+  const seen=new Set(),out=[];
+  [DS.trade,DS.rent].forEach(props=>props.forEach(p=>{
+    if(p.lat&&p.lon)return;
+    const k=p.region+'_'+p.dong+'_'+p.name;if(seen.has(k))return;seen.add(k);
+    out.push({region:p.region,dong:p.dong,name:p.name});
+  }));
+  return out;
+}
+// 매매 시세 매칭: 전세가율과 같은 단지 키(지역+동+이름)에서 가장 가까운 평형(±3평)의 매매 항목.
+// 평형별로 DS.trade 순서상 첫 항목을 두고, 목록이 다시 만들어질 때(DS.version)만 색인을 새로 만든다.
+let _buyIndex=null;
+function buyMatchIndex(){
+  if(_buyIndex&&_buyIndex.version===DS.version)return _buyIndex.idx;
+  const g=new Map();
+  DS.trade.forEach(b=>{const k=b.region+'|'+b.dong+'|'+b.name,py=parseFloat(b.area_py)||0;let m=g.get(k);if(!m)g.set(k,m=new Map());if(!m.has(py))m.set(py,b);});
+  const idx=new Map();
+  g.forEach((m,k)=>{const areas=[...m.keys()].sort((a,b)=>a-b);idx.set(k,{areas,items:areas.map(a=>m.get(a))});});
+  _buyIndex={version:DS.version,idx};
+  return idx;
+}
+function findBuyMatch(p){
+  if(!DS.tradeLoaded||DS.trade.length===0)return null;
+  const e=buyMatchIndex().get(p.region+'|'+p.dong+'|'+p.name);if(!e)return null;
+  const best=nearestArea(e.areas,parseFloat(p.area_py)||0);
+  return best<0?null:e.items[best];
+}
+
+// ─── 필터·판정·정렬 ───
+// 결과는 [DS 배열 번호, 판정 코드, 계산값] 열 배열로 Worker에 두고, 화면에는 보이는 구간의 행 객체와 지도용 점 목록만 넘긴다
+const BUY_VERDICTS=[['매수가능','tag-ok'],['빠듯함','tag-warn'],['상환초과','tag-danger'],['자금부족','tag-danger']];
+const RENT_VERDICTS=[['가능','tag-ok'],['빠듯함','tag-warn'],['예산초과','tag-danger']];
+// bounds: [남, 서, 북, 동] (지도 영역 필터 꺼짐이면 null)
+function inQueryBounds(p,b){if(!b||!p.lat||!p.lon)return true;return p.lat>=b[0]&&p.lat<=b[2]&&p.lon>=b[1]&&p.lon<=b[3];}
+function sortRows(rows,sv,rank,priceOf){
+  if(sv==='value')rows.sort((a,b)=>rank[a.v]-rank[b.v]||(parseFloat(b.p.area_py)||0)-(parseFloat(a.p.area_py)||0));
+  else if(sv==='price-asc')rows.sort((a,b)=>priceOf(a.p)-priceOf(b.p));else if(sv==='price-desc')rows.sort((a,b)=>priceOf(b.p)-priceOf(a.p));
+  else if(sv==='area-desc')rows.sort((a,b)=>(parseFloat(b.p.area_py)||0)-(parseFloat(a.p.area_py)||0));
+  else if(sv==='walk')rows.sort((a,b)=>(a.p.walk_min||999)-(b.p.walk_min||999));
+  else if(sv==='commute')rows.sort((a,b)=>(a.p.commuteTransit||999)-(b.p.commuteTransit||999));
+  else if(sv==='latest')rows.sort((a,b)=>(b.p.latest_date||'').localeCompare(a.p.latest_date||''));
+}
+function queryBuy(props,q){
+  const sq=q.sq.toLowerCase(),bm=q.bmOnly?new Set(q.bookmarks):null,group=q.district?(DISTRICT_GROUPS[q.district]||null):null,rows=[];
+  props.forEach((p,i)=>{
+    if(sq&&!(p.name+' '+p.region+' '+p.dong).toLowerCase().includes(sq))return;if(q.rv&&p.region!==q.rv)return;if(!areaMatch(p.area_py,q.av))return;if(!builtYearMatch(p.built_year,q.byv))return;if(!commuteMatch(p,q.cv))return;if(q.hhv>0&&(p.households===0||p.households<q.hhv))return;if(q.excludeNaholo&&isLikelyNaholo(p))return;
+    const reg=getRegulation(p.region);const pL=q.autoLtv?reg.ltv:(p.regulated?Math.min(q.eLTV,50):q.eLTV);const pLn=Math.min(Math.floor(p.price*pL/100),q.fL),pEq=p.price-pLn,pM=Math.floor(monthlyPayment(pLn,q.rate,q.term));
+    const v=pEq>q.eq?3:pM>q.mr?2:pM>q.mr*0.85?1:0;
+    if(q.vv&&BUY_VERDICTS[v][0]!==q.vv)return;
+    if(q.district&&(group?!group.includes(p.region):p.region!==q.district))return;
+    if(!inQueryBounds(p,q.bounds))return;
+    if(bm&&!bm.has(getPropId(p)))return;
+    rows.push({i,p,v,pL,pLn,pEq,pM});
+  });
+  sortRows(rows,q.sv,[0,1,2,2],p=>p.price);
+  return{idx:Int32Array.from(rows,r=>r.i),verdict:Uint8Array.from(rows,r=>r.v),pLTV:Float64Array.from(rows,r=>r.pL),pLoan:Float64Array.from(rows,r=>r.pLn),pEq:Float64Array.from(rows,r=>r.pEq),pMonthly:Float64Array.from(rows,r=>r.pM)};
+}
+function queryRent(props,q){
+  const sq=q.sq.toLowerCase(),bm=q.bmOnly?new Set(q.bookmarks):null,rows=[];let anomalyHidden=0;
+  props.forEach((p,i)=>{
+    if(!q.showAnomaly&&p.priceAnomaly){anomalyHidden++;return;}if(sq&&!(p.name+' '+p.region+' '+p.dong).toLowerCase().includes(sq))return;if(q.rf&&p.region!==q.rf)return;if(q.rtv&&p.rent_type!==q.rtv)return;if(!areaMatch(p.area_py,q.rav))return;if(!builtYearMatch(p.built_year,q.rbyv))return;if(!commuteMatch(p,q.rcv))return;if(q.rhhv>0&&(p.households===0||p.households<q.rhhv))return;if(q.excludeNaholo&&isLikelyNaholo(p))return;
+    const v=p.deposit>q.budget?2:p.deposit>q.budget*0.9?1:0;
+    if(q.rvv&&RENT_VERDICTS[v][0]!==q.rvv)return;
+    if(!inQueryBounds(p,q.bounds))return;
+    if(bm&&!bm.has(getPropId(p)))return;
+    rows.push({i,p,v});
+  });
+  sortRows(rows,q.rsv,[0,1,2],p=>p.deposit);
+  return{idx:Int32Array.from(rows,r=>r.i),verdict:Uint8Array.from(rows,r=>r.v),anomalyHidden};
+}
+
+// ─── 조회 결과 구간 ───
+// 페이지(또는 '전체'일 때 가상 목록이 그리는 구간)의 행은 ROW_WINDOW개씩 나눠 보낸다
+const ROW_WINDOW=200,MARKER_VERDICTS=['ok','warn','danger','danger'];
+const _results={};
+function resultRows(kind,start,end){
+  const res=_results[kind],r=res.r,props=kind==='trade'?DS.trade:DS.rent,out=[];
+  for(let k=Math.max(0,start);k<Math.min(end,r.idx.length);k++){
+    const p=props[r.idx[k]];
+    if(kind==='trade'){const v=BUY_VERDICTS[r.verdict[k]];out.push({...p,pLTV:r.pLTV[k],pLoan:r.pLoan[k],pEquityNeeded:r.pEq[k],pMonthly:r.pMonthly[k],verdict:v[0],verdictTag:v[1],regZone:getRegulation(p.region).zone});}
+    else{const v=RENT_VERDICTS[r.verdict[k]];out.push({...p,verdict:v[0],verdictTag:v[1]});}
+  }
+  return out;
+}
+// 지도용: 마커 키별 첫 행만 (row = 정렬 결과 안의 순번 → 목록 페이지·스크롤 위치 계산용)
+function resultMarkers(kind){
+  const r=_results[kind].r,props=kind==='trade'?DS.trade:DS.rent,seen=new Set(),out=[];
+  for(let k=0;k<r.idx.length;k++){
+    const p=props[r.idx[k]];if(!p.lat||!p.lon)continue;
+    const key=getMarkerKey(p);if(seen.has(key))continue;seen.add(key);
+    out.push({key,id:getPropId(p),row:k,lat:p.lat,lon:p.lon,verdict:MARKER_VERDICTS[r.verdict[k]],region:p.region});
+  }
+  return out;
+}
+
+// ─── 메시지 처리 (Worker onmessage / 메인 스레드 대체 경로 공용) ───
+// 조회는 종류별 최신 요청만 실행: 앞선 요청이 아직 대기 중이면 새 요청이 덮어써서 취소된다
+const _latestQuery={};let _queryTimer=null;
+function runLatestQueries(post){
+  _queryTimer=null;
+  for(const kind of Object.keys(_latestQuery)){
+    const m=_latestQuery[kind];delete _latestQuery[kind];
+    const r=kind==='trade'?queryBuy(DS.trade,m.q):queryRent(DS.rent,m.q);
+    _results[kind]={seq:m.seq,version:DS.version,r};
+    // q.page(1부터)·q.size(0 = 전체)로 보이는 페이지를 정하고, 넘는 페이지는 마지막 페이지로
+    const total=r.idx.length,ps=m.q.size>0?m.q.size:Math.max(1,total),page=Math.min(Math.max(1,m.q.page||1),Math.max(1,Math.ceil(total/ps))),start=(page-1)*ps;
+    post({type:'result',kind,seq:m.seq,version:DS.version,total,page,start,count:Math.min(ps,total-start),anomalyHidden:r.anomalyHidden||0,rows:resultRows(kind,start,start+Math.min(ps,ROW_WINDOW)),markers:resultMarkers(kind)});
+  }
+}
+// 요청 id로 답하는 조회: rows(결과 구간), match(매매 시세), uncoded(좌표 없는 단지)
+function replyData(msg){
+  if(msg.type==='rows'){
+    // 그 사이 새 조회가 실행됐으면 빈 답 → 메인 스레드는 seq가 다르면 버린다
+    const res=_results[msg.kind];if(!res||res.seq!==msg.seq||res.version!==DS.version)return{rows:null};
+    return{seq:res.seq,start:msg.start,rows:resultRows(msg.kind,msg.start,msg.end)};
+  }
+  if(msg.type==='match')return{match:findBuyMatch(msg.p)};
+  if(msg.type==='uncoded')return{items:uncodedPlaces()};
+  return{};
+}
+function handleDataMessage(msg,post){
+  if(msg.type==='load')loadDataset(msg.filters,post);
+  else if(msg.type==='need')ensureVisibleShards(msg.filters).then(changed=>{if(changed)post(datasetMessage());});
+  else if(msg.type==='coords')applyCoords(msg.items);
+  else if(msg.type==='query'){_latestQuery[msg.kind]=msg;if(!_queryTimer)_queryTimer=setTimeout(()=>runLatestQueries(post),0);}
+  else if(msg.id)post({type:'reply',id:msg.id,...replyData(msg)});
+}
@@ -0,0 +1,3 @@
+// 대시보드 데이터 Worker — 데이터셋을 들고 로드·그룹핑·이상가격·필터·정렬을 메인 스레드 밖에서 처리
+importScripts('data_core.js');
+onmessage=e=>handleDataMessage(e.data,(msg,transfer)=>postMessage(msg,transfer||[]));
@@ -1,25 +1,26 @@
 """
 대장아파트 가격 추이 백필 스크립트
 - flagship_config.json의 워치리스트 17단지
-- 최근 12개월 실거래 데이터 수집 → flagship_history.json 저장
+- 최근 12개월 실거래 데이터 수집 → monitor.db 저장 후 flagship_history.json 내보내기
+- 신고 기한이 지난 달은 실거래 이력 창고(warehouse.py)에서 읽고, 새로 받은 달은 창고에도 저장
 """
 
 import json
 import os
 import time
-import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-import requests
+import molit_api
+import store as store_db
+from main import TRADE_API_URL, fetch_trades
+from warehouse import Warehouse
 
 BASE_DIR = Path(__file__).parent
 CONFIG_PATH = BASE_DIR / "config.json"
 FLAGSHIP_CONFIG_PATH = BASE_DIR / "flagship_config.json"
 FLAGSHIP_HISTORY_PATH = BASE_DIR / "flagship_history.json"
 
-API_URL = "https://apis.data.go.kr/1613000/RTMSDataSvcAptTradeDev/getRTMSDataSvcAptTradeDev"
-
 
 def load_api_key():
     if CONFIG_PATH.exists():
@@ -39,16 +40,8 @@ def load_flagship_config():
         return json.load(f)
 
 
-def load_flagship_history():
-    if FLAGSHIP_HISTORY_PATH.exists():
-        with open(FLAGSHIP_HISTORY_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"updated_at": "", "watchlist": []}
-
-
 def save_flagship_history(data):
-    with open(FLAGSHIP_HISTORY_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    store_db.write_json(data, FLAGSHIP_HISTORY_PATH)
     print(f"  [저장] flagship_history.json 저장 완료")
 
 
@@ -69,50 +62,30 @@ def generate_months(n=12):
     return months
 
 
-def fetch_trades_for_code(api_key, region_code, deal_ymd):
-    """특정 지역코드·월의 매매 실거래 전건 조회"""
-    params = {
-        "serviceKey": api_key,
-        "LAWD_CD": region_code,
-        "DEAL_YMD": deal_ymd,
-        "pageNo": "1",
-        "numOfRows": "9999",
+def to_flagship_trade(row):
+    """창고 원본 행(main.parse_trade_item) → 워치리스트 매칭용 거래 dict"""
+    return {
+        "aptNm": row["아파트"],
+        "area": row["면적"],
+        "price": row["거래금액"],
+        "floor": row["층"],
+        "year": row["거래년도"],
+        "month": row["거래월"],
+        "day": row["거래일"],
+        "dong": row["법정동"],
     }
-    try:
-        resp = requests.get(API_URL, params=params, timeout=30)
-        resp.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        print(f"    [오류] API 호출 실패 ({region_code} {deal_ymd}): {e}")
-        return []
 
-    try:
-        root = ET.fromstring(resp.text)
-    except ET.ParseError:
-        print(f"    [오류] XML 파싱 실패 ({region_code} {deal_ymd})")
-        return []
-
-    result_code = root.findtext(".//resultCode")
-    if result_code and result_code not in ("00", "000"):
-        result_msg = root.findtext(".//resultMsg", "알 수 없는 오류")
-        print(f"    [오류] API 에러 ({region_code} {deal_ymd}): {result_msg}")
-        return []
-
-    trades = []
-    for item in root.findall(".//item"):
-        try:
-            trades.append({
-                "aptNm": (item.findtext("aptNm") or "").strip(),
-                "area": float(item.findtext("excluUseAr") or 0),
-                "price": int((item.findtext("dealAmount") or "0").strip().replace(",", "")),
-                "floor": int(item.findtext("floor") or 0),
-                "year": int(item.findtext("dealYear") or 0),
-                "month": int(item.findtext("dealMonth") or 0),
-                "day": int(item.findtext("dealDay") or 0),
-                "dong": (item.findtext("umdNm") or "").strip(),
-            })
-        except (ValueError, TypeError):
-            continue
-    return trades
+
+def fetch_trades_for_code(api_key, region_code, deal_ymd, wh, now):
+    """특정 지역코드·월의 매매 실거래 전건 → (거래 목록, 출처 "창고"|"조회").
+    신고 기한이 지난 달은 이력 창고에서 읽고, 아니면 조회해 창고에 저장."""
+    if wh.is_final("trade", region_code, deal_ymd):
+        return [to_flagship_trade(r) for r in wh.read("trade", region_code, deal_ymd)], "창고"
+    failures = []
+    rows = fetch_trades(api_key, region_code, deal_ymd, failures)
+    if not failures:
+        wh.write("trade", region_code, deal_ymd, rows, now)
+    return [to_flagship_trade(r) for r in rows], "조회"
 
 
 def match_watchlist(trades, watchlist_items):
@@ -158,7 +131,8 @@ def main():
     print(f"지역코드: {len(by_code)}개, 워치리스트: {len(watchlist)}개 단지")
 
     # 기존 history 로드
-    history = load_flagship_history()
+    db = store_db.open_store()
+    history = db.load_flagship_history()
     history_map = {entry["id"]: entry for entry in history.get("watchlist", [])}
 
     # 워치리스트 항목 초기화 (없는 id 추가)
@@ -173,61 +147,94 @@ def main():
                 "transactions": [],
             }
 
+    # 신고 기한이 지난 달은 이력 창고(warehouse)에서 읽으므로 호출 계획에서 뺀다
+    wh = Warehouse()
+    plan = [
+        (TRADE_API_URL, {"LAWD_CD": code, "DEAL_YMD": ym})
+        for code in sorted(by_code) for ym in months
+        if not wh.is_final("trade", code, ym)
+    ]
+    try:
+        need = molit_api.ensure_quota(plan)
+    except molit_api.QuotaExceeded as e:
+        print(f"[중단] {e} — 백필을 시작하지 않습니다.")
+        db.close()
+        return
+    print(f"예상 API 호출: {sum(need.values())}회 (캐시 제외)")
+
     total_new = 0
     total_calls = 0
+    cache = molit_api.get_cache()
 
-    for code, items in sorted(by_code.items()):
-        item_names = ", ".join(i["name"] for i in items)
-        print(f"\n[{code}] {item_names}")
-
-        for ym in months:
-            print(f"  {ym} 조회 중...", end=" ", flush=True)
-            trades = fetch_trades_for_code(api_key, code, ym)
-            total_calls += 1
-            print(f"{len(trades)}건 수신", end="")
-
-            matched = match_watchlist(trades, items)
-            month_new = 0
-
-            for item in items:
-                entry = history_map[item["id"]]
-                existing_keys = {
-                    f"{t['date']}_{t['floor']}_{t['price']}"
-                    for t in entry["transactions"]
-                }
-
-                for trade in matched[item["id"]]:
-                    date_str = f"{trade['year']}-{trade['month']:02d}"
-                    key = f"{date_str}_{trade['floor']}_{trade['price']}"
-                    if key in existing_keys:
-                        continue
-                    entry["transactions"].append({
-                        "date": date_str,
-                        "price": trade["price"],
-                        "floor": trade["floor"],
-                        "area": trade["area"],
-                        "deal_day": f"{trade['day']:02d}",
-                    })
-                    existing_keys.add(key)
-                    month_new += 1
-
-            if month_new:
-                print(f" → 신규 {month_new}건", end="")
-            print()
-            total_new += month_new
-
-            time.sleep(0.5)
-
-    # 날짜 내림차순 정렬
-    for entry in history_map.values():
-        entry["transactions"].sort(
-            key=lambda x: (x["date"], x["deal_day"]), reverse=True
-        )
-
-    history["updated_at"] = now.strftime("%Y-%m-%dT%H:%M:%S")
-    history["watchlist"] = list(history_map.values())
-
-    save_flagship_history(history)
+    try:
+        try:
+            for code, items in sorted(by_code.items()):
+                item_names = ", ".join(i["name"] for i in items)
+                print(f"\n[{code}] {item_names}")
+
+                for ym in months:
+                    print(f"  {ym} 조회 중...", end=" ", flush=True)
+                    hits_before = cache.stats["hit"]
+                    trades, source = fetch_trades_for_code(api_key, code, ym, wh, now)
+                    from_cache = source == "창고" or cache.stats["hit"] > hits_before
+                    if not from_cache:
+                        total_calls += 1
+                    print(f"{len(trades)}건 {source if source == '창고' else '캐시' if from_cache else '수신'}", end="")
+
+                    matched = match_watchlist(trades, items)
+                    month_new = 0
+
+                    for item in items:
+                        entry = history_map[item["id"]]
+                        existing_keys = {
+                            f"{t['date']}_{t['floor']}_{t['price']}"
+                            for t in entry["transactions"]
+                        }
+
+                        for trade in matched[item["id"]]:
+                            date_str = f"{trade['year']}-{trade['month']:02d}"
+                            key = f"{date_str}_{trade['floor']}_{trade['price']}"
+                            if key in existing_keys:
+                                continue
+                            entry["transactions"].append({
+                                "trade_date": f"{date_str}-{trade['day']:02d}",
+                                "date": date_str,
+                                "price": trade["price"],
+                                "floor": trade["floor"],
+                                "area_m2": trade["area"],
+                                "area_py": round(trade["area"] / 3.3058, 1),
+                                "deal_day": f"{trade['day']:02d}",
+                            })
+                            existing_keys.add(key)
+                            month_new += 1
+
+                    if month_new:
+                        print(f" → 신규 {month_new}건", end="")
+                    print()
+                    total_new += month_new
+
+                    if not from_cache:
+                        time.sleep(0.5)
+        except molit_api.QuotaExceeded as e:
+            # 도중에 한도 소진 → 받은 달까지는 저장 (다음 실행에서 이미 있는 거래는 키로 건너뜀)
+            print(f"\n[중단] {e} — 받은 거래까지 저장하고 다음 실행에서 이어서 진행합니다.")
+
+        # 날짜 내림차순 정렬
+        for entry in history_map.values():
+            entry["transactions"].sort(
+                key=lambda x: (x["date"], x["deal_day"]), reverse=True
+            )
+
+        history["updated_at"] = now.strftime("%Y-%m-%dT%H:%M:%S")
+        history["watchlist"] = list(history_map.values())
+
+        db.save_flagship_history(history)
+        save_flagship_history(db.load_flagship_history())
+    finally:
+        db.close()
+        molit_api.close()
+    print(f"  [캐시] {molit_api.cache_report()}")
+    print(f"  [한도] 오늘 API 호출: {molit_api.quota_report()}")
 
     print(f"\n{'=' * 55}")
     print(f"완료! API 호출 {total_calls}회, 신규 거래 {total_new}건 수집")
@@ -7,15 +7,25 @@
 - [v5] data-rent.json 추가, 22개 지역 확대
 """
 
+import bisect
+import gzip
+import hashlib
 import json
 import math
 import os
+import re
 import requests
 import urllib.parse
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+import molit_api
+import store as store_db
+import warehouse
+from station_index import StationIndex
+
 # ─── 단지별 공급면적 → 평형 매핑 ───
 # 정부 API는 전용면적만 주지만, 시장 통념은 공급면적 평형으로 부름.
 # 워치리스트 단지의 전용면적을 공급면적 평수로 변환.
@@ -57,18 +67,58 @@ def format_price(p):
 # ─── 경로 설정 ───
 BASE_DIR = Path(__file__).parent
 CONFIG_PATH = BASE_DIR / "config.json"
-HISTORY_PATH = BASE_DIR / "sent_history.json"
-RENT_HISTORY_PATH = BASE_DIR / "sent_history_rent.json"
 COORD_CACHE_PATH = BASE_DIR / "coord_cache.json"
-APT_INFO_CACHE_PATH = BASE_DIR / "apt_info_cache.json"
 DATA_JSON_PATH = BASE_DIR / "data.json"
 DATA_RENT_JSON_PATH = BASE_DIR / "data-rent.json"
+# 지역별 분할 산출물: data/manifest.json + data/{trade|rent}-{시군구코드}.json
+SHARD_DIR = BASE_DIR / "data"
+SHARD_MANIFEST_PATH = SHARD_DIR / "manifest.json"
+# data.json / data-rent.json 은 주기적으로만 통째로 다시 쓰고(스냅샷), 그 사이 실행은 변경분만 data/deltas/에
+DELTA_DIR = SHARD_DIR / "deltas"
+SNAPSHOT_COMPACT_DAYS = 7
+SNAPSHOT_MAX_DELTAS = 40
+# 열 단위(columnar) shard: 반복되는 문자열 열은 사전 인코딩
+COLUMNAR_DICT_FIELDS = ("region", "dong", "name", "station", "line", "rent_type")
+# shard에 담는 단지 요약 필드 (링크·역 표기 등 화면용 파생값은 app.js fromSummary에서 생성)
+_SUMMARY_COMMON_FIELDS = (
+    "name", "region", "dong", "area_m2", "area_py", "station", "line", "walk_min",
+    "built_year", "households", "lat", "lon", "trade_count", "latest_date",
+)
+SUMMARY_FIELDS = {
+    "trade": _SUMMARY_COMMON_FIELDS + (
+        "regulated", "price", "median_price", "min_price", "max_price", "price_per_py", "history",
+        "anomaly", "price_z",
+    ),
+    "rent": _SUMMARY_COMMON_FIELDS + (
+        "rent_type", "deposit", "monthly_rent", "median_deposit", "min_deposit", "max_deposit", "history",
+        "jeonse_rate", "anomaly", "price_z",
+    ),
+}
+# 전세가율: 같은 단지(지역+동+이름)의 가장 가까운 매매 평형이 이 범위(평) 안일 때만
+JEONSE_AREA_TOLERANCE_PY = 3
 FLAGSHIP_CONFIG_PATH = BASE_DIR / "flagship_config.json"
 FLAGSHIP_HISTORY_PATH = BASE_DIR / "flagship_history.json"
 
 # ─── 대시보드 URL ───
 DASHBOARD_URL = "https://haan6892.github.io/real-estate-monitor/"
 
+# ─── 국토부 실거래 API ───
+TRADE_API_URL = "https://apis.data.go.kr/1613000/RTMSDataSvcAptTradeDev/getRTMSDataSvcAptTradeDev"
+RENT_API_URL = "https://apis.data.go.kr/1613000/RTMSDataSvcAptRent/getRTMSDataSvcAptRent"
+
+# ─── 수집 병렬도 (config.json "collect"로 덮어쓰기 가능) ───
+COLLECT_WORKERS = 8     # 동시 실행 스레드 수
+COLLECT_PER_HOST = 4    # 호스트(apis.data.go.kr)별 동시 요청 상한
+ENRICH_WORKERS = 8      # 단지 부가정보(세대수·좌표) 동시 조회 수
+
+# ─── 시군구 단지 목록 (AptListService3) 갱신 주기 ───
+APT_LIST_URL = "https://apis.data.go.kr/1613000/AptListService3/getSigunguAptList3"
+APT_LIST_PAGE_SIZE = 200
+APT_LIST_PAGE_WORKERS = 4
+APT_LIST_REFRESH_DAYS = 7        # 변경 여부 확인 주기 (1페이지 + totalCount)
+APT_LIST_FULL_REFRESH_DAYS = 28  # 전체 목록 재수신 주기
+APT_LIST_STAGGER_HOURS = 48      # 시군구별 갱신 시차 범위
+
 # ─── 신분당선 + 주요 지하철역 좌표 ───
 STATIONS = [
     # 신분당선
@@ -177,74 +227,321 @@ STATIONS = [
     {"name": "총신대입구", "lat": 37.4870, "lon": 126.9818, "line": "4호선"},
 ]
 
+# 역 목록 버전: STATIONS가 바뀌면 단지별 최근접 역(complex_enrichment)을 다시 계산
+STATIONS_VERSION = hashlib.sha1(
+    json.dumps(STATIONS, ensure_ascii=False, sort_keys=True).encode("utf-8")
+).hexdigest()[:12]
+
 
 def load_config():
     with open(CONFIG_PATH, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def load_history():
-    if HISTORY_PATH.exists():
-        with open(HISTORY_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
-
-
-def save_history(history):
-    history = history[-3000:]
-    with open(HISTORY_PATH, "w", encoding="utf-8") as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
+# ─── 대시보드 JSON 내보내기 (원본은 monitor.db) ───
+def save_coord_cache(cache):
+    store_db.write_json(dict(cache), COORD_CACHE_PATH)
 
 
-def load_rent_history():
-    if RENT_HISTORY_PATH.exists():
-        with open(RENT_HISTORY_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+def save_data_json(data, path):
+    store_db.write_json(data, path)
+    print(f"  [data] {path.name} 저장 완료 ({len(data['properties'])}건)")
 
 
-def save_rent_history(history):
-    history = history[-3000:]
-    with open(RENT_HISTORY_PATH, "w", encoding="utf-8") as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
+def export_rows(db, kind, path, items, new_count, now):
+    """data.json / data-rent.json 을 스냅샷 + delta로 내보내기 → manifest "rows" 항목.
+    items는 db.properties(with_id=True) 결과. 스냅샷은 SNAPSHOT_COMPACT_DAYS마다(또는 delta가
+    SNAPSHOT_MAX_DELTAS개 쌓이면) 다시 쓰고, 그 사이에는 추가 항목 / 기간 밖으로 빠진 id /
+    바뀐 세대수·좌표만 delta 파일로 남긴다. 스냅샷 + delta 순서대로 적용하면 이번 실행의 items와 같다."""
+    state_key = f"export_{kind}"
+    state = json.loads(db.get_meta(state_key) or "null")
+    stamp = now.strftime("%Y%m%d%H%M")
+    updated_at = now.strftime("%Y-%m-%d %H:%M")
+    compact = (
+        state is None
+        or not path.exists()
+        or len(state["deltas"]) >= SNAPSHOT_MAX_DELTAS
+        or now - datetime.fromisoformat(state["compacted_at"]) >= timedelta(days=SNAPSHOT_COMPACT_DAYS)
+    )
+
+    if compact:
+        save_data_json({
+            "updated_at": updated_at,
+            "version": stamp,
+            "total_count": len(items),
+            "new_count": new_count,
+            "properties": items
+        }, path)
+        db.reset_export(kind, items)
+        for name in (state or {}).get("deltas", []):
+            (DELTA_DIR / name).unlink(missing_ok=True)
+        state = {"version": stamp, "compacted_at": now.isoformat(), "deltas": []}
+    else:
+        added, removed, changed = db.export_delta(kind, items)
+        if added or removed or changed:
+            DELTA_DIR.mkdir(parents=True, exist_ok=True)
+            name = f"{kind}-{stamp}.json"
+            store_db.write_json({
+                "base": state["version"],
+                "seq": len(state["deltas"]) + 1,
+                "updated_at": updated_at,
+                "new_count": new_count,
+                "added": added,
+                "removed": removed,
+                "changed": changed,
+            }, DELTA_DIR / name)
+            state["deltas"].append(name)
+            print(f"  [data] {path.name} delta: 추가 {len(added)} / 제외 {len(removed)} / 변경 {len(changed)}")
+
+    db.set_meta(state_key, json.dumps(state))
+    return {
+        "snapshot": path.name,
+        "version": state["version"],
+        "updated_at": updated_at,
+        "total_count": len(items),
+        "deltas": [f"{DELTA_DIR.name}/{name}" for name in state["deltas"]],
+    }
 
 
-def load_coord_cache():
-    if COORD_CACHE_PATH.exists():
-        with open(COORD_CACHE_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+def _shard_bounds(properties):
+    """좌표 있는 항목의 [남, 서, 북, 동] 경계. 좌표가 하나도 없으면 None"""
+    coords = [(p["lat"], p["lon"]) for p in properties if p.get("lat") and p.get("lon")]
+    if not coords:
+        return None
+    lats, lons = zip(*coords)
+    return [min(lats), min(lons), max(lats), max(lons)]
 
 
-def save_coord_cache(cache):
-    with open(COORD_CACHE_PATH, "w", encoding="utf-8") as f:
-        json.dump(cache, f, ensure_ascii=False, indent=2)
+def _js_round(x):
+    # 브라우저 Math.round와 같은 반올림 (Python round는 짝수 쪽으로 맞춤)
+    return math.floor(x + 0.5)
 
 
-def load_apt_info_cache():
-    if APT_INFO_CACHE_PATH.exists():
-        with open(APT_INFO_CACHE_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+def _median(values):
+    s = sorted(values)
+    m = len(s) // 2
+    return s[m] if len(s) % 2 else _js_round((s[m - 1] + s[m]) / 2)
 
 
-def save_apt_info_cache(cache):
-    with open(APT_INFO_CACHE_PATH, "w", encoding="utf-8") as f:
-        json.dump(cache, f, ensure_ascii=False, indent=2)
+def summarize_complexes(kind, items):
+    """항목 목록 → 단지 요약 목록 (가격 오름차순).
+    묶음 키·대표값 규칙은 app.js 기존 groupProperties / groupRentProperties와 동일:
+    매매 region_name_area_m2, 전월세는 뒤에 rent_type 추가. 단지 속성은 묶음의 첫 항목 기준.
+    history는 최근 거래순 [날짜, 가격, 층] (전월세 [날짜, 보증금, 월세, 층])."""
+    groups = {}
+    for p in items:
+        if kind == "trade":
+            key = (p["region"], p["name"], p["area_m2"])
+        else:
+            key = (p["region"], p["name"], p["area_m2"], p.get("rent_type") or "전세")
+        groups.setdefault(key, []).append(p)
+
+    summaries = []
+    for rows in groups.values():
+        first = rows[0]
+        dates = [r.get("trade_date") or "" for r in rows]
+        history = sorted(rows, key=lambda r: r.get("trade_date") or "", reverse=True)
+        summary = {
+            "name": first["name"],
+            "region": first["region"],
+            "dong": first.get("dong") or "",
+            "area_m2": first["area_m2"],
+            "area_py": first["area_py"],
+            "station": first.get("station") or "",
+            "line": first.get("line") or "",
+            "walk_min": first.get("walk_min"),
+            "built_year": first.get("built_year") or 0,
+            "households": first.get("households") or 0,
+            "lat": first.get("lat") or None,
+            "lon": first.get("lon") or None,
+            "trade_count": len(rows),
+            "latest_date": max(dates),
+        }
+        if kind == "trade":
+            prices = [r["price"] for r in rows]
+            avg = _js_round(sum(prices) / len(prices))
+            summary.update({
+                "regulated": bool(first.get("regulated")),
+                "price": avg,
+                "median_price": _median(prices),
+                "min_price": min(prices),
+                "max_price": max(prices),
+                "price_per_py": _js_round(avg / first["area_py"]) if first["area_py"] and first["area_py"] > 0 else 0,
+                "history": [[r.get("trade_date") or "", r["price"], r.get("floor")] for r in history],
+            })
+        else:
+            deposits = [r.get("deposit") or 0 for r in rows]
+            monthlys = [r.get("monthly_rent") or 0 for r in rows]
+            summary.update({
+                "rent_type": first.get("rent_type") or "전세",
+                "deposit": _js_round(sum(deposits) / len(deposits)),
+                "monthly_rent": _js_round(sum(monthlys) / len(monthlys)),
+                "median_deposit": _median(deposits),
+                "min_deposit": min(deposits),
+                "max_deposit": max(deposits),
+                "history": [
+                    [r.get("trade_date") or "", r.get("deposit") or 0, r.get("monthly_rent") or 0, r.get("floor")]
+                    for r in history
+                ],
+            })
+        summaries.append(summary)
 
+    price_field = "price" if kind == "trade" else "deposit"
+    return sorted(summaries, key=lambda s: s[price_field])
 
-# ─── data.json / data-rent.json 로드/저장 ───
-def load_data_json(path):
-    if path.exists():
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"updated_at": "", "properties": []}
 
+def build_jeonse_index(trade_summaries):
+    """매매 단지 요약 → {(지역, 동, 단지명): ([평형...], [평균 매매가...])} (평형 오름차순).
+    같은 평형에 묶음이 여럿이면 묶음 평균가의 평균."""
+    groups = {}
+    for s in trade_summaries:
+        key = (s["region"], s["dong"], s["name"])
+        groups.setdefault(key, {}).setdefault(float(s["area_py"] or 0), []).append(s["price"])
+    index = {}
+    for key, by_area in groups.items():
+        areas = sorted(by_area)
+        index[key] = (areas, [_js_round(sum(by_area[a]) / len(by_area[a])) for a in areas])
+    return index
+
+
+def jeonse_rate(index, summary):
+    """전세 단지 요약의 전세가율(%) — 같은 단지의 가장 가까운 평형(±JEONSE_AREA_TOLERANCE_PY)을
+    이진 탐색으로 찾음. 매매 단지가 없거나 범위 밖이면 None. 동률이면 작은 평형."""
+    entry = index.get((summary["region"], summary["dong"], summary["name"]))
+    if not entry:
+        return None
+    areas, prices = entry
+    py = float(summary["area_py"] or 0)
+    i = bisect.bisect_left(areas, py)
+    best = None
+    for j in (i - 1, i):
+        if 0 <= j < len(areas) and abs(areas[j] - py) <= JEONSE_AREA_TOLERANCE_PY:
+            if best is None or abs(areas[j] - py) < abs(areas[best] - py):
+                best = j
+    if best is None or not prices[best]:
+        return None
+    return _js_round(summary["deposit"] / prices[best] * 100)
+
+
+def encode_columnar(records, fields):
+    """레코드 목록 → {"fields", "dicts", "columns"} 열 단위 표현.
+    COLUMNAR_DICT_FIELDS 열은 값 대신 dicts[필드]의 번호."""
+    dicts, columns = {}, {}
+    for field in fields:
+        values = [r.get(field) for r in records]
+        if field in COLUMNAR_DICT_FIELDS:
+            lookup = {}
+            columns[field] = [lookup.setdefault(v, len(lookup)) for v in values]
+            dicts[field] = list(lookup)
+        elif field == "regulated":
+            columns[field] = [int(bool(v)) for v in values]
+        else:
+            columns[field] = values
+    return {"format": "columnar", "count": len(records), "fields": list(fields), "dicts": dicts, "columns": columns}
+
+
+def _write_if_changed(path, data):
+    if not path.exists() or path.read_bytes() != data:
+        path.write_bytes(data)
+
+
+def save_region_shards(exports, region_codes, updated_at, columnar=True, rows=None, price_stats=None):
+    """지역별 분할 파일 + manifest 저장.
+    exports: {"trade"|"rent": (항목 목록, 신규 건수)}
+    shard 파일에는 지역의 단지 요약(summarize_complexes)만 담아 내용이 그대로면 파일도 그대로
+    → 갱신 시각·건수·경계는 manifest에만.
+    columnar=True면 encode_columnar 형식 + 미리 gzip 압축한 .json.gz 도 함께 저장
+    (브라우저가 DecompressionStream으로 풀고, 지원하지 않으면 .json 사용).
+    app.js는 manifest를 먼저 받고 선택한 지역의 shard만 불러온다 (hash로 브라우저 캐시 무효화).
+    rows: export_rows 결과 {kind: {...}} — 원본 항목 스냅샷/delta 위치를 manifest에 함께 기록.
+    전세 요약에는 전세가율(jeonse_rate)을 미리 계산해 넣는다 (manifest rent.jeonse_rate=true).
+    price_stats: {kind: PriceStats} — 있으면 요약마다 이상가격 여부(anomaly)·로버스트 z(price_z)를 붙인다
+    (manifest {kind}.anomaly=true, app.js는 브라우저 계산 생략)."""
+    SHARD_DIR.mkdir(exist_ok=True)
+    manifest = {"updated_at": updated_at}
+    if rows:
+        manifest["rows"] = rows
+    written = set()
+    regions = {}
+    summaries_by = {}
+    for kind, (properties, _) in exports.items():
+        by_region = regions[kind] = {}
+        for p in properties:
+            by_region.setdefault(p["region"], []).append(p)
+        summaries_by[kind] = {region: summarize_complexes(kind, items) for region, items in by_region.items()}
+
+    # 전세 요약에 전세가율을 미리 붙임 (매매 요약 기준, 브라우저는 매매 shard 없이도 표시)
+    jeonse_index = build_jeonse_index(
+        [s for summaries in summaries_by.get("trade", {}).values() for s in summaries])
+    matched = total = 0
+    for summaries in summaries_by.get("rent", {}).values():
+        for s in summaries:
+            s["jeonse_rate"] = jeonse_rate(jeonse_index, s) if s["rent_type"] == "전세" else None
+            if s["rent_type"] == "전세":
+                total += 1
+                matched += s["jeonse_rate"] is not None
+    if "rent" in exports:
+        print(f"  [data] 전세가율 매칭: {matched}/{total}건")
+
+    for kind, stats in (price_stats or {}).items():
+        flagged = 0
+        for summaries in summaries_by.get(kind, {}).values():
+            for s in summaries:
+                score = stats.score(s)
+                s["anomaly"] = bool(score and score["anomaly"])
+                s["price_z"] = score["z"] if score else None
+                flagged += s["anomaly"]
+        if kind in exports:
+            print(f"  [data] {kind} 이상가격: {flagged}건")
+
+    for kind, (properties, new_count) in exports.items():
+        by_region = regions[kind]
+        shards = []
+        for region in sorted(by_region):
+            items = by_region[region]
+            code = region_codes.get(region) or hashlib.sha1(region.encode("utf-8")).hexdigest()[:10]
+            file_name = f"{kind}-{code}.json"
+            summaries = summaries_by[kind][region]
+            payload = {"region": region}
+            if columnar:
+                payload.update(encode_columnar(summaries, SUMMARY_FIELDS[kind]))
+            else:
+                payload["complexes"] = summaries
+            body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            _write_if_changed(SHARD_DIR / file_name, body)
+            written.add(file_name)
+            shard = {
+                "region": region,
+                "file": file_name,
+                "count": len(items),
+                "complexes": len(summaries),
+                "latest_date": max((p.get("trade_date") or "" for p in items), default=""),
+                "bounds": _shard_bounds(items),
+                "hash": hashlib.sha1(body).hexdigest()[:12],
+            }
+            if columnar:
+                # mtime=0 → 같은 내용이면 같은 바이트 (불필요한 커밋 방지)
+                _write_if_changed(SHARD_DIR / f"{file_name}.gz", gzip.compress(body, 9, mtime=0))
+                written.add(f"{file_name}.gz")
+                shard["gz"] = f"{file_name}.gz"
+            shards.append(shard)
+        manifest[kind] = {
+            "total_count": len(properties),
+            "new_count": new_count,
+            "format": "columnar" if columnar else "summary",
+            "shards": shards,
+        }
+        if kind == "rent":
+            manifest[kind]["jeonse_rate"] = True
+        if price_stats and kind in price_stats:
+            manifest[kind]["anomaly"] = True
 
-def save_data_json(data, path):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"  [data] {path.name} 저장 완료 ({len(data['properties'])}건)")
+    # 수집 대상에서 빠진 지역의 옛 shard 정리
+    for path in [*SHARD_DIR.glob("*-*.json"), *SHARD_DIR.glob("*-*.json.gz")]:
+        if path.name not in written:
+            path.unlink()
+    store_db.write_json(manifest, SHARD_MANIFEST_PATH)
+    print(f"  [data] {SHARD_DIR.name}/ 지역별 분할 저장 완료 ({len(written)}개 파일)")
 
 
 def load_flagship_config():
@@ -254,16 +551,8 @@ def load_flagship_config():
         return json.load(f)
 
 
-def load_flagship_history():
-    if FLAGSHIP_HISTORY_PATH.exists():
-        with open(FLAGSHIP_HISTORY_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"updated_at": "", "watchlist": []}
-
-
 def save_flagship_history(data):
-    with open(FLAGSHIP_HISTORY_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    store_db.write_json(data, FLAGSHIP_HISTORY_PATH)
 
 
 def update_flagship_from_trades(raw_trades_by_code, flagship_config, flagship_history, kst_now):
@@ -333,89 +622,180 @@ def update_flagship_from_trades(raw_trades_by_code, flagship_config, flagship_hi
     return flagship_history
 
 
-def fetch_region_apt_list(api_key, sigungu_code, apt_list_cache):
-    if sigungu_code in apt_list_cache:
-        return apt_list_cache[sigungu_code]
-
-    url = "https://apis.data.go.kr/1613000/AptListService3/getSigunguAptList3"
-    all_items = []
-    page = 1
-
-    while True:
-        params = {
-            "serviceKey": api_key,
-            "sigunguCode": sigungu_code,
-            "numOfRows": "200",
-            "pageNo": str(page),
-            "type": "json"
-        }
-        try:
-            resp = requests.get(url, params=params, timeout=15)
-            data = resp.json()
-            items = data.get("response", {}).get("body", {}).get("items", [])
-            if not items:
-                break
-            if isinstance(items, dict):
-                items = [items]
-            all_items.extend(items)
-            total = data.get("response", {}).get("body", {}).get("totalCount", 0)
-            if len(all_items) >= total:
-                break
-            page += 1
-        except Exception as e:
-            print(f"    [목록조회 실패] {sigungu_code}: {e}")
-            break
-
-    apt_list_cache[sigungu_code] = all_items
-    print(f"    [목록] {sigungu_code}: {len(all_items)}개 단지 로드")
-    return all_items
+def _apt_list_due(sigungu_code, updated_at, now, days):
+    """마지막 확인 후 days일(+시군구별 0~47시간 시차)이 지났는지. 시차 덕분에 전 지역이 같은 날 몰려서 갱신되지 않는다."""
+    if not updated_at:
+        return True
+    stagger = int(hashlib.sha1(sigungu_code.encode("utf-8")).hexdigest(), 16) % APT_LIST_STAGGER_HOURS
+    return now - datetime.fromisoformat(updated_at) >= timedelta(days=days, hours=stagger)
+
+
+def _items_hash(items):
+    return hashlib.sha1(json.dumps(items, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
 
 
-def find_kapt_code(apt_name, apt_list):
-    def clean(name):
-        return name.replace(" ", "").replace("(", "").replace(")", "").lower()
+def _fetch_apt_list_page(api_key, sigungu_code, page, etag=None):
+    """(items, totalCount, ETag). 서버가 304를 주면 items는 None."""
+    params = {
+        "serviceKey": api_key,
+        "sigunguCode": sigungu_code,
+        "numOfRows": str(APT_LIST_PAGE_SIZE),
+        "pageNo": str(page),
+        "type": "json"
+    }
+    headers = {"If-None-Match": etag} if etag else None
+    resp = molit_api.get(APT_LIST_URL, params=params, timeout=15, headers=headers)
+    if resp.status_code == 304:
+        return None, None, etag
+    body = resp.json().get("response", {}).get("body", {})
+    items = body.get("items", []) or []
+    if isinstance(items, dict):
+        items = [items]
+    return items, int(body.get("totalCount", 0) or 0), resp.headers.get("ETag")
 
-    clean_name = clean(apt_name)
 
-    for apt in apt_list:
-        if clean(apt.get("kaptName", "")) == clean_name:
-            return apt["kaptCode"]
+_apt_list_failed = {}  # 이번 실행에서 조회 실패한 시군구 → 대체 목록 (재시도 폭주 방지)
 
-    for apt in apt_list:
-        kname = clean(apt.get("kaptName", ""))
-        if clean_name in kname or kname in clean_name:
-            return apt["kaptCode"]
 
-    name_words = [w for w in clean_name if len(w) >= 2]
-    best_score = 0
-    best_code = None
-    for apt in apt_list:
-        kname = clean(apt.get("kaptName", ""))
-        score = sum(1 for w in name_words if w in kname)
-        if score > best_score:
-            best_score = score
-            best_code = apt["kaptCode"]
+def fetch_region_apt_list(api_key, sigungu_code, apt_list_cache):
+    """시군구 단지 목록. DB에 저장된 목록은 주 1회 변경 여부만 확인한다.
+    - 1페이지 + totalCount(+ETag)가 그대로면 나머지 페이지는 받지 않음
+    - 4주마다는 전체를 받아 해시 비교 (1페이지 밖의 변경 반영)
+    - 2페이지 이후는 병렬 조회"""
+    if sigungu_code in _apt_list_failed:
+        return _apt_list_failed[sigungu_code]
+
+    cached = apt_list_cache.get(sigungu_code)
+    meta = apt_list_cache.meta.get(sigungu_code, {})
+    now = datetime.now()
+    if cached is not None and not _apt_list_due(sigungu_code, apt_list_cache.updated_at.get(sigungu_code), now, APT_LIST_REFRESH_DAYS):
+        return cached
+
+    full_due = _apt_list_due(sigungu_code, meta.get("full_at"), now, APT_LIST_FULL_REFRESH_DAYS)
+    try:
+        first, total, etag = _fetch_apt_list_page(api_key, sigungu_code, 1, meta.get("etag") if cached is not None else None)
+        if first is None:
+            apt_list_cache.touch(sigungu_code)
+            print(f"    [목록] {sigungu_code}: 변경 없음 (ETag, {len(cached)}개 단지)")
+            return cached
+
+        page1_hash = _items_hash(first)
+        if (cached is not None and not full_due
+                and total == meta.get("total") and page1_hash == meta.get("page1_hash")):
+            apt_list_cache.touch(sigungu_code, {**meta, "etag": etag})
+            print(f"    [목록] {sigungu_code}: 변경 없음 ({len(cached)}개 단지)")
+            return cached
+
+        all_items = list(first)
+        pages = range(2, math.ceil(total / APT_LIST_PAGE_SIZE) + 1)
+        if pages and first:
+            with ThreadPoolExecutor(max_workers=min(len(pages), APT_LIST_PAGE_WORKERS)) as pool:
+                for items, _, _ in pool.map(lambda p: _fetch_apt_list_page(api_key, sigungu_code, p), pages):
+                    all_items.extend(items or [])
+    except Exception as e:
+        print(f"    [목록조회 실패] {sigungu_code}: {e}")
+        fallback = cached if cached is not None else []
+        _apt_list_failed[sigungu_code] = fallback
+        return fallback
+
+    new_meta = {
+        "total": total,
+        "page1_hash": page1_hash,
+        "hash": _items_hash(all_items),
+        "etag": etag,
+        "full_at": now.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    if cached is not None and new_meta["hash"] == meta.get("hash"):
+        apt_list_cache.touch(sigungu_code, new_meta)
+        print(f"    [목록] {sigungu_code}: 변경 없음 (전체 확인, {len(cached)}개 단지)")
+        return cached
+
+    apt_list_cache.put(sigungu_code, all_items, new_meta)
+    print(f"    [목록] {sigungu_code}: {len(all_items)}개 단지 로드")
+    return all_items
 
-    if best_score >= 2:
-        return best_code
 
-    return None
+def clean_apt_name(name):
+    return name.replace(" ", "").replace("(", "").replace(")", "").lower()
+
+
+def _bigrams(s):
+    return {s[i:i + 2] for i in range(len(s) - 1)}
+
+
+class AptNameIndex:
+    """시군구 단지 목록의 kaptName 인덱스: 정규화 이름 exact 맵 + 2-gram 역색인.
+    후보는 목록 순서(번호)로 다뤄 기존 선형 탐색과 같은 단지를 고른다."""
+
+    def __init__(self, apt_list):
+        self.source = apt_list
+        self.names = []      # 번호 → 정규화 이름
+        self.codes = []      # 번호 → kaptCode
+        self.exact = {}      # 정규화 이름 → 첫 번호
+        self.postings = {}   # 2-gram → [번호, ...]
+        self.short = []      # 2-gram이 없는(한 글자 이하) 이름 번호
+        for apt in apt_list:
+            i = len(self.names)
+            name = clean_apt_name(apt.get("kaptName", ""))
+            self.names.append(name)
+            self.codes.append(apt.get("kaptCode"))
+            self.exact.setdefault(name, i)
+            grams = _bigrams(name)
+            if not grams:
+                self.short.append(i)
+            for g in grams:
+                self.postings.setdefault(g, []).append(i)
+
+    def find(self, apt_name):
+        clean_name = clean_apt_name(apt_name)
+
+        # 1) 정규화 이름 일치
+        i = self.exact.get(clean_name)
+        if i is not None:
+            return self.codes[i]
+
+        # 2) 한쪽이 다른 쪽을 포함 — 2-gram을 하나라도 공유하는 단지(+ 짧은 이름)만 실제 비교
+        grams = _bigrams(clean_name)
+        scores = {}
+        for g in grams:
+            for j in self.postings.get(g, ()):
+                scores[j] = scores.get(j, 0) + 1
+        candidates = set(scores) | set(self.short)
+        if len(clean_name) < 2:
+            candidates = range(len(self.names))
+        for j in sorted(candidates):
+            kname = self.names[j]
+            if clean_name in kname or kname in clean_name:
+                return self.codes[j]
+
+        # 3) 2-gram 겹침 점수: 2개 이상 + 검색어 2-gram의 2/3 이상 공유 ("…아파트" 공통 접미사만 겹치는 경우 배제)
+        if scores:
+            best = min(scores, key=lambda j: (-scores[j], j))
+            if scores[best] >= 2 and scores[best] * 3 >= len(grams) * 2:
+                return self.codes[best]
 
+        return None
 
-def get_apt_household_count(api_key, apt_name, sigungu_code, apt_info_cache, apt_list_cache):
-    cache_key = f"{sigungu_code}_{apt_name}"
-    if cache_key in apt_info_cache:
-        return apt_info_cache[cache_key]
 
+_apt_name_indexes = {}
+
+
+def get_apt_name_index(api_key, sigungu_code, apt_list_cache):
     apt_list = fetch_region_apt_list(api_key, sigungu_code, apt_list_cache)
-    kapt_code = find_kapt_code(apt_name, apt_list)
+    index = _apt_name_indexes.get(sigungu_code)
+    if index is None or index.source is not apt_list:
+        index = AptNameIndex(apt_list)
+        _apt_name_indexes[sigungu_code] = index
+    return index
+
+
+def find_kapt_code(apt_name, apt_index):
+    return apt_index.find(apt_name)
 
-    if not kapt_code:
-        print(f"    [세대수] {apt_name}: 단지코드 못 찾음")
-        result = {"세대수": 0, "단지코드": ""}
-        apt_info_cache[cache_key] = result
-        return result
 
+def fetch_apt_basis(api_key, apt_name, kapt_code):
+    """단지 기본정보 API로 세대수 조회 → ({"세대수", "단지코드"}, 실패 사유).
+    실패 사유: 세대수를 못 얻었고 재시도해도 같을 가능성이 큰 경우만 문자열, 일시 오류는 None."""
     url = "https://apis.data.go.kr/1613000/AptBasisInfoServiceV4/getAphusBassInfoV4"
     params = {
         "serviceKey": api_key,
@@ -424,147 +804,244 @@ def get_apt_household_count(api_key, apt_name, sigungu_code, apt_info_cache, apt
     }
 
     try:
-        resp = requests.get(url, params=params, timeout=10)
+        resp = molit_api.get(url, params=params, timeout=10)
         data = resp.json()
         item = data.get("response", {}).get("body", {}).get("item", {})
         household = int(float(item.get("kaptdaCnt", 0) or 0))
-        result = {"세대수": household, "단지코드": kapt_code}
-        apt_info_cache[cache_key] = result
         print(f"    [세대수] {apt_name} → {household}세대")
-        return result
+        return {"세대수": household, "단지코드": kapt_code}, (None if household > 0 else "기본정보 세대수 없음")
 
     except Exception as e:
         print(f"    [세대수 조회 실패] {apt_name}: {e}")
 
-    result = {"세대수": 0, "단지코드": kapt_code}
-    apt_info_cache[cache_key] = result
-    return result
+    return {"세대수": 0, "단지코드": kapt_code}, None
+
+
+def get_apt_household_count(api_key, apt_name, sigungu_code, apt_info_cache, apt_list_cache, negative_cache):
+    return resolve_households(
+        api_key, [(sigungu_code, apt_name)], apt_info_cache, apt_list_cache, negative_cache
+    )[(sigungu_code, apt_name)]
+
+
+def resolve_households(api_key, pairs, apt_info_cache, apt_list_cache, negative_cache, workers=ENRICH_WORKERS):
+    """(시군구 코드, 단지명) 목록의 세대수를 일괄 조회 → {(코드, 단지명): {"세대수", "단지코드"}}
+    세대수를 아는 단지와 재시도 대기 중인 실패 단지는 건너뛰고, 나머지만:
+    시군구 목록/인덱스 준비(병렬) → 단지코드 매칭 → 기본정보 API 병렬 호출.
+    성공은 apt_info_cache, 실패는 사유와 함께 negative_cache(1일 → 3일 → 7일 … 후 재시도)에 기록."""
+    pairs = list(dict.fromkeys(pairs))
+    results = {}
+    pending = []
+    for code, name in pairs:
+        cache_key = f"{code}_{name}"
+        info = apt_info_cache.get(cache_key)
+        if info and info.get("세대수", 0) > 0:
+            results[(code, name)] = info
+        elif negative_cache.blocked("apt_info", cache_key):
+            results[(code, name)] = info or {"세대수": 0, "단지코드": ""}
+        else:
+            pending.append((code, name))
+
+    def fail(code, name, result, reason):
+        cache_key = f"{code}_{name}"
+        results[(code, name)] = result
+        if reason:
+            negative_cache.record("apt_info", cache_key, reason)
+        if cache_key in apt_info_cache:
+            del apt_info_cache[cache_key]  # 구버전의 세대수 0 기록은 실패 기록으로 대체
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            codes = sorted({code for code, _ in pending})
+            indexes = dict(zip(codes, pool.map(lambda c: get_apt_name_index(api_key, c, apt_list_cache), codes)))
+
+            lookups = []
+            for code, name in pending:
+                kapt_code = find_kapt_code(name, indexes[code])
+                if kapt_code:
+                    lookups.append((code, name, kapt_code))
+                elif indexes[code].names:
+                    print(f"    [세대수] {name}: 단지코드 못 찾음")
+                    fail(code, name, {"세대수": 0, "단지코드": ""}, "단지코드 매칭 실패")
+                else:
+                    fail(code, name, {"세대수": 0, "단지코드": ""}, None)  # 목록 자체를 못 받음 → 다음 실행에서 재시도
+
+            def lookup(job):
+                code, name, kapt_code = job
+                result, reason = fetch_apt_basis(api_key, name, kapt_code)
+                if result["세대수"] > 0:
+                    apt_info_cache[f"{code}_{name}"] = result
+                    negative_cache.clear("apt_info", f"{code}_{name}")
+                    results[(code, name)] = result
+                else:
+                    fail(code, name, result, reason)
 
+            list(pool.map(lookup, lookups))
 
-# ─── 매매 실거래 API ───
-def fetch_trades(api_key, region_code, deal_ymd):
-    url = "https://apis.data.go.kr/1613000/RTMSDataSvcAptTradeDev/getRTMSDataSvcAptTradeDev"
-    params = {
-        "serviceKey": api_key,
-        "LAWD_CD": region_code,
-        "DEAL_YMD": deal_ymd,
-        "pageNo": "1",
-        "numOfRows": "9999"
-    }
+    return {pair: results[pair] for pair in pairs}
 
-    try:
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        print(f"  [오류] 매매 API 호출 실패 ({region_code}): {e}")
-        return []
 
+# ─── 실거래 XML 스트리밍 조회 공통 ───
+def _stream_rtms_items(url, params, label, region_code, failures=None):
+    """RTMS 응답(캐시 또는 네트워크, 전 페이지)을 <item> 필드 dict로 하나씩 yield.
+    오류는 로그만 남기고 종료(failures 목록이 주어지면 예외를 덧붙임 — 일부만 받은 달 구분용).
+    호출 한도 초과(QuotaExceeded)는 그대로 올려 실행을 중단시킨다."""
     try:
-        root = ET.fromstring(response.text)
-    except ET.ParseError:
-        print(f"  [오류] XML 파싱 실패 ({region_code})")
-        return []
+        yield from molit_api.fetch_all_items(url, params, timeout=30)
+    except (ET.ParseError, molit_api.ApiError, requests.exceptions.RequestException) as e:
+        if isinstance(e, ET.ParseError):
+            print(f"  [오류] {label} XML 파싱 실패 ({region_code})")
+        elif isinstance(e, molit_api.ApiError):
+            print(f"  [오류] {label} API 에러 ({region_code}): {e.message}")
+        else:
+            print(f"  [오류] {label} API 호출 실패 ({region_code}): {e}")
+        if failures is not None:
+            failures.append(e)
 
-    result_code = root.findtext(".//resultCode")
-    if result_code and result_code not in ("00", "000"):
-        result_msg = root.findtext(".//resultMsg", "알 수 없는 오류")
-        print(f"  [오류] API 에러 ({region_code}): {result_msg}")
-        return []
 
-    items = root.findall(".//item")
-    trades = []
+def _text(fields, tag):
+    return (fields.get(tag) or "").strip()
 
-    for item in items:
-        try:
-            trade = {
-                "아파트": (item.findtext("aptNm") or "").strip(),
-                "면적": float(item.findtext("excluUseAr") or 0),
-                "거래금액": int((item.findtext("dealAmount") or "0").strip().replace(",", "")),
-                "층": int(item.findtext("floor") or 0),
-                "건축년도": int(item.findtext("buildYear") or 0),
-                "거래년도": int(item.findtext("dealYear") or 0),
-                "거래월": int(item.findtext("dealMonth") or 0),
-                "거래일": int(item.findtext("dealDay") or 0),
-                "법정동": (item.findtext("umdNm") or "").strip(),
-                "지번": (item.findtext("jibun") or "").strip(),
-                "도로명": (item.findtext("roadNm") or "").strip(),
-            }
-            trades.append(trade)
-        except (ValueError, TypeError):
-            continue
 
-    return trades
+def _int(fields, tag):
+    return int(_text(fields, tag).replace(",", "") or 0)
 
 
-# ─── 전월세 실거래 API ───
-def fetch_rent_trades(api_key, region_code, deal_ymd):
-    """국토부 아파트 전월세 실거래 API 호출"""
-    url = "https://apis.data.go.kr/1613000/RTMSDataSvcAptRent/getRTMSDataSvcAptRent"
+def _float(fields, tag):
+    return float(_text(fields, tag) or 0)
+
+
+# ─── 매매 실거래 API ───
+def parse_trade_item(fields):
+    return {
+        "아파트": _text(fields, "aptNm"),
+        "면적": _float(fields, "excluUseAr"),
+        "거래금액": _int(fields, "dealAmount"),
+        "층": _int(fields, "floor"),
+        "건축년도": _int(fields, "buildYear"),
+        "거래년도": _int(fields, "dealYear"),
+        "거래월": _int(fields, "dealMonth"),
+        "거래일": _int(fields, "dealDay"),
+        "법정동": _text(fields, "umdNm"),
+        "지번": _text(fields, "jibun"),
+        "도로명": _text(fields, "roadNm"),
+    }
+
+
+def iter_trades(api_key, region_code, deal_ymd, failures=None):
+    """매매 실거래 스트리밍 조회 — 거래 dict를 하나씩 yield (filter_trades에 바로 연결 가능)"""
     params = {
         "serviceKey": api_key,
         "LAWD_CD": region_code,
         "DEAL_YMD": deal_ymd,
-        "pageNo": "1",
-        "numOfRows": "9999"
     }
+    for fields in _stream_rtms_items(TRADE_API_URL, params, "매매", region_code, failures):
+        try:
+            yield parse_trade_item(fields)
+        except (ValueError, TypeError):
+            continue
 
-    try:
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        print(f"  [오류] 전월세 API 호출 실패 ({region_code}): {e}")
-        return []
 
-    try:
-        root = ET.fromstring(response.text)
-    except ET.ParseError:
-        print(f"  [오류] 전월세 XML 파싱 실패 ({region_code})")
-        return []
+def fetch_trades(api_key, region_code, deal_ymd, failures=None):
+    return list(iter_trades(api_key, region_code, deal_ymd, failures))
+
 
-    result_code = root.findtext(".//resultCode")
-    if result_code and result_code not in ("00", "000"):
-        result_msg = root.findtext(".//resultMsg", "알 수 없는 오류")
-        print(f"  [오류] 전월세 API 에러 ({region_code}): {result_msg}")
-        return []
+# ─── 전월세 실거래 API ───
+def parse_rent_item(fields):
+    # 보증금(만원), 월세(만원)
+    monthly_rent = _int(fields, "monthlyRent")
+    return {
+        "아파트": _text(fields, "aptNm"),
+        "면적": _float(fields, "excluUseAr"),
+        "보증금": _int(fields, "deposit"),
+        "월세": monthly_rent,
+        "전월세구분": "전세" if monthly_rent == 0 else "월세",
+        "층": _int(fields, "floor"),
+        "건축년도": _int(fields, "buildYear"),
+        "거래년도": _int(fields, "dealYear"),
+        "거래월": _int(fields, "dealMonth"),
+        "거래일": _int(fields, "dealDay"),
+        "법정동": _text(fields, "umdNm"),
+        "지번": _text(fields, "jibun"),
+        "도로명": _text(fields, "roadNm"),
+        "계약기간": _text(fields, "contractTerm"),
+        "갱신여부": _text(fields, "renewalUseYn"),
+        "이전보증금": _text(fields, "preDeposit"),
+        "이전월세": _text(fields, "preMonthlyRent"),
+    }
 
-    items = root.findall(".//item")
-    trades = []
 
-    for item in items:
+def iter_rent_trades(api_key, region_code, deal_ymd, failures=None):
+    """국토부 아파트 전월세 실거래 스트리밍 조회"""
+    params = {
+        "serviceKey": api_key,
+        "LAWD_CD": region_code,
+        "DEAL_YMD": deal_ymd,
+    }
+    for fields in _stream_rtms_items(RENT_API_URL, params, "전월세", region_code, failures):
         try:
-            # 보증금(만원), 월세(만원)
-            deposit = int((item.findtext("deposit") or "0").strip().replace(",", ""))
-            monthly_rent = int((item.findtext("monthlyRent") or "0").strip().replace(",", ""))
-
-            trade = {
-                "아파트": (item.findtext("aptNm") or "").strip(),
-                "면적": float(item.findtext("excluUseAr") or 0),
-                "보증금": deposit,
-                "월세": monthly_rent,
-                "전월세구분": "전세" if monthly_rent == 0 else "월세",
-                "층": int(item.findtext("floor") or 0),
-                "건축년도": int(item.findtext("buildYear") or 0),
-                "거래년도": int(item.findtext("dealYear") or 0),
-                "거래월": int(item.findtext("dealMonth") or 0),
-                "거래일": int(item.findtext("dealDay") or 0),
-                "법정동": (item.findtext("umdNm") or "").strip(),
-                "지번": (item.findtext("jibun") or "").strip(),
-                "도로명": (item.findtext("roadNm") or "").strip(),
-                "계약기간": (item.findtext("contractTerm") or "").strip(),
-                "갱신여부": (item.findtext("renewalUseYn") or "").strip(),
-                "이전보증금": (item.findtext("preDeposit") or "").strip(),
-                "이전월세": (item.findtext("preMonthlyRent") or "").strip(),
-            }
-            trades.append(trade)
+            yield parse_rent_item(fields)
         except (ValueError, TypeError):
             continue
 
-    return trades
+
+def fetch_rent_trades(api_key, region_code, deal_ymd, failures=None):
+    """국토부 아파트 전월세 실거래 API 호출"""
+    return list(iter_rent_trades(api_key, region_code, deal_ymd, failures))
+
+
+# ─── 지역×월 병렬 수집 ───
+def collect_jobs(regions, months):
+    """중복 없는 (region_code, month, "trade"|"rent") 조회 목록"""
+    jobs = []
+    seen = set()
+    for region in regions:
+        for kind in ("trade", "rent"):
+            for month in months:
+                job = (region["code"], month, kind)
+                if job not in seen:
+                    seen.add(job)
+                    jobs.append(job)
+    return jobs
+
+
+def collection_plan(regions, months):
+    """molit_api.ensure_quota()용 [(url, params), ...] 조회 계획"""
+    urls = {"trade": TRADE_API_URL, "rent": RENT_API_URL}
+    return [
+        (urls[kind], {"LAWD_CD": region_code, "DEAL_YMD": month})
+        for region_code, month, kind in collect_jobs(regions, months)
+    ]
 
 
-def filter_trades(trades, filters):
+def collect_trades(api_key, regions, months, workers=COLLECT_WORKERS, per_host=COLLECT_PER_HOST, failed=None, jobs=None):
+    """(지역코드, 월, 매매/전월세) 단위 조회를 병렬 실행. 호스트당 동시 요청은 molit_api가 제한.
+    반환: {(region_code, month, "trade"|"rent"): [거래, ...]} — 병합 순서는 호출 측에서 결정.
+    failed(set)가 주어지면 조회 중 오류가 난 작업을 담는다. jobs로 collect_jobs() 대신 조회할 목록 지정 가능."""
+    fetchers = {"trade": fetch_trades, "rent": fetch_rent_trades}
+    if jobs is None:
+        jobs = collect_jobs(regions, months)
+    molit_api.configure(per_host=per_host)
+
+    def run(job):
+        region_code, month, kind = job
+        failures = []
+        items = fetchers[kind](api_key, region_code, month, failures)
+        if failures and failed is not None:
+            failed.add(job)
+        return items
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, int(workers))) as executor:
+        futures = {executor.submit(run, job): job for job in jobs}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
+
+
+def filter_trades(trades, filters, now):
+    """max_days_ago 기준일은 발송 키 만료(db.expire_sent)와 같은 now(KST)로 센다"""
     filtered = []
-    today = datetime.now().date()
+    today = now.date()
     max_days = filters.get("max_days_ago", 30)
 
     for t in trades:
@@ -588,10 +1065,10 @@ def filter_trades(trades, filters):
     return filtered
 
 
-def filter_rent_trades(trades, filters):
-    """전월세 거래 필터링"""
+def filter_rent_trades(trades, filters, now):
+    """전월세 거래 필터링 (기준일은 filter_trades와 같은 now)"""
     filtered = []
-    today = datetime.now().date()
+    today = now.date()
     max_days = filters.get("max_days_ago", 30)  # 전세는 30일로 넓게
 
     rent_filters = filters.get("rent", {})
@@ -628,6 +1105,10 @@ def make_rent_trade_id(trade, region_name):
     return f"R_{region_name}_{trade['아파트']}_{trade['면적']}_{trade['보증금']}_{trade['월세']}_{trade['층']}_{trade['거래년도']}{trade['거래월']:02d}{trade['거래일']:02d}"
 
 
+def trade_date_of(trade):
+    return f"{trade['거래년도']}-{trade['거래월']:02d}-{trade['거래일']:02d}"
+
+
 EXCLUDE_KEYWORDS = [
     # 비아파트
     "오피스텔", "주상복합", "도시형", "빌라", "타운하우스", "상가",
@@ -654,18 +1135,26 @@ def is_excluded_apt(apt_name):
     return False
 
 # ─── 카카오 API로 주소 → 좌표 변환 ───
-def get_coordinates(kakao_key, address, coord_cache):
+def coord_cache_key(address):
     # 법정동 제거: "경기 수원시 장안구 정자동 동신2단지" → "경기 수원시 장안구 동신2단지"
     # 동명이인 지역(예: 분당 정자동 vs 수원 정자동) 바이어스 방지
     parts = address.split()
-    query = " ".join(parts[:-2] + parts[-1:]) if len(parts) >= 3 else address
+    return " ".join(parts[:-2] + parts[-1:]) if len(parts) >= 3 else address
+
+
+def get_coordinates(kakao_key, address, coord_cache, negative_cache):
+    query = coord_cache_key(address)
 
     # 캐시 조회 (법정동 제거된 키 우선, 기존 키 fallback)
     if query in coord_cache:
         return coord_cache[query]
     if address in coord_cache:
         return coord_cache[address]
+    # 최근에 주소·키워드 모두 결과 없었던 단지는 재시도 시각까지 호출하지 않음
+    if negative_cache.blocked("geocode", query):
+        return None
 
+    errors = []
     headers = {"Authorization": f"KakaoAK {kakao_key}"}
 
     # 1차: 주소 검색
@@ -677,9 +1166,10 @@ def get_coordinates(kakao_key, address, coord_cache):
             doc = data["documents"][0]
             result = {"lat": float(doc["y"]), "lon": float(doc["x"])}
             coord_cache[query] = result
+            negative_cache.clear("geocode", query)
             return result
-    except Exception:
-        pass
+    except Exception as e:
+        errors.append(e)
 
     # 2차: 키워드 검색
     url2 = "https://dapi.kakao.com/v2/local/search/keyword.json"
@@ -690,31 +1180,87 @@ def get_coordinates(kakao_key, address, coord_cache):
             doc = data["documents"][0]
             result = {"lat": float(doc["y"]), "lon": float(doc["x"])}
             coord_cache[query] = result
+            negative_cache.clear("geocode", query)
             return result
-    except Exception:
-        pass
+    except Exception as e:
+        errors.append(e)
 
+    # 두 검색 모두 정상 응답인데 결과가 없을 때만 실패 기록 (네트워크·인증 오류는 다음 실행에서 재시도)
+    if not errors:
+        negative_cache.record("geocode", query, "주소·키워드 검색 결과 없음")
     return None
 
 
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2
-    return R * 2 * math.asin(math.sqrt(a))
-
-
-def find_nearest_station(lat, lon):
-    nearest = None
-    min_dist = float("inf")
-    for st in STATIONS:
-        dist = haversine(lat, lon, st["lat"], st["lon"])
-        if dist < min_dist:
-            min_dist = dist
-            nearest = st
-    walk_min = round(min_dist * 15)
-    return nearest, min_dist, walk_min
+# ─── 좌표 캐시 접미사 인덱스 (app.js buildCoordIndex와 같은 규칙) ───
+# 캐시 키는 "경기 수원시 장안구 동신2단지"(법정동 제거) 또는 "… 정자동 동신2단지"(구버전) 형태.
+# 키의 단어 경계 접미사("동신2단지", "정자동 동신2단지", …)마다 후보를 걸어 두고 O(1)로 찾는다.
+def build_coord_index(coord_cache):
+    index = {}
+    for key, coord in coord_cache.items():
+        words = key.split()
+        norm_key = normalize_region(key)
+        for i in range(len(words)):
+            index.setdefault(" ".join(words[i:]), []).append((norm_key, coord))
+    return index
+
+
+def normalize_region(s):
+    """지역명 정규화: "수원시 장안구" → "수원 장안구" (시 제거로 축약형 매칭)"""
+    return re.sub(r"\s+", " ", re.sub(r"시(\s|$)", r"\1", s)).strip()
+
+
+def find_cached_coord(coord_index, region, dong, name):
+    # 1순위: 단지명으로 끝나고 정규화된 지역명 포함
+    norm_region = normalize_region(region)
+    for norm_key, coord in coord_index.get(name, ()):
+        if norm_region in norm_key:
+            return coord
+    # 2순위: "법정동 단지명" 접미사 (기존 키 호환)
+    candidates = coord_index.get(f"{dong} {name}".strip())
+    return candidates[0][1] if candidates else None
+
+
+_station_index = None
+
+
+def get_station_index():
+    global _station_index
+    if _station_index is None:
+        _station_index = StationIndex(STATIONS)
+    return _station_index
+
+
+def find_nearest_stations(coords):
+    """[(lat, lon), ...] 배치 조회 → [(역, 거리 km, 도보 분), ...]"""
+    return [(st, dist, round(dist * 15)) for st, dist in get_station_index().nearest_many(coords)]
+
+
+# ─── 단지별 좌표 + 최근접 역 (매매/전월세 공용, STATIONS 버전별 1회 계산) ───
+def get_complex_enrichment(kakao_key, address, coord_cache, enrichment, negative_cache):
+    """저장된 부가정보(좌표 + 역)가 있으면 그대로, 없으면 좌표만 조회해 반환 (역은 add_station_enrichment에서 일괄 계산).
+    좌표를 못 찾으면 None."""
+    key = coord_cache_key(address)
+    if key in enrichment:
+        return enrichment[key]
+    return get_coordinates(kakao_key, address, coord_cache, negative_cache)
+
+
+def add_station_enrichment(pending, enrichment):
+    """[(주소, 좌표), ...] 새로 좌표를 얻은 단지의 최근접 역을 한 번에 계산해 enrichment에 저장 → {주소: 부가정보}"""
+    hits = find_nearest_stations([(coord["lat"], coord["lon"]) for _, coord in pending])
+    infos = {}
+    for (address, coord), (nearest, dist_km, walk_min) in zip(pending, hits):
+        info = {
+            "lat": coord["lat"],
+            "lon": coord["lon"],
+            "station": nearest["name"],
+            "line": nearest["line"],
+            "dist_km": round(dist_km, 3),
+            "walk_min": walk_min,
+        }
+        enrichment[coord_cache_key(address)] = info
+        infos[address] = info
+    return infos
 
 
 # ─── 포맷팅 함수 ───
@@ -727,6 +1273,7 @@ def to_pyeong(m2):
 
 # ─── 단지별 묶기 ───
 def group_by_complex(trades):
+    """매매/전월세 거래를 단지(단지명 + 전용면적)별로 묶기"""
     groups = {}
     for t in trades:
         key = f"{t['아파트']}_{t['면적']}"
@@ -743,94 +1290,73 @@ def group_by_complex(trades):
     return groups
 
 
-def group_rent_by_complex(trades):
-    """전월세 거래를 단지별로 묶기"""
-    groups = {}
-    for t in trades:
-        key = f"{t['아파트']}_{t['면적']}"
-        if key not in groups:
-            groups[key] = {
-                "아파트": t["아파트"],
-                "면적": t["면적"],
-                "건축년도": t["건축년도"],
-                "법정동": t["법정동"],
-                "도로명": t.get("도로명", ""),
-                "거래": []
-            }
-        groups[key]["거래"].append(t)
-    return groups
-
-
-def build_region_data(region_name, complex_groups, kakao_key, coord_cache, sgg_name, api_key, apt_info_cache, min_households, region_code, apt_list_cache):
-    """한 지역의 매매 data.json 저장용 데이터 생성"""
-
-    data_items = []
-    skipped_small = 0
-
-    for key, group in complex_groups.items():
-        apt_name = group["아파트"]
-        if is_excluded_apt(apt_name):
-            continue
-
-        apt_info = get_apt_household_count(api_key, apt_name, region_code, apt_info_cache, apt_list_cache)
-        household = apt_info["세대수"]
-
-        if household > 0 and household < min_households:
-            skipped_small += 1
-            continue
-
-        trades = group["거래"]
-        pyeong = to_pyeong(group["면적"])
-
-        address = f"{sgg_name} {group['법정동']} {apt_name}"
-        coord = get_coordinates(kakao_key, address, coord_cache)
-
-        walk_min = 999
-        nearest_station_name = ""
-        nearest_station_line = ""
-        if coord:
-            nearest, dist_km, walk_min = find_nearest_station(coord["lat"], coord["lon"])
-            nearest_station_name = nearest["name"]
-            nearest_station_line = nearest["line"]
-
-        for t in trades:
-            try:
-                trade_date_str = f"{t['거래년도']}-{t['거래월']:02d}-{t['거래일']:02d}"
-            except (ValueError, TypeError):
-                trade_date_str = ""
+# ─── 단지 부가정보 단계 (매매/전월세 공용) ───
+def collect_complexes(*region_results):
+    """신규 거래에서 부가정보가 필요한 단지 (region_code, sgg_name, 법정동, 단지명) 목록. 매매/전월세 통틀어 중복 제거."""
+    complexes = {}
+    for results in region_results:
+        for rdata in results.values():
+            for t in rdata["trades"]:
+                if is_excluded_apt(t["아파트"]):
+                    continue
+                complexes.setdefault((rdata["region_code"], rdata["sgg_name"], t["법정동"], t["아파트"]), None)
+    return list(complexes)
+
+
+def enrich_complexes(complexes, kakao_key, coord_cache, api_key, apt_info_cache, apt_list_cache, enrichment, negative_cache, workers=ENRICH_WORKERS):
+    """단지마다 세대수 + 좌표/최근접 역을 한 번씩, 병렬로 조회 → {단지 키: {"households", "coord"}}"""
+    households = resolve_households(
+        api_key, [(code, name) for code, _, _, name in complexes],
+        apt_info_cache, apt_list_cache, negative_cache, workers
+    )
+
+    def locate(key):
+        _, sgg_name, dong, apt_name = key
+        address = f"{sgg_name} {dong} {apt_name}"
+        return address, get_complex_enrichment(kakao_key, address, coord_cache, enrichment, negative_cache)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        located = list(pool.map(locate, complexes))
+
+    # 좌표만 새로 얻은 단지(역 정보 없음)는 최근접 역을 배치로 한 번에 계산
+    stations = add_station_enrichment(
+        [(address, coord) for address, coord in located if coord and "station" not in coord], enrichment
+    )
+    return {
+        key: {
+            "households": households[(key[0], key[3])]["세대수"],
+            "coord": stations.get(address, coord) if coord else None,
+        }
+        for key, (address, coord) in zip(complexes, located)
+    }
 
-            search_query = urllib.parse.quote(f"{group['법정동']} {apt_name}")
-            naver_link = f"https://m.land.naver.com/search/result/{search_query}"
 
-            data_items.append({
-                "name": apt_name,
-                "region": region_name,
-                "dong": group["법정동"],
-                "area_m2": group["면적"],
-                "area_py": pyeong,
-                "price": t["거래금액"],
-                "price_per_py": round(t["거래금액"] / pyeong) if pyeong > 0 else 0,
-                "floor": t["층"],
-                "built_year": group["건축년도"],
-                "households": household,
-                "station": nearest_station_name,
-                "line": nearest_station_line,
-                "walk_min": walk_min if walk_min < 999 else None,
-                "trade_date": trade_date_str,
-                "link": naver_link,
-                "regulated": False,
-                "lat": coord["lat"] if coord else None,
-                "lon": coord["lon"] if coord else None,
-            })
+def trade_row_fields(t, pyeong):
+    """매매 거래 → data.json 항목의 거래별 필드"""
+    return {
+        "price": t["거래금액"],
+        "price_per_py": round(t["거래금액"] / pyeong) if pyeong > 0 else 0,
+        "regulated": False,
+    }
 
-    if skipped_small > 0:
-        print(f"    ℹ️ {min_households}세대 미만 {skipped_small}개 단지 제외")
 
-    return data_items
+def rent_row_fields(t, pyeong):
+    """전월세 거래 → data-rent.json 항목의 거래별 필드"""
+    return {
+        "deposit": t["보증금"],
+        "monthly_rent": t["월세"],
+        "rent_type": t["전월세구분"],
+        "deposit_per_py": round(t["보증금"] / pyeong) if pyeong > 0 else 0,
+        "contract_term": t.get("계약기간", ""),
+        "renewal": t.get("갱신여부", ""),
+        "prev_deposit": t.get("이전보증금", ""),
+        "prev_monthly": t.get("이전월세", ""),
+    }
 
 
-def build_rent_region_data(region_name, complex_groups, kakao_key, coord_cache, sgg_name, api_key, apt_info_cache, min_households, region_code, apt_list_cache):
-    """한 지역의 전월세 data-rent.json 저장용 데이터 생성"""
+def build_region_data(region_name, complex_groups, sgg_name, region_code, enriched, min_households, row_fields, label=""):
+    """한 지역의 data.json / data-rent.json 저장용 항목 생성.
+    단지 공통 필드(이름·면적·세대수·역·좌표 등)에 row_fields(거래, 평형)의 거래별 필드를 더한다."""
 
     data_items = []
     skipped_small = 0
@@ -840,8 +1366,8 @@ def build_rent_region_data(region_name, complex_groups, kakao_key, coord_cache,
         if is_excluded_apt(apt_name):
             continue
 
-        apt_info = get_apt_household_count(api_key, apt_name, region_code, apt_info_cache, apt_list_cache)
-        household = apt_info["세대수"]
+        info = enriched[(region_code, sgg_name, group["법정동"], apt_name)]
+        household = info["households"]
 
         if household > 0 and household < min_households:
             skipped_small += 1
@@ -849,17 +1375,18 @@ def build_rent_region_data(region_name, complex_groups, kakao_key, coord_cache,
 
         trades = group["거래"]
         pyeong = to_pyeong(group["면적"])
-
-        address = f"{sgg_name} {group['법정동']} {apt_name}"
-        coord = get_coordinates(kakao_key, address, coord_cache)
+        coord = info["coord"]
 
         walk_min = 999
         nearest_station_name = ""
         nearest_station_line = ""
         if coord:
-            nearest, dist_km, walk_min = find_nearest_station(coord["lat"], coord["lon"])
-            nearest_station_name = nearest["name"]
-            nearest_station_line = nearest["line"]
+            walk_min = coord["walk_min"]
+            nearest_station_name = coord["station"]
+            nearest_station_line = coord["line"]
+
+        search_query = urllib.parse.quote(f"{group['법정동']} {apt_name}")
+        naver_link = f"https://m.land.naver.com/search/result/{search_query}"
 
         for t in trades:
             try:
@@ -867,19 +1394,12 @@ def build_rent_region_data(region_name, complex_groups, kakao_key, coord_cache,
             except (ValueError, TypeError):
                 trade_date_str = ""
 
-            search_query = urllib.parse.quote(f"{group['법정동']} {apt_name}")
-            naver_link = f"https://m.land.naver.com/search/result/{search_query}"
-
             data_items.append({
                 "name": apt_name,
                 "region": region_name,
                 "dong": group["법정동"],
                 "area_m2": group["면적"],
                 "area_py": pyeong,
-                "deposit": t["보증금"],
-                "monthly_rent": t["월세"],
-                "rent_type": t["전월세구분"],
-                "deposit_per_py": round(t["보증금"] / pyeong) if pyeong > 0 else 0,
                 "floor": t["층"],
                 "built_year": group["건축년도"],
                 "households": household,
@@ -887,23 +1407,21 @@ def build_rent_region_data(region_name, complex_groups, kakao_key, coord_cache,
                 "line": nearest_station_line,
                 "walk_min": walk_min if walk_min < 999 else None,
                 "trade_date": trade_date_str,
-                "contract_term": t.get("계약기간", ""),
-                "renewal": t.get("갱신여부", ""),
-                "prev_deposit": t.get("이전보증금", ""),
-                "prev_monthly": t.get("이전월세", ""),
                 "link": naver_link,
                 "lat": coord["lat"] if coord else None,
                 "lon": coord["lon"] if coord else None,
+                **row_fields(t, pyeong),
             })
 
     if skipped_small > 0:
-        print(f"    ℹ️ 전세: {min_households}세대 미만 {skipped_small}개 단지 제외")
+        print(f"    ℹ️ {label}{min_households}세대 미만 {skipped_small}개 단지 제외")
 
     return data_items
 
 
-def backfill_households(api_key, apt_info_cache, apt_list_cache, regions):
-    """households=0 인 항목의 세대수를 재조회해서 data.json / data-rent.json 업데이트"""
+def backfill_households(api_key, apt_info_cache, apt_list_cache, regions, db, since=None):
+    """households=0 인 매매/전월세 항목의 세대수를 재조회해서 DB 업데이트
+    (실패 이력이 있는 단지는 db.negative의 재시도 시각이 지난 것만 다시 조회)"""
     # region name → code 맵 구성
     region_map = {r["name"]: r["code"] for r in regions}
     # region별 sgg_name도 포함 (도봉구, 중랑구 등 짧은 이름으로 매칭)
@@ -912,48 +1430,35 @@ def backfill_households(api_key, apt_info_cache, apt_list_cache, regions):
         if sgg and sgg not in region_map:
             region_map[sgg] = r["code"]
 
-    updated_buy = updated_rent = 0
-
-    for path, label in [(DATA_JSON_PATH, "매매"), (DATA_RENT_JSON_PATH, "전세")]:
-        if not path.exists():
-            continue
-        data = load_data_json(path)
-        props = data.get("properties", [])
-        changed = False
-
-        for p in props:
-            if p.get("households", -1) != 0:
-                continue
-
+    updated = {"trade": 0, "rent": 0}
+    targets = {kind: [] for kind in updated}
+    for kind in targets:
+        for region, apt_name, _ in db.zero_households(kind, since):
             # region_code 찾기
-            region_code = region_map.get(p.get("region", ""))
+            region_code = region_map.get(region)
             if not region_code:
                 continue
+            targets[kind].append((region, region_code, apt_name))
+
+    # 매매/전월세 통틀어 단지별 1회, 병렬 조회
+    results = resolve_households(
+        api_key, [(code, name) for rows in targets.values() for _, code, name in rows],
+        apt_info_cache, apt_list_cache, db.negative
+    )
+
+    # 확인된 단지만 모아 종류별 한 번에 반영 (내보내기는 main()의 최종 저장 1회)
+    for kind, label in [("trade", "매매"), ("rent", "전세")]:
+        updates = [
+            (region, apt_name, results[(region_code, apt_name)]["세대수"])
+            for region, region_code, apt_name in targets[kind]
+            if results[(region_code, apt_name)].get("세대수", 0) > 0
+        ]
+        updated[kind] = db.set_households(kind, updates)
 
-            apt_name = p["name"]
-            cache_key = f"{region_code}_{apt_name}"
-
-            # 캐시에서 실패 기록 제거 → 재시도
-            if cache_key in apt_info_cache and apt_info_cache[cache_key].get("세대수", 0) == 0:
-                del apt_info_cache[cache_key]
-
-            result = get_apt_household_count(api_key, apt_name, region_code, apt_info_cache, apt_list_cache)
-            hh = result.get("세대수", 0)
-            if hh > 0:
-                p["households"] = hh
-                changed = True
-                if label == "매매":
-                    updated_buy += 1
-                else:
-                    updated_rent += 1
-
-        if changed:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+        if updated[kind]:
             print(f"  ✅ [{label}] 세대수 보완 완료")
 
-    print(f"  📊 세대수 보완: 매매 {updated_buy}건 / 전세 {updated_rent}건 업데이트")
-    save_apt_info_cache(apt_info_cache)
+    print(f"  📊 세대수 보완: 매매 {updated['trade']}건 / 전세 {updated['rent']}건 업데이트")
 
 
 # ─── 워치리스트 매칭 / 알림 빌더 ───
@@ -989,9 +1494,10 @@ def find_prev_same_area_trade(history_transactions, current_area_py, current_tra
     return matched[0]
 
 
-def build_watchlist_alert_message(trade, watchlist_item, prev_trade):
+def build_watchlist_alert_message(trade, watchlist_item, prev_trade, score=None):
     """단지 단위 상세 알림 메시지 빌더 (텔레그램 Markdown).
-    v2: 공급평형 우선 표기, 공급평 기준 평당가, format_price 통일."""
+    v2: 공급평형 우선 표기, 공급평 기준 평당가, format_price 통일.
+    score: PriceStats.score 결과 — 있으면 같은 지역·평형대 중위가 대비 위치를 덧붙임."""
     price = trade.get("price", 0)
     area_py = trade.get("area_py", 0)
     area_m2 = trade.get("area_m2", 0)
@@ -1049,6 +1555,13 @@ def build_watchlist_alert_message(trade, watchlist_item, prev_trade):
             "",
         ]
 
+    if score:
+        z_text = f", z {score['z']:+.1f}" if score["z"] is not None else ""
+        lines.append(f"📐 지역·평형대 중위가 {format_price(score['median'])} 대비 {score['ratio'] * 100:.0f}%{z_text}")
+        if score["anomaly"]:
+            lines.append("⚠️ 중위가의 절반 미만 — 지분·특수관계 거래 가능성")
+        lines.append("")
+
     kb = watchlist_item.get("kb_url", "")
     hg = watchlist_item.get("hogangnono_url", "")
     links = []
@@ -1092,42 +1605,28 @@ def main():
     filters = config["filters"]
     regions = config["regions"]
 
-    history = load_history()
-    history_set = set(history)
-    rent_history = load_rent_history()
-    rent_history_set = set(rent_history)
-    coord_cache = load_coord_cache()
-    apt_info_cache = load_apt_info_cache()
-    apt_list_cache = {}
+    db = store_db.open_store()
+    history_set = db.sent_keys("trade")
+    rent_history_set = db.sent_keys("rent")
+    new_sent_ids = []
+    new_rent_sent_ids = []
+    coord_cache = db.coords
+    apt_info_cache = db.apt_info
+    enrichment = db.enrichment(STATIONS_VERSION)
+    apt_list_cache = db.apt_lists
     raw_trades_by_code = {}  # flagship 워치리스트 매칭용 원본 데이터
     min_households = filters.get("min_households", 200)
 
-    # 기존 데이터 로드
-    existing_data = load_data_json(DATA_JSON_PATH)
-    existing_properties = existing_data.get("properties", [])
-    existing_keys = set()
-    for p in existing_properties:
-        key = f"{p['region']}_{p['name']}_{p['area_m2']}_{p['price']}_{p['floor']}_{p['trade_date']}"
-        existing_keys.add(key)
-
-    existing_rent_data = load_data_json(DATA_RENT_JSON_PATH)
-    existing_rent_properties = existing_rent_data.get("properties", [])
-    existing_rent_keys = set()
-    for p in existing_rent_properties:
-        key = f"{p['region']}_{p['name']}_{p['area_m2']}_{p['deposit']}_{p.get('monthly_rent',0)}_{p['floor']}_{p['trade_date']}"
-        existing_rent_keys.add(key)
-
     # 기존 데이터에 좌표 백필
-    for props in [existing_properties, existing_rent_properties]:
-        for p in props:
-            if p.get("lat") and p.get("lon"):
-                continue
-            suffix = f"{p.get('dong', '')} {p['name']}"
-            for cache_key, coord_val in coord_cache.items():
-                if cache_key.endswith(suffix):
-                    p["lat"] = coord_val["lat"]
-                    p["lon"] = coord_val["lon"]
-                    break
+    coord_index = None
+    for kind in ("trade", "rent"):
+        missing = db.missing_coords(kind)
+        if missing and coord_index is None:
+            coord_index = build_coord_index(coord_cache)
+        for region, dong, name in missing:
+            coord_val = find_cached_coord(coord_index, region, dong, name)
+            if coord_val:
+                db.set_coords(kind, region, dong, name, coord_val["lat"], coord_val["lon"])
 
     KST = timezone(timedelta(hours=9))
     now = datetime.now(KST)
@@ -1141,30 +1640,52 @@ def main():
     trade_region_results = {}
     rent_region_results = {}
 
+    collect_cfg = config.get("collect", {})
+    workers = collect_cfg.get("workers", COLLECT_WORKERS)
+    per_host = collect_cfg.get("per_host", COLLECT_PER_HOST)
+    molit_api.configure(daily_quota=collect_cfg.get("daily_quota", molit_api.DAILY_QUOTA))
+    try:
+        need = molit_api.ensure_quota(collection_plan(regions, months))
+        print(f"\n🚀 실거래 병렬 수집: {len(regions)}개 지역 × {len(months)}개월 × 매매/전월세 (workers={workers}, host당 {per_host})")
+        print(f"  예상 API 호출: {sum(need.values())}회 (캐시 제외)")
+        failed = set()
+        collected = collect_trades(api_key, regions, months, workers, per_host, failed)
+    except molit_api.QuotaExceeded as e:
+        print(f"\n⛔ {e} — 수집을 시작하지 않고 종료합니다 (기존 데이터 유지)")
+        molit_api.close()
+        db.close()
+        return
+
+    # 받은 원본 행을 이력 창고 파티션으로 보관 (집계 전에 — 이후 단계가 행 dict를 고치지 않도록)
+    changed = warehouse.Warehouse().save_collected(collected, failed, now)
+    print(f"  🗃️ 이력 창고: 파티션 {changed}개 갱신" + (f", 조회 실패 {len(failed)}개 제외" if failed else ""))
+
+    # 수집 결과를 지역·월 순서대로 병합 (순차 실행과 동일한 결과 보장)
     for region in regions:
         region_name = region["name"]
         region_code = region["code"]
         sgg_name = region.get("sgg_name", region_name)
-        print(f"\n📍 {region_name} ({region_code}) 조회 중...")
+        print(f"\n📍 {region_name} ({region_code}) 집계 중...")
 
         # ── 매매 수집 ──
         new_trades = []
         for month in months:
             print(f"  📅 매매 {month} 조회...")
-            trades = fetch_trades(api_key, region_code, month)
+            trades = collected[(region_code, month, "trade")]
             # flagship 워치리스트 매칭을 위해 원본 저장
             raw_trades_by_code.setdefault(region_code, []).extend(trades)
             print(f"  → {len(trades)}건 조회됨")
-            filtered = filter_trades(trades, filters)
+            filtered = filter_trades(trades, filters, now)
             print(f"  → {len(filtered)}건 필터 통과")
 
             for trade in filtered:
                 trade_id = make_trade_id(trade, region_name)
-                if trade_id in history_set:
+                key = store_db.trade_key_hash(trade_id)
+                if key in history_set:
                     continue
                 new_trades.append(trade)
-                history.append(trade_id)
-                history_set.add(trade_id)
+                new_sent_ids.append((trade_id, trade_date_of(trade)))
+                history_set.add(key)
                 total_new_trade += 1
 
         if new_trades:
@@ -1175,18 +1696,19 @@ def main():
         new_rents = []
         for month in months:
             print(f"  📅 전월세 {month} 조회...")
-            rents = fetch_rent_trades(api_key, region_code, month)
+            rents = collected[(region_code, month, "rent")]
             print(f"  → {len(rents)}건 조회됨")
-            filtered_rents = filter_rent_trades(rents, filters)
+            filtered_rents = filter_rent_trades(rents, filters, now)
             print(f"  → {len(filtered_rents)}건 필터 통과")
 
             for rent in filtered_rents:
                 rent_id = make_rent_trade_id(rent, region_name)
-                if rent_id in rent_history_set:
+                key = store_db.trade_key_hash(rent_id)
+                if key in rent_history_set:
                     continue
                 new_rents.append(rent)
-                rent_history.append(rent_id)
-                rent_history_set.add(rent_id)
+                new_rent_sent_ids.append((rent_id, trade_date_of(rent)))
+                rent_history_set.add(key)
                 total_new_rent += 1
 
         if new_rents:
@@ -1197,45 +1719,43 @@ def main():
     # 워치리스트 단지(push_enabled)에 매칭된 신규 거래만 상세 알림을 보낸다.
     # 알림 발송 위치는 data.json 빌드 직후로 이동 (English-keyed all_new_trade_items 사용).
 
+    # ─── 단지 부가정보 (매매/전월세 통합, 단지당 1회) ───
+    complexes = collect_complexes(trade_region_results, rent_region_results)
+    enriched = {}
+    if complexes:
+        group_count = sum(
+            1
+            for results in (trade_region_results, rent_region_results)
+            for rdata in results.values()
+            for g in group_by_complex(rdata["trades"]).values()
+            if not is_excluded_apt(g["아파트"])
+        )
+        enrich_workers = collect_cfg.get("enrich_workers", ENRICH_WORKERS)
+        print(f"\n🏢 단지 부가정보: {len(complexes)}개 단지 (매매·전월세 {group_count}개 그룹에서 중복 제거, workers={enrich_workers})")
+        enriched = enrich_complexes(
+            complexes, kakao_key, coord_cache, api_key,
+            apt_info_cache, apt_list_cache, enrichment, db.negative, enrich_workers
+        )
+
+    # ─── 거래가 분포 (이상가격 기준) — 새 거래를 넣기 전에 불러와 새 거래만 반영 ───
+    price_stats = {kind: db.price_stats(kind) for kind in ("trade", "rent")}
+
     # ─── data.json (매매) 업데이트 ───
     if trade_region_results:
         for rname, rdata in trade_region_results.items():
             complex_groups = group_by_complex(rdata["trades"])
             data_items = build_region_data(
-                rname, complex_groups, kakao_key, coord_cache,
-                rdata["sgg_name"], api_key, apt_info_cache,
-                min_households, rdata["region_code"], apt_list_cache
+                rname, complex_groups, rdata["sgg_name"], rdata["region_code"],
+                enriched, min_households, trade_row_fields
             )
-            for item in data_items:
-                item_key = f"{item['region']}_{item['name']}_{item['area_m2']}_{item['price']}_{item['floor']}_{item['trade_date']}"
-                if item_key not in existing_keys:
-                    all_new_trade_items.append(item)
-                    existing_keys.add(item_key)
-
-    all_properties = existing_properties + all_new_trade_items
-    cutoff_date = (now - timedelta(days=90)).strftime("%Y-%m-%d")
-    all_properties = [p for p in all_properties if p.get("trade_date", "9999") >= cutoff_date or not p.get("trade_date")]
-    all_properties.sort(key=lambda x: x.get("trade_date", ""), reverse=True)
-
-    save_data_json({
-        "updated_at": now.strftime("%Y-%m-%d %H:%M"),
-        "total_count": len(all_properties),
-        "new_count": len(all_new_trade_items),
-        "properties": all_properties
-    }, DATA_JSON_PATH)
+            all_new_trade_items.extend(db.add_properties("trade", data_items))
+    price_stats["trade"].update(all_new_trade_items, now)
 
     # ─── 워치리스트 알림 (단지 단위 상세 알림) ───
     flagship_config_for_alert = load_flagship_config()
     pushed_count = 0
     if flagship_config_for_alert:
-        if FLAGSHIP_HISTORY_PATH.exists():
-            with open(FLAGSHIP_HISTORY_PATH, "r", encoding="utf-8") as f:
-                try:
-                    flagship_history_prev = json.load(f)
-                except json.JSONDecodeError:
-                    flagship_history_prev = {"watchlist": []}
-        else:
-            flagship_history_prev = {"watchlist": []}
+        flagship_history_prev = db.load_flagship_history()
 
         watchlist_items = flagship_config_for_alert.get("watchlist", [])
         push_items = [w for w in watchlist_items if w.get("push_enabled")]
@@ -1253,7 +1773,7 @@ def main():
                 trade_item.get("area_py", 0),
                 trade_item.get("trade_date", ""),
             )
-            msg = build_watchlist_alert_message(trade_item, matched, prev)
+            msg = build_watchlist_alert_message(trade_item, matched, prev, price_stats["trade"].score(trade_item))
             if send_telegram(bot_token, chat_id, msg):
                 pushed_count += 1
 
@@ -1262,54 +1782,67 @@ def main():
     # ─── data-rent.json (전월세) 업데이트 ───
     if rent_region_results:
         for rname, rdata in rent_region_results.items():
-            complex_groups = group_rent_by_complex(rdata["trades"])
-            data_items = build_rent_region_data(
-                rname, complex_groups, kakao_key, coord_cache,
-                rdata["sgg_name"], api_key, apt_info_cache,
-                min_households, rdata["region_code"], apt_list_cache
+            complex_groups = group_by_complex(rdata["trades"])
+            data_items = build_region_data(
+                rname, complex_groups, rdata["sgg_name"], rdata["region_code"],
+                enriched, min_households, rent_row_fields, label="전세: "
             )
-            for item in data_items:
-                item_key = f"{item['region']}_{item['name']}_{item['area_m2']}_{item['deposit']}_{item.get('monthly_rent',0)}_{item['floor']}_{item['trade_date']}"
-                if item_key not in existing_rent_keys:
-                    all_new_rent_items.append(item)
-                    existing_rent_keys.add(item_key)
-
-    all_rent_properties = existing_rent_properties + all_new_rent_items
-    all_rent_properties = [p for p in all_rent_properties if p.get("trade_date", "9999") >= cutoff_date or not p.get("trade_date")]
-    all_rent_properties.sort(key=lambda x: x.get("trade_date", ""), reverse=True)
-
-    save_data_json({
-        "updated_at": now.strftime("%Y-%m-%d %H:%M"),
-        "total_count": len(all_rent_properties),
-        "new_count": len(all_new_rent_items),
-        "properties": all_rent_properties
-    }, DATA_RENT_JSON_PATH)
+            all_new_rent_items.extend(db.add_properties("rent", data_items))
+    price_stats["rent"].update(all_new_rent_items, now)
+    for stats in price_stats.values():
+        db.save_price_stats(stats)
 
     # ─── 세대수 미확인(0) 항목 보완 수집 ───
-    zero_hh_buy = sum(1 for p in all_properties if p.get("households", -1) == 0)
-    zero_hh_rent = sum(1 for p in all_rent_properties if p.get("households", -1) == 0)
+    cutoff_date = store_db.dashboard_cutoff(now)
+    zero_hh_buy = sum(n for _, _, n in db.zero_households("trade", cutoff_date))
+    zero_hh_rent = sum(n for _, _, n in db.zero_households("rent", cutoff_date))
     if zero_hh_buy + zero_hh_rent > 0:
         print(f"\n🔍 세대수 미확인 항목 재조회 중 (매매 {zero_hh_buy}건 / 전세 {zero_hh_rent}건)...")
-        backfill_households(api_key, apt_info_cache, apt_list_cache, regions)
+        backfill_households(api_key, apt_info_cache, apt_list_cache, regions, db, cutoff_date)
+
+    # ─── data.json / data-rent.json + 지역별 분할 내보내기 (최근 90일) ───
+    all_properties = db.properties("trade", since=cutoff_date, with_id=True)
+    all_rent_properties = db.properties("rent", since=cutoff_date, with_id=True)
+    rows = {
+        "trade": export_rows(db, "trade", DATA_JSON_PATH, all_properties, len(all_new_trade_items), now),
+        "rent": export_rows(db, "rent", DATA_RENT_JSON_PATH, all_rent_properties, len(all_new_rent_items), now),
+    }
+
+    region_codes = {r["name"]: r["code"] for r in regions}
+    save_region_shards({
+        "trade": (all_properties, len(all_new_trade_items)),
+        "rent": (all_rent_properties, len(all_new_rent_items)),
+    }, region_codes, now.strftime("%Y-%m-%d %H:%M"), config.get("export", {}).get("columnar", True), rows, price_stats)
 
     # ─── flagship 워치리스트 업데이트 ───
     flagship_config = load_flagship_config()
     if flagship_config:
-        flagship_history = load_flagship_history()
+        flagship_history = db.load_flagship_history()
         flagship_history = update_flagship_from_trades(
             raw_trades_by_code, flagship_config, flagship_history, now
         )
-        save_flagship_history(flagship_history)
+        db.save_flagship_history(flagship_history)
+        save_flagship_history(db.load_flagship_history())
         total_flagship_tx = sum(
             len(e["transactions"]) for e in flagship_history["watchlist"]
         )
         print(f"  📈 워치리스트 flagship_history.json 업데이트 (총 {total_flagship_tx}건)")
 
+    molit_api.close()
+    print(f"  🗄️ 실거래 응답 {molit_api.cache_report()}")
+    print(f"  🔢 오늘 API 호출: {molit_api.quota_report()}")
+
     # 저장
-    save_history(history)
-    save_rent_history(rent_history)
-    save_coord_cache(coord_cache)
-    save_apt_info_cache(apt_info_cache)
+    db.add_sent("trade", new_sent_ids)
+    db.add_sent("rent", new_rent_sent_ids)
+    expired = db.expire_sent(now, filters.get("max_days_ago", 30))
+    if expired:
+        print(f"  🧹 필터 기간 지난 발송 키 {expired}건 정리")
+    db.export_sent()
+    if coord_cache.dirty:
+        save_coord_cache(coord_cache)
+    print(f"  🚫 조회 실패 캐시: {db.negative.report()}")
+    db.close()
 
     print(f"\n{'=' * 50}")
     print(f"✅ 완료!")
@@ -0,0 +1,613 @@
+"""
+국토교통부 공공데이터(apis.data.go.kr) 공용 HTTP 클라이언트
+- 프로세스 전체가 하나의 requests.Session을 공유 (커넥션 풀 + keep-alive)
+- 5xx / 연결·읽기 타임아웃은 지수 백오프로 재시도
+- RTMS 실거래 XML 스트리밍 디코더 (iterparse, <item> 단위 yield)
+- 원본 응답 디스크 캐시: (endpoint, LAWD_CD, DEAL_YMD) 키, 월별 신선도 정책, 용량 상한
+- totalCount 기반 페이지네이션 (2페이지 이후 병렬) + 일일 호출 한도(quota) 추적
+- main.py, flagship_backfill.py의 모든 실거래·단지정보 API 호출이 이 모듈을 거친다
+"""
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import urllib.parse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ─── 커넥션 풀 설정 ───
+# 호출 대상 호스트는 사실상 apis.data.go.kr 하나 → 호스트 풀은 적게, 호스트당 커넥션은 넉넉히.
+# POOL_MAXSIZE는 main.COLLECT_WORKERS 이상이어야 병렬 수집 시 커넥션이 버려지지 않는다.
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+
+# ─── 재시도 정책 ───
+# 0.5s → 1s → 2s 백오프. 4xx(인증키 오류 등)는 재시도하지 않는다.
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUS = (500, 502, 503, 504)
+
+DEFAULT_TIMEOUT = 30
+
+# ─── 동시성 ───
+PER_HOST = 4            # 호스트별 동시 요청 상한 (configure()로 변경)
+
+# ─── 페이지네이션 ───
+# 소규모 지역은 1페이지로 끝나도록, 대규모 지역(강남·송파 전월세 등)은 잘리지 않도록 totalCount로 추가 페이지 조회
+PAGE_SIZE = 1000
+PAGE_WORKERS = 4
+
+# ─── 일일 호출 한도 ───
+# data.go.kr 개발계정 기준 API(엔드포인트)별 일일 트래픽. 자정(KST) 초기화.
+DAILY_QUOTA = 10000
+
+# ─── 응답 XML ───
+OK_RESULT_CODES = ("00", "000")
+# <item> 바깥의 스칼라 태그 — iter_items(meta=...)로 수집
+META_TAGS = ("resultCode", "resultMsg", "numOfRows", "pageNo", "totalCount")
+
+# ─── 응답 캐시 ───
+# 당월: 항상 재조회 / 전월: 신고 기한(30일) 내라 짧게 / 그 이전: 신고 완료 → 사실상 영구
+CACHE_DIR = Path(__file__).parent / ".cache" / "rtms"
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+LAST_MONTH_TTL = 12 * 3600
+KST = timezone(timedelta(hours=9))
+
+_session = None
+_session_lock = threading.Lock()
+_limiter = None
+_quota = None
+_quota_lock = threading.Lock()
+
+
+def _build_session():
+    retry = Retry(
+        total=RETRY_TOTAL,
+        connect=RETRY_TOTAL,
+        read=RETRY_TOTAL,
+        status=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def get_session():
+    """공유 세션 반환 (최초 호출 시 생성, 스레드 안전)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+class HostLimiter:
+    """호스트별 동시 요청 수 제한 (스레드 간 공유)"""
+
+    def __init__(self, per_host):
+        self.per_host = max(1, int(per_host))
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def slot(self, url):
+        host = urllib.parse.urlsplit(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self._semaphores[host]
+
+
+def configure(per_host=None, daily_quota=None):
+    """main/backfill 시작 시 config 값 반영 (호스트당 동시 요청 수, 일일 한도)"""
+    global _limiter
+    if per_host is not None:
+        _limiter = HostLimiter(per_host)
+    if daily_quota is not None:
+        get_quota().daily_limit = int(daily_quota)
+
+
+def host_slot(url):
+    global _limiter
+    if _limiter is None:
+        with _session_lock:
+            if _limiter is None:
+                _limiter = HostLimiter(PER_HOST)
+    return _limiter.slot(url)
+
+
+def endpoint_of(url):
+    return url.rstrip("/").rsplit("/", 1)[-1]
+
+
+def _request(url, params=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    get_quota().consume(endpoint_of(url))
+    return get_session().get(url, params=params, timeout=timeout, **kwargs)
+
+
+def get(url, params=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """requests.get 대체. 공유 커넥션 풀 + 재시도 + 호스트당 동시성 상한 + 일일 한도 집계."""
+    with host_slot(url):
+        return _request(url, params=params, timeout=timeout, **kwargs)
+
+
+def close():
+    """세션 종료 + 캐시 인덱스·호출 한도 저장 (배치 종료 시 호출, 이후 get() 호출 시 새로 생성)"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+    if _cache is not None:
+        _cache.save()
+    if _quota is not None:
+        _quota.save()
+
+
+# ─── RTMS XML 스트리밍 디코더 ───
+class ApiError(Exception):
+    """resultCode가 정상(00/000)이 아닌 응답"""
+
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")
+        self.code = code
+        self.message = message
+
+
+def open_stream(response):
+    """stream=True 응답의 원본 바이트 스트림 (gzip 등 전송 인코딩은 해제)"""
+    response.raw.decode_content = True
+    return response.raw
+
+
+def _check_result(meta):
+    code = meta.get("resultCode")
+    if code and code not in OK_RESULT_CODES:
+        raise ApiError(code, meta.get("resultMsg") or "알 수 없는 오류")
+
+
+def iter_items(source, meta=None):
+    """RTMS XML을 스트리밍 파싱해 <item>마다 {태그: 텍스트} dict를 yield.
+    소비한 <item>은 바로 clear + 부모에서 제거 → 전체 DOM을 메모리에 들고 있지 않는다.
+    meta dict를 넘기면 resultCode/resultMsg/totalCount 등 META_TAGS 값을 채워준다.
+    resultCode 오류는 <header>가 닫히는 시점(=item 파싱 전)에 ApiError로 올린다."""
+    if meta is None:
+        meta = {}
+    items_parent = None
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == "items":
+                items_parent = elem
+            continue
+        if tag == "item":
+            yield {child.tag: child.text for child in elem}
+            elem.clear()
+            if items_parent is not None:
+                items_parent.remove(elem)
+        elif tag in META_TAGS:
+            meta[tag] = (elem.text or "").strip()
+        elif tag == "header":
+            _check_result(meta)
+    _check_result(meta)
+
+
+# ─── 원본 응답 디스크 캐시 ───
+def month_ttl(deal_ymd, now=None):
+    """DEAL_YMD(yyyyMM)별 캐시 유효시간(초). 0 = 캐시 안 함, None = 만료 없음."""
+    now = now or datetime.now(KST)
+    current = now.year * 12 + now.month
+    try:
+        target = int(deal_ymd[:4]) * 12 + int(deal_ymd[4:6])
+    except (TypeError, ValueError):
+        return 0
+    age = current - target
+    if age <= 0:
+        return 0
+    if age == 1:
+        return LAST_MONTH_TTL
+    return None
+
+
+class ResponseCache:
+    """content-addressed 응답 저장소.
+    objects/<sha256>.xml 에 본문을 저장하고, index.json 이 키 → 해시/수신시각을 기록한다.
+    같은 본문(예: 거래 0건 월)은 한 파일을 공유한다."""
+
+    def __init__(self, root, max_bytes=CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.index_path = self.root / "index.json"
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.stats = {"hit": 0, "miss": 0, "stale": 0, "bypass": 0, "stored": 0, "bytes_saved": 0}
+        self.index = {}
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self.index = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.index = {}
+
+    @staticmethod
+    def make_key(url, params):
+        key = f"{endpoint_of(url)}|{params.get('LAWD_CD', '')}|{params.get('DEAL_YMD', '')}"
+        page = str(params.get("pageNo", "1"))
+        if page != "1" or "numOfRows" in params:
+            key += f"|p{page}x{params.get('numOfRows', '')}"
+        return key
+
+    def _object_path(self, digest):
+        return self.objects / f"{digest}.xml"
+
+    def lookup(self, key, ttl):
+        """신선한 캐시 파일 경로 반환. 없거나 만료면 None (통계 기록)."""
+        with self._lock:
+            if ttl == 0:
+                self.stats["bypass"] += 1
+                return None
+            entry = self.index.get(key)
+            path = self._object_path(entry["sha"]) if entry else None
+            if entry is None or not path.exists():
+                self.stats["miss"] += 1
+                return None
+            if ttl is not None and time.time() - entry["fetched_at"] > ttl:
+                self.stats["stale"] += 1
+                return None
+            entry["last_used"] = time.time()
+            self.stats["hit"] += 1
+            self.stats["bytes_saved"] += entry.get("size", 0)
+            return path
+
+    def peek(self, key, ttl):
+        """lookup()과 같은 판정이지만 통계·last_used는 건드리지 않음. 반환: (신선 여부, 인덱스 항목)"""
+        with self._lock:
+            entry = self.index.get(key)
+            if ttl == 0 or entry is None or not self._object_path(entry["sha"]).exists():
+                return False, entry
+            if ttl is not None and time.time() - entry["fetched_at"] > ttl:
+                return False, entry
+            return True, entry
+
+    def open_writer(self):
+        self.objects.mkdir(parents=True, exist_ok=True)
+        return _HashingWriter(tempfile.NamedTemporaryFile(dir=self.objects, suffix=".tmp", delete=False))
+
+    def store(self, key, writer, total=None):
+        """open_writer()로 받은 완결 응답을 해시 이름으로 확정하고 인덱스에 등록.
+        total(totalCount)은 다음 실행의 호출 수 추정에 쓴다."""
+        digest = writer.digest()
+        path = self._object_path(digest)
+        if path.exists():
+            os.unlink(writer.name)
+        else:
+            os.replace(writer.name, path)
+        now = time.time()
+        with self._lock:
+            self.index[key] = {"sha": digest, "size": writer.size, "fetched_at": now, "last_used": now}
+            if total is not None:
+                self.index[key]["total"] = total
+            self.stats["stored"] += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self.index.pop(key, None)
+
+    def evict(self):
+        """용량 상한 초과 시 오래 안 쓴 키부터 제거, 참조 없는 객체 파일 삭제"""
+        with self._lock:
+            sizes = {}
+            for entry in self.index.values():
+                sizes[entry["sha"]] = entry.get("size", 0)
+            total = sum(sizes.values())
+            for key, entry in sorted(self.index.items(), key=lambda kv: kv[1].get("last_used", 0)):
+                if total <= self.max_bytes:
+                    break
+                del self.index[key]
+                if not any(e["sha"] == entry["sha"] for e in self.index.values()):
+                    total -= sizes.pop(entry["sha"], 0)
+            live = set(sizes)
+        if self.objects.exists():
+            for path in self.objects.iterdir():
+                if path.stem not in live:
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+        return total
+
+    def save(self):
+        if not self.index and not self.root.exists():
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.evict()
+        with self._lock:
+            tmp = self.index_path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.index, f, ensure_ascii=False)
+            os.replace(tmp, self.index_path)
+
+    def report(self):
+        s = self.stats
+        lookups = s["hit"] + s["miss"] + s["stale"]
+        rate = s["hit"] / lookups * 100 if lookups else 0
+        return (f"캐시 적중 {s['hit']} / 미스 {s['miss']} / 만료 {s['stale']} / 당월 재조회 {s['bypass']}"
+                f" (적중률 {rate:.0f}%, 절약 {s['bytes_saved'] / 1024 / 1024:.1f}MB, 신규 저장 {s['stored']}건)")
+
+
+class _HashingWriter:
+    """임시 파일에 쓰면서 sha256/크기를 같이 계산"""
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.name = fp.name
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+    def write(self, chunk):
+        self.fp.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def close(self):
+        self.fp.close()
+
+    def discard(self):
+        self.fp.close()
+        try:
+            os.unlink(self.name)
+        except OSError:
+            pass
+
+    def digest(self):
+        return self._hash.hexdigest()
+
+
+class _TeeReader:
+    """스트림을 읽는 그대로 sink에도 기록 (파싱과 캐시 저장을 한 번에)"""
+
+    def __init__(self, raw, sink):
+        self.raw = raw
+        self.sink = sink
+
+    def read(self, size=-1):
+        chunk = self.raw.read(size)
+        if chunk:
+            self.sink.write(chunk)
+        return chunk
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(CACHE_DIR)
+    return _cache
+
+
+def cache_report():
+    return get_cache().report()
+
+
+def fetch_items(url, params, timeout=DEFAULT_TIMEOUT, meta=None):
+    """RTMS 단일 페이지 조회: 신선한 캐시가 있으면 디스크에서, 없으면 네트워크에서 스트리밍 파싱.
+    네트워크 응답은 파싱과 동시에 캐시에 기록하고, 끝까지 정상 파싱된 경우에만 확정한다.
+    네트워크 페이지는 끝까지 읽어 호스트 슬롯을 반납한 뒤 yield (느린 소비자가 슬롯을 붙잡지 않도록).
+    예외: requests.RequestException / ET.ParseError / ApiError / QuotaExceeded"""
+    if meta is None:
+        meta = {}
+    cache = get_cache()
+    key = cache.make_key(url, params)
+    ttl = month_ttl(params.get("DEAL_YMD", ""))
+
+    path = cache.lookup(key, ttl)
+    if path is not None:
+        try:
+            with open(path, "rb") as f:
+                yield from iter_items(f, meta)
+            return
+        except (ET.ParseError, ApiError):
+            cache.invalidate(key)
+            raise
+
+    with host_slot(url):
+        response = _request(url, params=params, timeout=timeout, stream=True)
+        writer = cache.open_writer() if ttl != 0 else None
+        try:
+            response.raise_for_status()
+            source = open_stream(response)
+            if writer is not None:
+                source = _TeeReader(source, writer)
+            items = list(iter_items(source, meta))
+            if writer is not None:
+                writer.close()
+                cache.store(key, writer, total=_to_int(meta.get("totalCount")))
+                writer = None
+        finally:
+            response.close()
+            if writer is not None:
+                writer.discard()
+    yield from items
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def page_params(params, page, page_size=PAGE_SIZE):
+    return {**params, "pageNo": str(page), "numOfRows": str(page_size)}
+
+
+def fetch_all_items(url, params, timeout=DEFAULT_TIMEOUT, page_size=PAGE_SIZE, workers=PAGE_WORKERS):
+    """totalCount를 보고 필요한 만큼 페이지를 가져와 <item> dict를 페이지 순서대로 yield.
+    2페이지 이후는 병렬 조회. 한 달치를 전부 받은 뒤에야 yield하므로, 한도 부족·오류로 중단된 달은
+    한 건도 내보내지 않는다 (호출 측이 일부만 받은 달을 완결된 달로 오인하지 않도록).
+    한도 확인: 지난 totalCount 기준 추정치로 시작 전 1회, 1페이지의 totalCount로 나머지 페이지 1회."""
+    get_quota().require(estimate_calls([(url, params)], page_size))
+    meta = {}
+    first = list(fetch_items(url, page_params(params, 1, page_size), timeout, meta))
+
+    total = _to_int(meta.get("totalCount")) or 0
+    pages = math.ceil(total / page_size)
+    if pages <= 1:
+        yield from first
+        return
+
+    remaining = [page_params(params, page, page_size) for page in range(2, pages + 1)]
+    get_quota().require({endpoint_of(url): _count_uncached(url, remaining)})
+
+    def load(page_param):
+        return list(fetch_items(url, page_param, timeout))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(remaining)))) as executor:
+        rest = list(executor.map(load, remaining))
+    yield from first
+    for items in rest:
+        yield from items
+
+
+def _count_uncached(url, params_list):
+    cache = get_cache()
+    ttl_by_month = {}
+    count = 0
+    for params in params_list:
+        month = params.get("DEAL_YMD", "")
+        if month not in ttl_by_month:
+            ttl_by_month[month] = month_ttl(month)
+        fresh, _ = cache.peek(cache.make_key(url, params), ttl_by_month[month])
+        if not fresh:
+            count += 1
+    return count
+
+
+def estimate_calls(plan, page_size=PAGE_SIZE):
+    """[(url, params), ...] 조회 계획의 엔드포인트별 예상 네트워크 호출 수.
+    캐시가 신선하면 0, 아니면 지난번 totalCount로 페이지 수 추정 (모르면 1페이지)."""
+    cache = get_cache()
+    need = {}
+    for url, params in plan:
+        first = page_params(params, 1, page_size)
+        fresh, entry = cache.peek(cache.make_key(url, first), month_ttl(params.get("DEAL_YMD", "")))
+        if fresh:
+            continue
+        total = (entry or {}).get("total") or 0
+        endpoint = endpoint_of(url)
+        need[endpoint] = need.get(endpoint, 0) + max(1, math.ceil(total / page_size))
+    return need
+
+
+def ensure_quota(plan, page_size=PAGE_SIZE):
+    """조회 계획 전체를 오늘 남은 한도로 끝낼 수 있는지 확인. 부족하면 QuotaExceeded."""
+    need = estimate_calls(plan, page_size)
+    get_quota().require(need)
+    return need
+
+
+# ─── 일일 호출 한도 ───
+class QuotaExceeded(Exception):
+    """오늘 남은 호출 한도로 요청한 작업을 끝낼 수 없음"""
+
+
+class QuotaTracker:
+    """엔드포인트별 오늘(KST) 네트워크 호출 수를 집계·저장"""
+
+    def __init__(self, path, daily_limit=DAILY_QUOTA):
+        self.path = Path(path)
+        self.daily_limit = daily_limit
+        self._lock = threading.Lock()
+        self.date = datetime.now(KST).strftime("%Y-%m-%d")
+        self.used = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("date") == self.date:
+                    self.used = data.get("used", {})
+            except (OSError, json.JSONDecodeError):
+                pass
+
+    def _roll(self):
+        today = datetime.now(KST).strftime("%Y-%m-%d")
+        if today != self.date:
+            self.date = today
+            self.used = {}
+
+    def remaining(self, endpoint):
+        with self._lock:
+            self._roll()
+            return self.daily_limit - self.used.get(endpoint, 0)
+
+    def require(self, need):
+        """need={endpoint: 호출 수} 만큼 여유가 없으면 QuotaExceeded"""
+        with self._lock:
+            self._roll()
+            short = {
+                ep: (n, self.daily_limit - self.used.get(ep, 0))
+                for ep, n in need.items()
+                if n > self.daily_limit - self.used.get(ep, 0)
+            }
+        if short:
+            detail = ", ".join(f"{ep}: 필요 {n} / 잔여 {left}" for ep, (n, left) in short.items())
+            raise QuotaExceeded(f"일일 호출 한도 부족 ({detail})")
+
+    def consume(self, endpoint):
+        with self._lock:
+            self._roll()
+            used = self.used.get(endpoint, 0)
+            if used >= self.daily_limit:
+                raise QuotaExceeded(f"일일 호출 한도 소진 ({endpoint}: {used}/{self.daily_limit})")
+            self.used[endpoint] = used + 1
+
+    def save(self):
+        with self._lock:
+            if not self.used:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"date": self.date, "used": self.used}, f, ensure_ascii=False)
+
+    def report(self):
+        with self._lock:
+            return ", ".join(f"{ep} {n}/{self.daily_limit}" for ep, n in sorted(self.used.items())) or "호출 없음"
+
+
+def get_quota():
+    global _quota
+    if _quota is None:
+        with _quota_lock:
+            if _quota is None:
+                _quota = QuotaTracker(Path(CACHE_DIR) / "quota.json")
+    return _quota
+
+
+def quota_report():
+    return get_quota().report()
@@ -0,0 +1,220 @@
+"""
+거래가 분포 스케치 (이상가격 감지)
+- (지역, 동, 5평 면적대, 유형) 그룹마다 가격(매매가 / 전월세 보증금)의 1·2·3사분위를 P² 알고리즘으로 추정
+  → 표본을 보관하지 않고 새 거래만 넣어 실행마다 점진 갱신 (상태는 store.py price_stats 테이블)
+- 그룹 분포는 WINDOW_DAYS마다 새로 시작하고, 새 분포 표본이 모일 때까지 직전 분포를 사용 (롤링)
+- 동 단위 표본이 적으면 같은 지역 전체(동 "") 분포로 대체
+- 점수: 중위값 대비 비율 + 로버스트 z (IQR/1.349를 표준편차로 사용)
+"""
+
+import math
+from datetime import datetime, timedelta
+
+QUANTILES = (0.25, 0.5, 0.75)
+AREA_BAND_PY = 5
+WINDOW_DAYS = 180
+# 동 단위 분포를 쓰는 최소 표본 수, 지역 단위 분포의 최소 표본 수 (기존 app.js 기준 3건)
+DONG_MIN_SAMPLES = 5
+REGION_MIN_SAMPLES = 3
+# 중위값의 이 비율 미만이면 이상가격 (기존 app.js flagRentAnomalies와 같은 기준)
+ANOMALY_LOW_RATIO = 0.5
+# 이상가격 플래그 대상 유형 (월세 보증금은 월세와 맞바뀌어 분포가 넓어 z만 제공)
+FLAGGED_TYPES = ("매매", "전세")
+IQR_TO_SIGMA = 1.349
+
+
+class P2Quantile:
+    """P² 분위수 추정기 (Jain & Chlamtac, 1985). 마커 5개만 유지."""
+
+    def __init__(self, p, state=None):
+        self.p = p
+        if state:
+            self.q = state["q"]
+            self.n = state.get("n")
+            self.np = state.get("np")
+        else:
+            self.q, self.n, self.np = [], None, None
+
+    @property
+    def dn(self):
+        p = self.p
+        return (0, p / 2, p, (1 + p) / 2, 1)
+
+    def add(self, x):
+        q = self.q
+        if self.n is None:
+            # 처음 5개는 그대로 모았다가 정렬해 마커 초기화
+            q.append(x)
+            if len(q) == 5:
+                q.sort()
+                p = self.p
+                self.n = [1, 2, 3, 4, 5]
+                self.np = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+            return
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+        n = self.n
+        for i in range(k + 1, 5):
+            n[i] += 1
+        dn = self.dn
+        for i in range(5):
+            self.np[i] += dn[i]
+        for i in (1, 2, 3):
+            d = self.np[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = self._parabolic(i, d)
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.q, self.n
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self):
+        if self.n is not None:
+            return self.q[2]
+        if not self.q:
+            return None
+        # 5개 미만: 정확한 분위수 (선형 보간)
+        s = sorted(self.q)
+        pos = (len(s) - 1) * self.p
+        lo = math.floor(pos)
+        return s[lo] + (s[min(lo + 1, len(s) - 1)] - s[lo]) * (pos - lo)
+
+    def state(self):
+        if self.n is None:
+            return {"q": list(self.q)}
+        return {"q": self.q, "n": self.n, "np": self.np}
+
+
+class Distribution:
+    """한 그룹의 사분위 스케치 + 표본 수"""
+
+    def __init__(self, state=None):
+        state = state or {}
+        self.count = state.get("count", 0)
+        sketches = state.get("sketches") or [None] * len(QUANTILES)
+        self.sketches = [P2Quantile(p, s) for p, s in zip(QUANTILES, sketches)]
+
+    def add(self, x):
+        self.count += 1
+        for s in self.sketches:
+            s.add(x)
+
+    def quartiles(self):
+        return tuple(s.value() for s in self.sketches)
+
+    def state(self):
+        return {"count": self.count, "sketches": [s.state() for s in self.sketches]}
+
+
+def area_band(area_py):
+    # app.js Math.round(area_py / 5) * 5 와 같은 반올림
+    return int(math.floor((float(area_py or 0)) / AREA_BAND_PY + 0.5)) * AREA_BAND_PY
+
+
+def price_of(kind, item):
+    return item.get("price") if kind == "trade" else item.get("deposit")
+
+
+def type_of(kind, item):
+    return "매매" if kind == "trade" else (item.get("rent_type") or "전세")
+
+
+def group_keys(kind, item):
+    """(동 단위 키, 지역 단위 키)"""
+    band, kind_type = area_band(item.get("area_py")), type_of(kind, item)
+    region = item.get("region") or ""
+    return (
+        f"{region}|{item.get('dong') or ''}|{band}|{kind_type}",
+        f"{region}||{band}|{kind_type}",
+    )
+
+
+class PriceStats:
+    """kind(trade/rent)별 그룹 분포 모음. 상태 dict는 store.py가 그룹 단위로 저장."""
+
+    def __init__(self, kind, groups=None):
+        self.kind = kind
+        # 그룹 키 → {"since": ISO 날짜, "cur": Distribution, "prev": Distribution | None}
+        self.groups = {}
+        for key, g in (groups or {}).items():
+            self.groups[key] = {
+                "since": g["since"],
+                "cur": Distribution(g["cur"]),
+                "prev": Distribution(g["prev"]) if g.get("prev") else None,
+            }
+        self.changed = set()
+
+    def _group(self, key, now):
+        g = self.groups.get(key)
+        today = now.strftime("%Y-%m-%d")
+        if g is None:
+            g = self.groups[key] = {"since": today, "cur": Distribution(), "prev": None}
+        elif g["since"] < (now - timedelta(days=WINDOW_DAYS)).strftime("%Y-%m-%d"):
+            # 창이 지나면 새 분포 시작, 직전 분포는 표본이 찰 때까지 보조로 사용
+            g.update(since=today, prev=g["cur"], cur=Distribution())
+        return g
+
+    def update(self, items, now=None):
+        """새 거래 반영 → 반영 건수"""
+        now = now or datetime.now()
+        added = 0
+        for item in items:
+            x = price_of(self.kind, item)
+            if not x:
+                continue
+            for key in group_keys(self.kind, item):
+                self._group(key, now)["cur"].add(x)
+                self.changed.add(key)
+            added += 1
+        return added
+
+    def _dist(self, key, min_samples):
+        g = self.groups.get(key)
+        if not g:
+            return None
+        for dist in (g["cur"], g["prev"]):
+            if dist is not None and dist.count >= min_samples:
+                return dist
+        return None
+
+    def score(self, item):
+        """{"median", "ratio", "z", "anomaly"} — 기준 분포가 없으면 None"""
+        x = price_of(self.kind, item)
+        if not x:
+            return None
+        dong_key, region_key = group_keys(self.kind, item)
+        dist = self._dist(dong_key, DONG_MIN_SAMPLES) or self._dist(region_key, REGION_MIN_SAMPLES)
+        if dist is None:
+            return None
+        q1, median, q3 = dist.quartiles()
+        if not median:
+            return None
+        sigma = (q3 - q1) / IQR_TO_SIGMA
+        return {
+            "median": round(median),
+            "ratio": round(x / median, 3),
+            "z": round((x - median) / sigma, 2) if sigma > 0 else None,
+            "anomaly": type_of(self.kind, item) in FLAGGED_TYPES and x < median * ANOMALY_LOW_RATIO,
+        }
+
+    def state(self, key):
+        g = self.groups[key]
+        return {
+            "since": g["since"],
+            "cur": g["cur"].state(),
+            "prev": g["prev"].state() if g["prev"] else None,
+        }
@@ -0,0 +1,117 @@
+"""
+지하철역 근접 검색 인덱스
+- 역 좌표를 등거리 투영(km)한 격자 버킷에 담고, 가까운 셀부터 링 단위로 넓혀 가며 탐색
+- 후보는 haversine으로 정확히 재계산 → 결과는 전체 순회와 동일
+- 여러 좌표를 한 번에 넘기는 배치 API
+- main.py의 STATIONS(수도권 전체 노선으로 확장 예정)를 대상으로 사용
+"""
+
+import heapq
+import math
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LON_EQUATOR = 111.320
+
+# 격자 한 변(km). 역 간격(1~2km) 수준이면 링 1~2개 안에서 대부분 끝난다.
+CELL_KM = 1.5
+
+# 투영 거리 vs haversine 오차 여유 (수도권 위도 범위에서 1% 미만)
+PROJECTION_SLACK = 0.98
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2
+    return EARTH_RADIUS_KM * 2 * math.asin(math.sqrt(a))
+
+
+class _Grid:
+    """한 역 집합의 격자 버킷"""
+
+    def __init__(self, stations, project, cell_km):
+        self.cell_km = cell_km
+        self.project = project
+        self.cells = {}
+        for st in stations:
+            self.cells.setdefault(self.cell_of(st["lat"], st["lon"]), []).append(st)
+        xs = [cx for cx, _ in self.cells] or [0]
+        ys = [cy for _, cy in self.cells] or [0]
+        self.bounds = (min(xs), max(xs), min(ys), max(ys))
+
+    def cell_of(self, lat, lon):
+        x, y = self.project(lat, lon)
+        return (math.floor(x / self.cell_km), math.floor(y / self.cell_km))
+
+    def _max_ring(self, cx, cy):
+        # 이 링을 넘으면 격자 전체를 다 본 것
+        x0, x1, y0, y1 = self.bounds
+        return max(abs(cx - x0), abs(cx - x1), abs(cy - y0), abs(cy - y1))
+
+    def _ring(self, cx, cy, r):
+        if r == 0:
+            yield (cx, cy)
+            return
+        for dx in range(-r, r + 1):
+            yield (cx + dx, cy - r)
+            yield (cx + dx, cy + r)
+        for dy in range(-r + 1, r):
+            yield (cx - r, cy + dy)
+            yield (cx + r, cy + dy)
+
+    def query(self, lat, lon, k=1):
+        """가까운 순 [(거리 km, 역), ...] 최대 k개"""
+        if not self.cells:
+            return []
+        cx, cy = self.cell_of(lat, lon)
+        max_ring = self._max_ring(cx, cy)
+        best = []  # (-거리, 순번, 역) 최대 힙, 크기 k
+        seq = 0
+        r = 0
+        while r <= max_ring:
+            for cell in self._ring(cx, cy, r):
+                for st in self.cells.get(cell, ()):
+                    d = haversine(lat, lon, st["lat"], st["lon"])
+                    seq += 1
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, -seq, st))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, -seq, st))
+            # 링 r까지 다 봤으면 남은 역은 투영 거리로 최소 r * cell_km 이상 떨어져 있다
+            if len(best) == k and -best[0][0] <= r * self.cell_km * PROJECTION_SLACK:
+                break
+            r += 1
+        # 거리순 (동률은 StationIndex._sorted에서 목록 순서로 정리)
+        return [(-nd, st) for nd, _, st in sorted(best, key=lambda b: (-b[0], -b[1]))]
+
+
+class StationIndex:
+    """역 목록 전체 격자 인덱스"""
+
+    def __init__(self, stations, cell_km=CELL_KM):
+        self.stations = list(stations)
+        lat0 = sum(st["lat"] for st in self.stations) / len(self.stations) if self.stations else 37.5
+        km_per_deg_lon = KM_PER_DEG_LON_EQUATOR * math.cos(math.radians(lat0))
+
+        def project(lat, lon):
+            return lon * km_per_deg_lon, lat * KM_PER_DEG_LAT
+
+        # 같은 거리 동률일 때 목록 순서를 지키도록 원래 순번을 붙여 둔다
+        self._order = {id(st): i for i, st in enumerate(self.stations)}
+        self._all = _Grid(self.stations, project, cell_km)
+
+    def _sorted(self, hits):
+        return sorted(hits, key=lambda h: (h[0], self._order[id(h[1])]))
+
+    def nearest(self, lat, lon):
+        """(가장 가까운 역, 거리 km). 역이 없으면 (None, inf)"""
+        hits = self._sorted(self._all.query(lat, lon, k=1))
+        if not hits:
+            return None, float("inf")
+        dist, st = hits[0]
+        return st, dist
+
+    def nearest_many(self, coords):
+        """[(lat, lon), ...] → [(역, 거리 km), ...] (입력 순서 유지)"""
+        return [self.nearest(lat, lon) for lat, lon in coords]
@@ -0,0 +1,807 @@
+"""
+SQLite 저장소 (monitor.db, WAL 모드)
+- 매매/전월세 거래, 발송 ID, 좌표, 단지 정보(세대수), 워치리스트(flagship) 거래, 거래가 분포 스케치를 한 파일에 보관
+- 실행마다 JSON 전체를 읽고 다시 쓰는 대신, 바뀐 행만 INSERT/UPDATE
+- data.json / data-rent.json / coord_cache.json / flagship_history.json 은 이 DB에서 뽑아내는 대시보드용 산출물
+- monitor.db 자체는 git에 올리지 않고 Actions 캐시로 이어 쓴다. 캐시가 없을 때를 대비해 발송 키는
+  sent_keys.json(git 추적)으로도 내보내고, 새 DB를 만들 때 위 JSON들과 함께 다시 읽어 들인다
+  (data.json / data-rent.json 은 data/manifest.json 의 delta까지 적용하고 내보내기 기준 상태도 복원)
+- DB가 처음 만들어질 때 기존 JSON 상태 파일을 1회 이관
+- main.py, commute_update.py, flagship_backfill.py가 open_store()로 같은 DB를 쓴다
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from molit_api import KST
+from price_stats import PriceStats
+
+BASE_DIR = Path(__file__).parent
+DB_PATH = BASE_DIR / "monitor.db"
+
+# 대시보드(data.json / data-rent.json)에 내보내는 기간. DB에는 전체 이력이 남는다.
+DASHBOARD_DAYS = 90
+
+# 발송 키 만료 여유일. 필터 max_days_ago를 넘긴 거래는 다시 필터를 통과하지 못하므로 그 뒤로는 보관할 필요가 없다.
+SENT_GRACE_DAYS = 1
+
+# 조회 실패(세대수·좌표) 재시도 간격: 실패 횟수별 1일 → 3일 → 7일 → 14일 → 30일(이후 고정)
+RETRY_BACKOFF_DAYS = (1, 3, 7, 14, 30)
+
+# 이관 대상 기존 JSON 상태 파일
+LEGACY_SENT = {"trade": BASE_DIR / "sent_history.json", "rent": BASE_DIR / "sent_history_rent.json"}
+LEGACY_COORDS = BASE_DIR / "coord_cache.json"
+LEGACY_APT_INFO = BASE_DIR / "apt_info_cache.json"
+LEGACY_DATA = {"trade": BASE_DIR / "data.json", "rent": BASE_DIR / "data-rent.json"}
+LEGACY_FLAGSHIP = BASE_DIR / "flagship_history.json"
+# 대시보드 manifest: rows.{kind}.deltas(manifest 기준 상대 경로)를 스냅샷 위에 다시 적용해 이관
+LEGACY_MANIFEST = BASE_DIR / "data" / "manifest.json"
+
+# 발송 키 내보내기 (DB 캐시 유실 시 중복 알림 방지용, git 추적)
+SENT_KEYS_PATH = BASE_DIR / "sent_keys.json"
+
+# data.json / data-rent.json 항목 필드 순서 = 테이블 컬럼 순서
+TRADE_FIELDS = (
+    "name", "region", "dong", "area_m2", "area_py", "price", "price_per_py", "floor",
+    "built_year", "households", "station", "line", "walk_min", "trade_date", "link",
+    "regulated", "lat", "lon",
+)
+RENT_FIELDS = (
+    "name", "region", "dong", "area_m2", "area_py", "deposit", "monthly_rent", "rent_type",
+    "deposit_per_py", "floor", "built_year", "households", "station", "line", "walk_min",
+    "trade_date", "contract_term", "renewal", "prev_deposit", "prev_monthly", "link",
+    "lat", "lon",
+)
+FIELDS = {"trade": TRADE_FIELDS, "rent": RENT_FIELDS}
+TABLES = {"trade": "trades", "rent": "rents"}
+
+FLAGSHIP_TX_FIELDS = ("trade_date", "date", "price", "floor", "area_m2", "area_py", "deal_day")
+
+# prev_deposit / prev_monthly 는 API 원문("" 또는 숫자 문자열)을 그대로 보관 → 타입 선언 없음
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    region TEXT NOT NULL,
+    dong TEXT,
+    area_m2 REAL,
+    area_py REAL,
+    price INTEGER,
+    price_per_py INTEGER,
+    floor INTEGER,
+    built_year INTEGER,
+    households INTEGER,
+    station TEXT,
+    line TEXT,
+    walk_min INTEGER,
+    trade_date TEXT,
+    link TEXT,
+    regulated INTEGER,
+    lat REAL,
+    lon REAL,
+    UNIQUE (region, name, area_m2, price, floor, trade_date)
+);
+CREATE INDEX IF NOT EXISTS trades_complex ON trades (region, name, area_m2, trade_date);
+CREATE INDEX IF NOT EXISTS trades_date ON trades (trade_date);
+-- 세대수 보완 대상(households = 0)만 담는 부분 인덱스: 보완이 끝난 행은 인덱스에서 빠진다
+CREATE INDEX IF NOT EXISTS trades_zero_households ON trades (region, name) WHERE households = 0;
+
+CREATE TABLE IF NOT EXISTS rents (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    region TEXT NOT NULL,
+    dong TEXT,
+    area_m2 REAL,
+    area_py REAL,
+    deposit INTEGER,
+    monthly_rent INTEGER,
+    rent_type TEXT,
+    deposit_per_py INTEGER,
+    floor INTEGER,
+    built_year INTEGER,
+    households INTEGER,
+    station TEXT,
+    line TEXT,
+    walk_min INTEGER,
+    trade_date TEXT,
+    contract_term TEXT,
+    renewal TEXT,
+    prev_deposit,
+    prev_monthly,
+    link TEXT,
+    lat REAL,
+    lon REAL,
+    UNIQUE (region, name, area_m2, deposit, monthly_rent, floor, trade_date)
+);
+CREATE INDEX IF NOT EXISTS rents_complex ON rents (region, name, area_m2, trade_date);
+CREATE INDEX IF NOT EXISTS rents_date ON rents (trade_date);
+CREATE INDEX IF NOT EXISTS rents_zero_households ON rents (region, name) WHERE households = 0;
+
+-- make_trade_id 문자열 대신 64비트 해시만 보관. trade_date 기준으로 만료.
+CREATE TABLE IF NOT EXISTS sent_keys (
+    kind TEXT NOT NULL,
+    key_hash INTEGER NOT NULL,
+    trade_date TEXT NOT NULL,
+    PRIMARY KEY (kind, key_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sent_keys_date ON sent_keys (trade_date);
+
+CREATE TABLE IF NOT EXISTS coords (
+    key TEXT PRIMARY KEY,
+    lat REAL,
+    lon REAL
+);
+
+CREATE TABLE IF NOT EXISTS apt_info (
+    key TEXT PRIMARY KEY,
+    households INTEGER,
+    kapt_code TEXT
+);
+
+-- 단지별 좌표 + 최근접 역. key는 coord_cache와 같은 주소 키, 역 목록(STATIONS)이 바뀌면 버전으로 무효화.
+CREATE TABLE IF NOT EXISTS complex_enrichment (
+    key TEXT PRIMARY KEY,
+    stations_version TEXT NOT NULL,
+    lat REAL,
+    lon REAL,
+    station TEXT,
+    line TEXT,
+    dist_km REAL,
+    walk_min INTEGER
+);
+
+-- 시군구별 단지 목록 (AptListService3 응답 items 그대로, JSON). meta: 변경 확인용 totalCount/해시/ETag
+CREATE TABLE IF NOT EXISTS apt_lists (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    meta TEXT
+);
+
+-- 실패한 외부 조회(kind: apt_info / geocode)와 다음 재시도 시각
+CREATE TABLE IF NOT EXISTS lookup_failures (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    reason TEXT,
+    attempts INTEGER NOT NULL,
+    failed_at TEXT NOT NULL,
+    retry_at TEXT NOT NULL,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS flagship_complexes (
+    id TEXT PRIMARY KEY,
+    meta TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS flagship_tx (
+    id INTEGER PRIMARY KEY,
+    watch_id TEXT NOT NULL,
+    trade_date TEXT,
+    date TEXT NOT NULL,
+    price INTEGER,
+    floor INTEGER,
+    area_m2 REAL,
+    area_py REAL,
+    deal_day TEXT,
+    UNIQUE (watch_id, date, deal_day, floor, price)
+);
+
+-- data.json / data-rent.json 스냅샷 + delta로 마지막에 내보낸 항목 상태 (다음 delta 계산 기준)
+CREATE TABLE IF NOT EXISTS export_rows (
+    kind TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    households INTEGER,
+    lat REAL,
+    lon REAL,
+    PRIMARY KEY (kind, id)
+) WITHOUT ROWID;
+
+-- 그룹별 거래가 분포 스케치 (price_stats.PriceStats 상태, 이상가격 감지용)
+CREATE TABLE IF NOT EXISTS price_stats (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def trade_key_hash(trade_id):
+    """거래 ID → 부호 있는 64비트 정수 (SQLite INTEGER에 그대로 저장)"""
+    digest = hashlib.blake2b(trade_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _id_trade_date(trade_id):
+    # make_trade_id / make_rent_trade_id 는 "..._YYYYMMDD"로 끝난다
+    ymd = trade_id.rsplit("_", 1)[-1]
+    if len(ymd) == 8 and ymd.isdigit():
+        return f"{ymd[:4]}-{ymd[4:6]}-{ymd[6:]}"
+    return ""
+
+
+def dashboard_cutoff(now):
+    """대시보드 노출 하한 거래일 (YYYY-MM-DD)"""
+    return (now - timedelta(days=DASHBOARD_DAYS)).strftime("%Y-%m-%d")
+
+
+def _read_json(path, default):
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return default
+
+
+def _replay_export(path, manifest_rows):
+    """data.json / data-rent.json 스냅샷에 manifest delta를 순서대로 적용
+    → (거쳐 간 모든 항목, 마지막으로 내보낸 항목, export 상태).
+    id 없는 이전 형식이거나 manifest·delta가 스냅샷 버전과 맞지 않으면 상태는 None (다음 실행에서 스냅샷)"""
+    snapshot = _read_json(path, {})
+    props = snapshot.get("properties", [])
+    version = snapshot.get("version")
+    if not props or "id" not in props[0] or not manifest_rows or manifest_rows.get("version") != version:
+        return props, props, None
+    published = {p["id"]: dict(p) for p in props}
+    seen = dict(published)
+    names = []
+    for rel in manifest_rows.get("deltas", []):
+        delta = _read_json(LEGACY_MANIFEST.parent / rel, None)
+        if delta is None or delta.get("base") != version:
+            return list(seen.values()), list(published.values()), None
+        for i in delta["removed"]:
+            published.pop(i, None)
+        for change in delta["changed"]:
+            if change["id"] in published:
+                published[change["id"]].update(change)
+        for p in delta["added"]:
+            published[p["id"]] = dict(p)
+        seen.update(published)
+        names.append(Path(rel).name)
+    state = {
+        "version": version,
+        "compacted_at": datetime.strptime(version, "%Y%m%d%H%M").replace(tzinfo=KST).isoformat(),
+        "deltas": names,
+    }
+    return list(seen.values()), list(published.values()), state
+
+
+def write_json(data, path):
+    """대시보드 산출물 저장 (기존 JSON 파일과 같은 포맷)"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _flagship_row(tx):
+    # flagship_backfill.py 구버전 거래는 면적 키가 "area"
+    row = dict(tx)
+    if "area_m2" not in row and "area" in row:
+        row["area_m2"] = row["area"]
+    return [row.get(f) for f in FLAGSHIP_TX_FIELDS]
+
+
+class _MappingTable(MutableMapping):
+    """key → dict 테이블을 dict처럼 쓰는 래퍼.
+    읽기는 메모리 사본, 쓰기/삭제는 즉시 DB에 반영 (get_coordinates 등 기존 dict 기반 코드 그대로 사용)."""
+
+    def __init__(self, store, table, fields, scope=None):
+        self._store = store
+        self._table = table
+        self._fields = fields  # ((dict 키, 컬럼), ...)
+        self._scope = scope  # (컬럼, 값): 이 값의 행만 보이고, 쓸 때도 함께 기록
+        columns = ", ".join(col for _, col in fields)
+        where, params = "", []
+        if scope:
+            where, params = f" WHERE {scope[0]} = ?", [scope[1]]
+        rows = store.conn.execute(f"SELECT key, {columns} FROM {table}{where}", params)
+        self._data = {row[0]: self._decode(row[1:]) for row in rows}
+        self.dirty = False
+
+    def _decode(self, values):
+        return {name: value for (name, _), value in zip(self._fields, values)}
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        columns = [col for _, col in self._fields]
+        values = [value.get(name) for name, _ in self._fields]
+        row = [key, *values]
+        if self._scope:
+            columns.append(self._scope[0])
+            row.append(self._scope[1])
+        marks = ", ".join("?" for _ in row)
+        with self._store.lock, self._store.conn:
+            self._store.conn.execute(
+                f"INSERT OR REPLACE INTO {self._table} (key, {', '.join(columns)}) VALUES ({marks})",
+                row,
+            )
+            self._data[key] = self._decode(values)
+            self.dirty = True
+
+    def __delitem__(self, key):
+        with self._store.lock, self._store.conn:
+            del self._data[key]
+            self._store.conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+            self.dirty = True
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _now_iso():
+    return datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+
+
+class _JsonTable(MutableMapping):
+    """key → JSON 값 테이블을 dict처럼 쓰는 래퍼.
+    값은 통째로 직렬화하고, 갱신 시각(updated_at)과 부가정보(meta)를 함께 기록한다."""
+
+    def __init__(self, store, table):
+        self._store = store
+        self._table = table
+        rows = store.conn.execute(f"SELECT key, value, updated_at, meta FROM {table}")
+        self._data = {}
+        self.updated_at = {}
+        self.meta = {}
+        for key, value, updated_at, meta in rows:
+            self._data[key] = json.loads(value)
+            self.updated_at[key] = updated_at
+            self.meta[key] = json.loads(meta) if meta else {}
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self.put(key, value, self.meta.get(key, {}))
+
+    def put(self, key, value, meta):
+        updated_at = _now_iso()
+        with self._store.lock, self._store.conn:
+            self._store.conn.execute(
+                f"INSERT OR REPLACE INTO {self._table} (key, value, updated_at, meta) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), updated_at, json.dumps(meta, ensure_ascii=False)),
+            )
+            self._data[key] = value
+            self.updated_at[key] = updated_at
+            self.meta[key] = meta
+
+    def touch(self, key, meta=None):
+        """값은 그대로 두고 갱신 시각(+meta)만 새로 기록 — "확인했고 바뀐 것 없음" """
+        updated_at = _now_iso()
+        meta = self.meta.get(key, {}) if meta is None else meta
+        with self._store.lock, self._store.conn:
+            self._store.conn.execute(
+                f"UPDATE {self._table} SET updated_at = ?, meta = ? WHERE key = ?",
+                (updated_at, json.dumps(meta, ensure_ascii=False), key),
+            )
+            self.updated_at[key] = updated_at
+            self.meta[key] = meta
+
+    def __delitem__(self, key):
+        with self._store.lock, self._store.conn:
+            del self._data[key]
+            self.updated_at.pop(key, None)
+            self.meta.pop(key, None)
+            self._store.conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class NegativeCache:
+    """세대수·좌표 조회 실패 기록 (kind별). 실패할수록 재시도 간격을 늘려 같은 단지에 API를 계속 쓰지 않는다."""
+
+    KIND_LABELS = {"apt_info": "세대수", "geocode": "좌표"}
+
+    def __init__(self, store):
+        self._store = store
+        self._entries = {}
+        rows = store.conn.execute("SELECT kind, key, reason, attempts, failed_at, retry_at FROM lookup_failures")
+        for kind, key, reason, attempts, failed_at, retry_at in rows:
+            self._entries[(kind, key)] = {"reason": reason, "attempts": attempts, "failed_at": failed_at, "retry_at": retry_at}
+        self.skipped = {}
+
+    def blocked(self, kind, key, now=None):
+        """재시도 시각 전이면 실패 기록 반환 (호출 건너뜀), 아니면 None"""
+        entry = self._entries.get((kind, key))
+        if entry is None:
+            return None
+        now = now or datetime.now()
+        if now.strftime("%Y-%m-%dT%H:%M:%S") >= entry["retry_at"]:
+            return None
+        with self._store.lock:
+            self.skipped[kind] = self.skipped.get(kind, 0) + 1
+        return entry
+
+    def record(self, kind, key, reason, now=None):
+        now = now or datetime.now()
+        with self._store.lock, self._store.conn:
+            prev = self._entries.get((kind, key))
+            attempts = (prev["attempts"] if prev else 0) + 1
+            delay = RETRY_BACKOFF_DAYS[min(attempts, len(RETRY_BACKOFF_DAYS)) - 1]
+            entry = {
+                "reason": reason,
+                "attempts": attempts,
+                "failed_at": now.strftime("%Y-%m-%dT%H:%M:%S"),
+                "retry_at": (now + timedelta(days=delay)).strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            self._store.conn.execute(
+                "INSERT OR REPLACE INTO lookup_failures (kind, key, reason, attempts, failed_at, retry_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, key, reason, attempts, entry["failed_at"], entry["retry_at"]),
+            )
+            self._entries[(kind, key)] = entry
+        return entry
+
+    def clear(self, kind, key):
+        with self._store.lock, self._store.conn:
+            if self._entries.pop((kind, key), None) is not None:
+                self._store.conn.execute("DELETE FROM lookup_failures WHERE kind = ? AND key = ?", (kind, key))
+
+    def report(self):
+        counts = {}
+        for kind, _ in self._entries:
+            counts[kind] = counts.get(kind, 0) + 1
+        if not counts and not self.skipped:
+            return "실패 기록 없음"
+        parts = [
+            f"{self.KIND_LABELS.get(kind, kind)} {counts.get(kind, 0)}건 보류 (이번 실행 건너뜀 {self.skipped.get(kind, 0)}건)"
+            for kind in sorted(set(counts) | set(self.skipped))
+        ]
+        return " / ".join(parts)
+
+
+class Store:
+    """monitor.db 연결. 쓰기는 lock으로 직렬화해 여러 스레드에서 공유 가능."""
+
+    def __init__(self, path=DB_PATH):
+        self.path = Path(path)
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._upgrade()
+        if self.get_meta("migrated_at") is None:
+            self.migrate_json()
+        self.coords = _MappingTable(self, "coords", (("lat", "lat"), ("lon", "lon")))
+        self.apt_info = _MappingTable(self, "apt_info", (("세대수", "households"), ("단지코드", "kapt_code")))
+        self.apt_lists = _JsonTable(self, "apt_lists")
+        self.negative = NegativeCache(self)
+
+    # ─── meta ───
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _upgrade(self):
+        """이전 스키마 보정: apt_lists.meta 컬럼 추가, 문자열 발송 ID 테이블(sent_ids)을 해시 키로 변환"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(apt_lists)")}
+        if "meta" not in columns:
+            with self.lock, self.conn:
+                self.conn.execute("ALTER TABLE apt_lists ADD COLUMN meta TEXT")
+
+        exists = self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sent_ids'").fetchone()
+        if not exists:
+            return
+        by_kind = {}
+        for kind, trade_id in self.conn.execute("SELECT kind, trade_id FROM sent_ids ORDER BY seq"):
+            by_kind.setdefault(kind, []).append(trade_id)
+        for kind, ids in by_kind.items():
+            self.add_sent(kind, [(tid, _id_trade_date(tid)) for tid in ids])
+        with self.lock, self.conn:
+            self.conn.execute("DROP TABLE sent_ids")
+
+    # ─── 기존 JSON 이관 ───
+    def migrate_json(self):
+        """빈 DB에 기존 JSON 상태 파일을 옮겨 담는다 (최초 1회)"""
+        counts = {}
+        for kind, path in LEGACY_SENT.items():
+            ids = _read_json(path, [])
+            self.add_sent(kind, [(tid, _id_trade_date(tid)) for tid in ids])
+            counts[path.name] = len(ids)
+        counts[SENT_KEYS_PATH.name] = self.import_sent(SENT_KEYS_PATH)
+
+        coords = _read_json(LEGACY_COORDS, {})
+        apt_info = _read_json(LEGACY_APT_INFO, {})
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO coords (key, lat, lon) VALUES (?, ?, ?)",
+                [(k, v.get("lat"), v.get("lon")) for k, v in coords.items() if v],
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO apt_info (key, households, kapt_code) VALUES (?, ?, ?)",
+                [(k, v.get("세대수", 0), v.get("단지코드", "")) for k, v in apt_info.items() if v],
+            )
+        counts[LEGACY_COORDS.name] = len(coords)
+        counts[LEGACY_APT_INFO.name] = len(apt_info)
+
+        # 스냅샷만 읽으면 delta로 추가된 거래가 빠져 다음 실행에서 "신규"로 다시 잡힌다
+        # → delta까지 적용하고 id를 그대로 살려, 내보내기 기준 상태도 이어서 delta를 쓰도록 복원
+        manifest_rows = _read_json(LEGACY_MANIFEST, {}).get("rows", {})
+        for kind, path in LEGACY_DATA.items():
+            props, published, state = _replay_export(path, manifest_rows.get(kind))
+            if state is None:
+                self.add_properties(kind, props)
+            else:
+                self._restore_properties(kind, props)
+                self.reset_export(kind, published)
+                self.set_meta(f"export_{kind}", json.dumps(state))
+            counts[path.name] = len(props)
+
+        flagship = _read_json(LEGACY_FLAGSHIP, None)
+        if flagship:
+            self.save_flagship_history(flagship)
+            counts[LEGACY_FLAGSHIP.name] = sum(len(e.get("transactions", [])) for e in flagship.get("watchlist", []))
+
+        self.set_meta("migrated_at", _now_iso())
+        if any(counts.values()):
+            summary = ", ".join(f"{name} {n}" for name, n in counts.items() if n)
+            print(f"  [DB] 기존 JSON 이관 완료: {summary}")
+
+    # ─── 매매 / 전월세 거래 ───
+    def add_properties(self, kind, items):
+        """대시보드 항목을 INSERT (이미 있는 거래는 무시). 실제로 새로 들어간 항목만 반환."""
+        table, fields = TABLES[kind], FIELDS[kind]
+        sql = f"INSERT OR IGNORE INTO {table} ({', '.join(fields)}) VALUES ({', '.join('?' for _ in fields)})"
+        inserted = []
+        with self.lock, self.conn:
+            for item in items:
+                cur = self.conn.execute(sql, [item.get(f) for f in fields])
+                if cur.rowcount:
+                    inserted.append(item)
+        return inserted
+
+    def _restore_properties(self, kind, items):
+        """내보냈던 항목을 DB id 그대로 INSERT (이관 전용: 스냅샷·delta의 id를 다음 delta 계산에 이어 쓴다)"""
+        table, fields = TABLES[kind], ("id",) + FIELDS[kind]
+        sql = f"INSERT OR IGNORE INTO {table} ({', '.join(fields)}) VALUES ({', '.join('?' for _ in fields)})"
+        with self.lock, self.conn:
+            self.conn.executemany(sql, [[item.get(f) for f in fields] for item in items])
+
+    def properties(self, kind, since=None, with_id=False):
+        """대시보드 항목 목록 (trade_date 내림차순). since가 있으면 그 이후 + 거래일 미상 항목만.
+        with_id=True면 각 항목 앞에 DB id (delta 내보내기용 행 식별자)."""
+        table, fields = TABLES[kind], FIELDS[kind]
+        if with_id:
+            fields = ("id",) + fields
+        sql = f"SELECT {', '.join(fields)} FROM {table}"
+        params = []
+        if since:
+            sql += " WHERE trade_date >= ? OR trade_date = '' OR trade_date IS NULL"
+            params.append(since)
+        sql += " ORDER BY trade_date DESC, id"
+        rows = self.conn.execute(sql, params).fetchall()
+        items = [dict(zip(fields, row)) for row in rows]
+        if kind == "trade":
+            for item in items:
+                item["regulated"] = bool(item["regulated"])
+        return items
+
+    def missing_coords(self, kind):
+        """좌표 없는 (region, dong, name) 목록"""
+        table = TABLES[kind]
+        rows = self.conn.execute(
+            f"SELECT DISTINCT region, COALESCE(dong, ''), name FROM {table} WHERE NOT lat OR NOT lon OR lat IS NULL OR lon IS NULL"
+        )
+        return rows.fetchall()
+
+    def set_coords(self, kind, region, dong, name, lat, lon):
+        table = TABLES[kind]
+        with self.lock, self.conn:
+            cur = self.conn.execute(
+                f"UPDATE {table} SET lat = ?, lon = ? WHERE region = ? AND COALESCE(dong, '') = ? AND name = ? "
+                "AND (NOT lat OR NOT lon OR lat IS NULL OR lon IS NULL)",
+                (lat, lon, region, dong, name),
+            )
+        return cur.rowcount
+
+    def zero_households(self, kind, since=None):
+        """세대수 미확인(0) 항목의 (region, name) 목록과 항목 수"""
+        table = TABLES[kind]
+        sql = f"SELECT region, name, COUNT(*) FROM {table} WHERE households = 0"
+        params = []
+        if since:
+            sql += " AND (trade_date >= ? OR trade_date = '' OR trade_date IS NULL)"
+            params.append(since)
+        sql += " GROUP BY region, name ORDER BY MIN(id)"
+        return self.conn.execute(sql, params).fetchall()
+
+    def set_households(self, kind, updates):
+        """[(region, name, households), ...] 를 한 트랜잭션으로 반영 → 갱신된 항목 수.
+        (region, name) 부분 인덱스로 해당 단지의 세대수 0 행만 바로 찾아 갱신한다."""
+        table = TABLES[kind]
+        with self.lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                f"UPDATE {table} SET households = ? WHERE region = ? AND name = ? AND households = 0",
+                [(households, region, name) for region, name, households in updates],
+            )
+            return self.conn.total_changes - before
+
+    # ─── 내보내기 delta ───
+    def export_delta(self, kind, items):
+        """마지막으로 내보낸 상태 대비 변경분 → (추가 항목, 빠진 id, 바뀐 필드).
+        items는 properties(with_id=True) 결과. 반환과 동시에 기준 상태를 items로 갱신한다.
+        바뀐 필드는 DB에서 갱신되는 세대수·좌표만: [{"id", "households"?, "lat"?, "lon"?}, ...]"""
+        published = {
+            row[0]: row[1:]
+            for row in self.conn.execute("SELECT id, households, lat, lon FROM export_rows WHERE kind = ?", (kind,))
+        }
+        added, changed, touched = [], [], []
+        for item in items:
+            old = published.pop(item["id"], None)
+            if old is None:
+                added.append(item)
+                touched.append(item)
+                continue
+            diff = {
+                field: item[field]
+                for field, value in zip(("households", "lat", "lon"), old)
+                if item[field] != value
+            }
+            if diff:
+                changed.append({"id": item["id"], **diff})
+                touched.append(item)
+        removed = sorted(published)
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM export_rows WHERE kind = ? AND id = ?", [(kind, i) for i in removed])
+            self._put_export_rows(kind, touched)
+        return added, removed, changed
+
+    def reset_export(self, kind, items):
+        """스냅샷을 새로 쓴 뒤 기준 상태를 통째로 교체"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM export_rows WHERE kind = ?", (kind,))
+            self._put_export_rows(kind, items)
+
+    def _put_export_rows(self, kind, items):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO export_rows (kind, id, households, lat, lon) VALUES (?, ?, ?, ?, ?)",
+            [(kind, item["id"], item["households"], item["lat"], item["lon"]) for item in items],
+        )
+
+    # ─── 거래가 분포 (이상가격) ───
+    def price_stats(self, kind):
+        """kind별 가격 분포 스케치. 처음이면(저장된 분포 없음) DB 전체 이력으로 채운다."""
+        rows = self.conn.execute("SELECT key, state FROM price_stats WHERE kind = ?", (kind,))
+        stats = PriceStats(kind, {key: json.loads(state) for key, state in rows})
+        if not stats.groups:
+            seeded = stats.update(self.properties(kind))
+            if seeded:
+                self.save_price_stats(stats)
+                print(f"  [DB] {kind} 가격 분포 초기화: {seeded}건 / {len(stats.groups)}개 그룹")
+        return stats
+
+    def save_price_stats(self, stats):
+        """update 이후 바뀐 그룹만 저장"""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO price_stats (kind, key, state) VALUES (?, ?, ?)",
+                [(stats.kind, key, json.dumps(stats.state(key), separators=(",", ":"))) for key in stats.changed],
+            )
+        stats.changed.clear()
+
+    # ─── 단지 부가정보 (좌표 + 최근접 역) ───
+    def enrichment(self, stations_version):
+        """현재 역 목록 버전의 단지 부가정보 테이블. 다른 버전 행은 여기서 정리된다."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM complex_enrichment WHERE stations_version != ?", (stations_version,))
+        fields = (("lat", "lat"), ("lon", "lon"), ("station", "station"), ("line", "line"),
+                  ("dist_km", "dist_km"), ("walk_min", "walk_min"))
+        return _MappingTable(self, "complex_enrichment", fields, scope=("stations_version", stations_version))
+
+    # ─── 발송 ID ───
+    def sent_keys(self, kind):
+        """발송 키 해시 집합 (멤버십 검사 O(1))"""
+        rows = self.conn.execute("SELECT key_hash FROM sent_keys WHERE kind = ?", (kind,))
+        return {row[0] for row in rows}
+
+    def add_sent(self, kind, entries):
+        """(거래 ID, 거래일 YYYY-MM-DD) 목록을 해시 키로 추가"""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO sent_keys (kind, key_hash, trade_date) VALUES (?, ?, ?)",
+                [(kind, trade_key_hash(tid), trade_date) for tid, trade_date in entries],
+            )
+
+    def export_sent(self, path=SENT_KEYS_PATH):
+        """발송 키를 {"trade"|"rent": [[key_hash, 거래일], ...]} JSON으로 저장 (내용이 같으면 쓰지 않음)"""
+        data = {}
+        for kind, key_hash, trade_date in self.conn.execute(
+            "SELECT kind, key_hash, trade_date FROM sent_keys ORDER BY kind, trade_date, key_hash"
+        ):
+            data.setdefault(kind, []).append([key_hash, trade_date])
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        path = Path(path)
+        if not path.exists() or path.read_bytes() != body:
+            path.write_bytes(body)
+        return sum(len(rows) for rows in data.values())
+
+    def import_sent(self, path=SENT_KEYS_PATH):
+        """export_sent() 파일의 발송 키를 그대로(해시 상태로) 추가 → 건수"""
+        data = _read_json(Path(path), {})
+        with self.lock, self.conn:
+            for kind, rows in data.items():
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO sent_keys (kind, key_hash, trade_date) VALUES (?, ?, ?)",
+                    [(kind, key_hash, trade_date) for key_hash, trade_date in rows],
+                )
+        return sum(len(rows) for rows in data.values())
+
+    def expire_sent(self, now, max_days_ago):
+        """필터 기간(max_days_ago + 여유일)을 벗어난 거래의 발송 키 삭제. 삭제 건수 반환."""
+        before = (now - timedelta(days=max_days_ago + SENT_GRACE_DAYS)).strftime("%Y-%m-%d")
+        with self.lock, self.conn:
+            cur = self.conn.execute("DELETE FROM sent_keys WHERE trade_date < ?", (before,))
+        return cur.rowcount
+
+    # ─── flagship 워치리스트 ───
+    def load_flagship_history(self):
+        """flagship_history.json과 같은 구조의 dict"""
+        tx_by_id = {}
+        rows = self.conn.execute(
+            f"SELECT watch_id, {', '.join(FLAGSHIP_TX_FIELDS)} FROM flagship_tx "
+            "ORDER BY COALESCE(trade_date, date) DESC, deal_day DESC, id"
+        )
+        for row in rows:
+            tx = {f: v for f, v in zip(FLAGSHIP_TX_FIELDS, row[1:]) if v is not None}
+            tx_by_id.setdefault(row[0], []).append(tx)
+
+        watchlist = []
+        for watch_id, meta in self.conn.execute("SELECT id, meta FROM flagship_complexes ORDER BY rowid"):
+            entry = json.loads(meta)
+            entry["transactions"] = tx_by_id.get(watch_id, [])
+            watchlist.append(entry)
+        return {"updated_at": self.get_meta("flagship_updated_at", ""), "watchlist": watchlist}
+
+    def save_flagship_history(self, history):
+        """단지 정보는 덮어쓰고, 거래는 새로 생긴 것만 INSERT"""
+        sql = (
+            f"INSERT OR IGNORE INTO flagship_tx (watch_id, {', '.join(FLAGSHIP_TX_FIELDS)}) "
+            f"VALUES (?, {', '.join('?' for _ in FLAGSHIP_TX_FIELDS)})"
+        )
+        with self.lock, self.conn:
+            for entry in history.get("watchlist", []):
+                meta = {k: v for k, v in entry.items() if k != "transactions"}
+                self.conn.execute(
+                    "INSERT INTO flagship_complexes (id, meta) VALUES (?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET meta = excluded.meta",
+                    (entry["id"], json.dumps(meta, ensure_ascii=False)),
+                )
+                self.conn.executemany(sql, [[entry["id"], *_flagship_row(tx)] for tx in entry.get("transactions", [])])
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('flagship_updated_at', ?)",
+                (history.get("updated_at", ""),),
+            )
+
+    def close(self):
+        """WAL 내용을 본 파일에 합치고 닫는다 (캐시에 저장되는 monitor.db 하나로 완결)"""
+        with self.lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.conn.close()
+
+
+def open_store(path=DB_PATH):
+    return Store(path)
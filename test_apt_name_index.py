@@ -0,0 +1,92 @@
+"""
+AptNameIndex 테스트: 정규화 이름 exact + 2-gram 역색인 결과를 기존 선형 탐색과 비교
+- 1·2단계(이름 일치, 포함 관계)는 기존 find_kapt_code 선형 탐색과 같은 단지
+- 3단계(2-gram 겹침)는 같은 규칙을 목록 전체에 선형으로 적용한 결과와 같은 단지
+"""
+
+import random
+
+import pytest
+
+from main import AptNameIndex, _bigrams, clean_apt_name
+
+
+def linear_find(apt_name, apt_list):
+    """기존 선형 matcher (1·2단계) + 2-gram 점수 단계를 목록 순서대로 전부 훑는 기준 구현"""
+    clean_name = clean_apt_name(apt_name)
+    names = [clean_apt_name(apt.get("kaptName", "")) for apt in apt_list]
+    for apt, kname in zip(apt_list, names):
+        if kname == clean_name:
+            return apt["kaptCode"]
+    for apt, kname in zip(apt_list, names):
+        if clean_name in kname or kname in clean_name:
+            return apt["kaptCode"]
+    grams = _bigrams(clean_name)
+    best_score, best_code = 0, None
+    for apt, kname in zip(apt_list, names):
+        score = len(grams & _bigrams(kname))
+        if score > best_score:
+            best_score, best_code = score, apt["kaptCode"]
+    if best_score >= 2 and best_score * 3 >= len(grams) * 2:
+        return best_code
+    return None
+
+
+APT_LIST = [
+    {"kaptName": "상계주공7단지", "kaptCode": "A1"},
+    {"kaptName": "중계 그린 (아파트)", "kaptCode": "A2"},
+    {"kaptName": "중계그린아파트", "kaptCode": "A3"},          # 정규화하면 A2와 같은 이름
+    {"kaptName": "노원롯데캐슬시그니처", "kaptCode": "A4"},
+    {"kaptName": "하계현대", "kaptCode": "A5"},
+    {"kaptName": "하계현대2차", "kaptCode": "A6"},
+    {"kaptName": "월계센트럴아이파크", "kaptCode": "A7"},
+    {"kaptName": "월계센트럴푸르지오", "kaptCode": "A8"},
+    {"kaptName": "역", "kaptCode": "A9"},                      # 한 글자 이름
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return AptNameIndex(APT_LIST)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("상계주공7단지", "A1"),                 # exact
+    ("상계 주공 7단지", "A1"),               # 공백만 다른 exact
+    ("중계그린(아파트)", "A2"),              # 정규화 이름이 같은 단지 둘 → 목록 앞쪽
+    ("하계현대", "A5"),                      # exact가 포함 관계보다 우선
+    ("노원롯데캐슬", "A4"),                  # 검색어가 단지명에 포함
+    ("월계센트럴", "A7"),                    # 포함 관계 동률 → 목록 앞쪽
+    ("월계센트럴아이파크푸르지오", "A7"),    # 단지명이 검색어에 포함
+    ("월계센트럴로", "A7"),                  # 포함 없음, 2-gram 겹침 4:4 동률 → 목록 앞쪽
+    ("월계센트럴역", "A9"),                  # 한 글자 단지명 "역"이 포함 관계로 먼저 잡힘
+    ("노원롯데캐슬시그니쳐", "A4"),          # 오타: 2-gram 겹침
+    ("역", "A9"),                            # 한 글자 검색어 exact
+    ("역삼", "A9"),                          # 한 글자 단지명이 검색어에 포함
+    ("삼", None),                            # 한 글자, 일치 없음
+    ("도봉한신", None),                      # 겹치는 단지 없음
+    ("서울아파트", None),                    # "아파트" 접미사만 겹침 → 매칭하지 않음
+])
+def test_find(index, query, expected):
+    assert index.find(query) == expected
+    assert linear_find(query, APT_LIST) == expected
+
+
+def test_empty_list():
+    assert AptNameIndex([]).find("상계주공") is None
+
+
+def test_matches_linear_on_random_names():
+    # 작은 글자 집합으로 만든 이름이라 포함·겹침·동률이 자주 생긴다
+    rng = random.Random(12)
+    alphabet = "가나다라마 ()"
+
+    def name():
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 6)))
+
+    for _ in range(200):
+        apt_list = [{"kaptName": name(), "kaptCode": f"K{i}"} for i in range(rng.randint(0, 30))]
+        index = AptNameIndex(apt_list)
+        for _ in range(20):
+            query = name()
+            assert index.find(query) == linear_find(query, apt_list), (query, apt_list)
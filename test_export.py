@@ -0,0 +1,193 @@
+"""
+대시보드 내보내기 테스트
+- export_rows: 스냅샷 + delta(추가 / 제외 / 세대수·좌표 변경)를 순서대로 적용하면 매 실행의 전체 항목과 같다
+- DB 캐시 유실: 스냅샷 + delta로 새 DB를 채우면 이미 내보낸 거래가 신규로 잡히지 않고, 다음 실행도 delta를 쓴다
+- encode_columnar: 열 단위 표현을 data_core.js decodeColumnar와 같은 방식으로 풀면 원래 레코드와 같다
+"""
+
+import json
+import shutil
+import subprocess
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+import main
+import store as store_db
+
+ROOT = Path(__file__).parent
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """기존 JSON 이관 없이 빈 임시 DB + 임시 delta 폴더"""
+    missing = tmp_path / "missing.json"
+    monkeypatch.setattr(store_db, "LEGACY_SENT", {"trade": missing, "rent": missing})
+    monkeypatch.setattr(store_db, "LEGACY_DATA", {"trade": missing, "rent": missing})
+    for name in ("LEGACY_COORDS", "LEGACY_APT_INFO", "LEGACY_FLAGSHIP", "LEGACY_MANIFEST", "SENT_KEYS_PATH"):
+        monkeypatch.setattr(store_db, name, missing)
+    monkeypatch.setattr(main, "DELTA_DIR", tmp_path / "deltas")
+    conn = store_db.Store(tmp_path / "monitor.db")
+    yield conn
+    conn.close()
+
+
+def item(i, households=500, lat=37.6, lon=127.05):
+    return {"id": i, "name": f"단지{i}", "price": 50000 + i, "households": households, "lat": lat, "lon": lon}
+
+
+def replay(path, manifest_rows):
+    """스냅샷을 읽고 manifest에 적힌 delta를 순서대로 적용 → {id: 항목}"""
+    rows = {p["id"]: dict(p) for p in json.loads(path.read_text(encoding="utf-8"))["properties"]}
+    for rel in manifest_rows["deltas"]:
+        delta = json.loads((main.DELTA_DIR.parent / rel).read_text(encoding="utf-8"))
+        assert delta["base"] == manifest_rows["version"]
+        for i in delta["removed"]:
+            del rows[i]
+        for change in delta["changed"]:
+            rows[change["id"]].update(change)
+        for p in delta["added"]:
+            rows[p["id"]] = dict(p)
+    return rows
+
+
+def test_snapshot_plus_deltas_reproduce_rows(db, tmp_path):
+    path = tmp_path / "data.json"
+    now = datetime(2026, 10, 1, 20)
+    runs = [
+        [item(1), item(2), item(3), item(4)],
+        # 추가 5 · 제외 2 · 세대수 변경 3 · 좌표 변경 4
+        [item(1), item(3, households=1200), item(4, lat=37.61, lon=127.06), item(5)],
+        # 변화 없음 → delta 파일을 쓰지 않음
+        [item(1), item(3, households=1200), item(4, lat=37.61, lon=127.06), item(5)],
+        # 좌표가 없어짐(None) · 전부 제외 후 새 항목
+        [item(4, lat=None, lon=None), item(6)],
+    ]
+    deltas_seen = []
+    for n, items in enumerate(runs):
+        rows = main.export_rows(db, "trade", path, items, 0, now + timedelta(hours=n))
+        deltas_seen.append(len(rows["deltas"]))
+        assert replay(path, rows) == {p["id"]: p for p in items}
+        assert rows["total_count"] == len(items)
+    assert deltas_seen == [0, 1, 1, 2]
+
+    delta = json.loads((tmp_path / rows["deltas"][-1]).read_text(encoding="utf-8"))
+    assert delta["removed"] == [1, 3, 5]
+    assert delta["changed"] == [{"id": 4, "lat": None, "lon": None}]
+    assert [p["id"] for p in delta["added"]] == [6]
+
+
+def test_compaction_rewrites_snapshot_and_drops_deltas(db, tmp_path):
+    path = tmp_path / "data.json"
+    now = datetime(2026, 10, 1, 20)
+    main.export_rows(db, "trade", path, [item(1)], 0, now)
+    rows = main.export_rows(db, "trade", path, [item(1), item(2)], 1, now + timedelta(days=1))
+    old_delta = tmp_path / rows["deltas"][0]
+    assert old_delta.exists()
+
+    later = now + timedelta(days=main.SNAPSHOT_COMPACT_DAYS)
+    rows = main.export_rows(db, "trade", path, [item(2), item(3)], 1, later)
+    assert rows["deltas"] == [] and rows["version"] == later.strftime("%Y%m%d%H%M")
+    assert not old_delta.exists()
+    assert replay(path, rows) == {2: item(2), 3: item(3)}
+
+
+def trade(i, households=500):
+    p = {f: None for f in store_db.TRADE_FIELDS}
+    p.update(name=f"단지{i}", region="서울 노원구", dong="상계동", area_m2=84.9, area_py=25.7, price=90000 + i,
+             floor=i, households=households, trade_date=f"2026-10-{i:02d}", regulated=False, lat=37.65, lon=127.06)
+    return p
+
+
+def test_cache_miss_replays_deltas(db, tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    monkeypatch.setattr(main, "DELTA_DIR", data_dir / "deltas")
+    path = tmp_path / "data.json"
+    now = datetime(2026, 10, 1, 20, tzinfo=timezone(timedelta(hours=9)))
+    runs = [[trade(1), trade(2)], [trade(1, households=1200), trade(3)], [trade(1, households=1200), trade(3), trade(4)]]
+    for n, new in enumerate(runs):
+        db.add_properties("trade", new)
+        db.set_households("trade", [(p["region"], p["name"], p["households"]) for p in new])
+        items = [p for p in db.properties("trade", with_id=True) if p["name"] in {x["name"] for x in new}]
+        rows = main.export_rows(db, "trade", path, items, 0, now + timedelta(hours=n))
+    assert len(rows["deltas"]) == 2
+    data_dir.mkdir(exist_ok=True)
+    store_db.write_json({"rows": {"trade": rows}}, data_dir / "manifest.json")
+
+    # 캐시 유실 → 빈 DB가 스냅샷 + delta로 채워짐
+    monkeypatch.setattr(store_db, "LEGACY_DATA", {"trade": path, "rent": tmp_path / "missing.json"})
+    monkeypatch.setattr(store_db, "LEGACY_MANIFEST", data_dir / "manifest.json")
+    fresh = store_db.Store(tmp_path / "fresh.db")
+    try:
+        assert fresh.add_properties("trade", runs[-1] + [trade(2)]) == []
+        # 다음 실행: 스냅샷을 다시 쓰지 않고 이어서 delta (5 추가, 1 제외)
+        snapshot = path.read_bytes()
+        db_items = fresh.properties("trade", with_id=True)
+        assert {p["id"] for p in db_items} == {p["id"] for p in db.properties("trade", with_id=True)}
+        fresh.add_properties("trade", [trade(5)])
+        items = [p for p in fresh.properties("trade", with_id=True) if p["name"] != "단지2"]
+        after = main.export_rows(fresh, "trade", path, items, 1, now + timedelta(hours=3))
+        assert after["version"] == rows["version"] and len(after["deltas"]) == 3
+        assert path.read_bytes() == snapshot
+        delta = json.loads((data_dir / after["deltas"][-1]).read_text(encoding="utf-8"))
+        assert [p["name"] for p in delta["added"]] == ["단지5"] and delta["removed"] == [] and delta["changed"] == []
+        assert replay(path, after) == {p["id"]: p for p in items}
+    finally:
+        fresh.close()
+
+
+def decode_columnar(d):
+    """data_core.js decodeColumnar와 같은 규칙"""
+    dicts = d.get("dicts") or {}
+    return [
+        {f: (dicts[f][d["columns"][f][i]] if f in dicts else d["columns"][f][i]) for f in d["fields"]}
+        for i in range(d["count"])
+    ]
+
+
+def summary(i, **overrides):
+    row = {
+        "name": f"단지{i % 3}", "region": "서울 노원구", "dong": ["상계동", "중계동"][i % 2],
+        "area_m2": 84.9 + i, "area_py": 25.7, "station": "노원" if i % 2 else None, "line": "4호선",
+        "walk_min": 7 + i, "built_year": 1990 + i, "households": 0 if i == 2 else 1000 + i,
+        "lat": 37.65 if i != 1 else None, "lon": 127.06 if i != 1 else None,
+        "trade_count": i + 1, "latest_date": f"2026-10-0{i + 1}",
+        "regulated": i == 0, "price": 60000 + i, "median_price": 60000, "min_price": 59000, "max_price": 61000,
+        "price_per_py": 2400, "history": [["2026-10-01", 60000 + i, 5]], "anomaly": i == 3, "price_z": -2.5 if i == 3 else None,
+    }
+    row.update(overrides)
+    return row
+
+
+def test_encode_columnar_round_trip():
+    records = [summary(i) for i in range(5)]
+    fields = main.SUMMARY_FIELDS["trade"]
+    encoded = main.encode_columnar(records, fields)
+    assert encoded["count"] == 5
+    assert set(encoded["dicts"]) == set(main.COLUMNAR_DICT_FIELDS) & set(fields)
+    assert encoded["dicts"]["name"] == ["단지0", "단지1", "단지2"]
+    # JSON을 거친 뒤 풀어도 같은 레코드 (regulated는 0/1로 실린다)
+    decoded = decode_columnar(json.loads(json.dumps(encoded, ensure_ascii=False)))
+    expected = [dict(r, regulated=int(r["regulated"])) for r in records]
+    assert decoded == expected
+
+    assert main.encode_columnar([], fields)["count"] == 0
+    assert decode_columnar(main.encode_columnar([], fields)) == []
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node 없음")
+def test_encode_columnar_decodes_in_data_core_js():
+    records = [summary(i) for i in range(5)]
+    encoded = main.encode_columnar(records, main.SUMMARY_FIELDS["trade"])
+    script = (
+        "const fs=require('fs'),vm=require('vm');const c={console};vm.createContext(c);"
+        "vm.runInContext(fs.readFileSync(process.argv[1],'utf8'),c);"
+        "const d=JSON.parse(fs.readFileSync(0,'utf8'));"
+        "process.stdout.write(JSON.stringify(vm.runInContext('decodeColumnar',c)(d)));"
+    )
+    out = subprocess.run(
+        ["node", "-e", script, str(ROOT / "data_core.js")],
+        input=json.dumps(encoded, ensure_ascii=False), capture_output=True, text=True, check=True,
+    )
+    assert json.loads(out.stdout) == decode_columnar(encoded)
@@ -0,0 +1,247 @@
+"""
+molit_api 테스트 (네트워크 없이 _request를 가짜 응답으로 대체)
+- 페이지네이션 + 일일 한도: 한 달을 다 못 받으면 한 건도 내보내지 않음
+- 호스트 슬롯은 응답을 다 읽은 뒤 yield 전에 반납
+- 응답 캐시: 월별 TTL, 수신 도중 실패한 응답은 객체를 남기지 않음, 용량 초과 시 LRU 제거 후 index.json ↔ objects/ 일치
+"""
+
+import hashlib
+import io
+import json
+from datetime import datetime
+
+import requests
+
+import pytest
+
+import molit_api
+
+URL = "https://apis.data.go.kr/1613000/RTMSDataSvcAptTradeDev/getRTMSDataSvcAptTradeDev"
+OLD_MONTH = "202001"   # 캐시 만료 없음
+PAGE = 10
+
+
+def rtms_xml(names, total, code="000"):
+    items = "".join(f"<item><aptNm>{n}</aptNm></item>" for n in names)
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><response>'
+        f"<header><resultCode>{code}</resultCode><resultMsg>MSG</resultMsg></header>"
+        f"<body><items>{items}</items><numOfRows>{PAGE}</numOfRows><totalCount>{total}</totalCount></body>"
+        "</response>"
+    ).encode("utf-8")
+
+
+class CutStream(io.BytesIO):
+    """cut 바이트까지 읽은 뒤 연결이 끊기는 스트림"""
+
+    def __init__(self, body, cut):
+        super().__init__(body)
+        self.cut = cut
+
+    def read(self, size=-1):
+        if self.tell() >= self.cut:
+            raise requests.exceptions.ChunkedEncodingError("connection broken")
+        if size < 0 or self.tell() + size > self.cut:
+            size = self.cut - self.tell()
+        return super().read(size)
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.raw = body if hasattr(body, "read") else io.BytesIO(body)
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeServer:
+    """거래명 목록을 PAGE건씩 나눠 응답. pages[pageNo]로 특정 페이지 응답 덮어쓰기."""
+
+    def __init__(self, total):
+        self.names = [f"apt{i}" for i in range(total)]
+        self.pages = {}
+        self.calls = []
+
+    def __call__(self, url, params=None, timeout=None, **kwargs):
+        molit_api.get_quota().consume(molit_api.endpoint_of(url))
+        page = int(params["pageNo"])
+        self.calls.append(page)
+        if page in self.pages:
+            return FakeResponse(self.pages[page])
+        chunk = self.names[(page - 1) * PAGE:page * PAGE]
+        return FakeResponse(rtms_xml(chunk, len(self.names)))
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """임시 캐시·한도·호스트 제한(1)으로 격리"""
+    monkeypatch.setattr(molit_api, "_cache", molit_api.ResponseCache(tmp_path / "rtms"))
+    monkeypatch.setattr(molit_api, "_quota", molit_api.QuotaTracker(tmp_path / "quota.json", 100))
+    monkeypatch.setattr(molit_api, "_limiter", molit_api.HostLimiter(1))
+
+    def install(total):
+        server = FakeServer(total)
+        monkeypatch.setattr(molit_api, "_request", server)
+        return server
+    return install
+
+
+def fetch(params=None):
+    params = params or {"LAWD_CD": "11350", "DEAL_YMD": OLD_MONTH}
+    return molit_api.fetch_all_items(URL, params, page_size=PAGE)
+
+
+def test_all_pages_in_order(api):
+    server = api(25)
+    assert [it["aptNm"] for it in fetch()] == server.names
+    assert sorted(server.calls) == [1, 2, 3]
+
+
+def test_quota_short_yields_nothing(api):
+    server = api(25)
+    molit_api.get_quota().daily_limit = 2   # 1페이지는 되지만 나머지 2페이지는 부족
+    got = []
+    with pytest.raises(molit_api.QuotaExceeded):
+        for item in fetch():
+            got.append(item)
+    assert got == []
+    assert server.calls == [1]
+
+
+def test_quota_checked_from_cached_total_before_first_page(api):
+    server = api(25)
+    list(fetch())
+    # 캐시 본문만 지우면 인덱스의 totalCount(25 → 3페이지)로 다음 조회를 추정
+    cache = molit_api.get_cache()
+    for path in cache.objects.iterdir():
+        path.unlink()
+    server.calls.clear()
+    quota = molit_api.get_quota()
+    quota.daily_limit = quota.used[molit_api.endpoint_of(URL)] + 2
+    with pytest.raises(molit_api.QuotaExceeded):
+        list(fetch())
+    assert server.calls == []
+
+
+def test_error_on_later_page_yields_nothing(api):
+    server = api(25)
+    server.pages[3] = rtms_xml([], 25, code="99")
+    got = []
+    with pytest.raises(molit_api.ApiError):
+        for item in fetch():
+            got.append(item)
+    assert got == []
+
+
+def test_host_slot_released_before_yield(api):
+    api(5)
+    items = molit_api.fetch_items(URL, molit_api.page_params({"LAWD_CD": "11350", "DEAL_YMD": OLD_MONTH}, 1, PAGE))
+    next(items)
+    # 소비자가 아직 나머지를 읽지 않았어도 호스트 슬롯(상한 1)은 비어 있어야 한다
+    slot = molit_api.host_slot(URL)
+    assert slot.acquire(blocking=False)
+    slot.release()
+    assert len(list(items)) == 4
+
+
+# ─── 응답 캐시 ───
+def cache_files(cache):
+    return sorted(p.name for p in cache.objects.iterdir()) if cache.objects.exists() else []
+
+
+def test_month_ttl_by_age():
+    now = datetime(2026, 10, 18, tzinfo=molit_api.KST)
+    assert molit_api.month_ttl("202610", now) == 0                       # 당월: 캐시 안 함
+    assert molit_api.month_ttl("202609", now) == molit_api.LAST_MONTH_TTL
+    assert molit_api.month_ttl("202512", now) is None                    # 신고 완료: 만료 없음
+    assert molit_api.month_ttl("", now) == 0
+    assert molit_api.LAST_MONTH_TTL > 0
+
+
+def test_network_page_stored_content_addressed(api):
+    server = api(5)
+    list(fetch())
+    cache = molit_api.get_cache()
+    body = rtms_xml(server.names, 5)
+    sha = hashlib.sha256(body).hexdigest()
+    assert cache_files(cache) == [f"{sha}.xml"]
+    (key, entry), = cache.index.items()
+    assert entry["sha"] == sha and entry["size"] == len(body) and entry["total"] == 5
+    # 두 번째 조회는 캐시에서
+    server.calls.clear()
+    assert [it["aptNm"] for it in fetch()] == server.names
+    assert server.calls == [] and cache.stats["hit"] == 1
+
+
+def test_current_month_not_cached(api):
+    server = api(5)
+    month = datetime.now(molit_api.KST).strftime("%Y%m")
+    list(fetch({"LAWD_CD": "11350", "DEAL_YMD": month}))
+    list(fetch({"LAWD_CD": "11350", "DEAL_YMD": month}))
+    assert server.calls == [1, 1]
+    assert cache_files(molit_api.get_cache()) == []
+
+
+@pytest.mark.parametrize("cut, error", [
+    (120, requests.exceptions.ChunkedEncodingError),   # 수신 도중 연결 끊김
+    (None, molit_api.ET.ParseError),                   # 잘린 XML
+])
+def test_broken_stream_leaves_no_object(api, cut, error):
+    server = api(5)
+    body = rtms_xml(server.names, 5)
+    server.pages[1] = CutStream(body, cut) if cut else body[:-30]
+    with pytest.raises(error):
+        list(fetch())
+    cache = molit_api.get_cache()
+    assert cache_files(cache) == []      # 임시 파일도 남지 않음
+    assert cache.index == {}
+
+
+def test_api_error_not_cached(api):
+    server = api(5)
+    server.pages[1] = rtms_xml([], 0, code="99")
+    with pytest.raises(molit_api.ApiError):
+        list(fetch())
+    assert cache_files(molit_api.get_cache()) == []
+
+
+def test_abandoned_generator_stores_nothing(api):
+    server = api(5)
+    items = fetch()
+    items.close()                        # 시작 전에 버린 조회
+    assert server.calls == []
+    assert cache_files(molit_api.get_cache()) == []
+
+
+def put(cache, key, body, last_used):
+    writer = cache.open_writer()
+    writer.write(body)
+    writer.close()
+    cache.store(key, writer)
+    cache.index[key]["last_used"] = last_used
+
+
+def test_evict_lru_keeps_index_and_objects_consistent(tmp_path):
+    cache = molit_api.ResponseCache(tmp_path / "rtms", max_bytes=250)
+    put(cache, "a", b"A" * 100, last_used=1)
+    put(cache, "b", b"B" * 100, last_used=2)
+    put(cache, "shared1", b"S" * 100, last_used=3)
+    put(cache, "shared2", b"S" * 100, last_used=4)   # 같은 본문 → 같은 객체
+    cache.save()
+
+    index = json.loads(cache.index_path.read_text(encoding="utf-8"))
+    # 300바이트 > 250 → 가장 오래 안 쓴 "a"만 제거
+    assert sorted(index) == ["b", "shared1", "shared2"]
+    live = {f"{e['sha']}.xml" for e in index.values()}
+    assert set(cache_files(cache)) == live and len(live) == 2
+
+    # 공유 객체는 마지막 참조가 사라질 때만 삭제
+    reopened = molit_api.ResponseCache(tmp_path / "rtms", max_bytes=50)
+    reopened.index["shared2"]["last_used"] = 10
+    reopened.save()
+    index = json.loads(reopened.index_path.read_text(encoding="utf-8"))
+    assert index == {}
+    assert cache_files(reopened) == []
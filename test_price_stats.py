@@ -0,0 +1,122 @@
+"""
+price_stats 테스트
+- P²: 무작위 표본의 사분위를 statistics 정확값과 비교 (오차 범위 내), 5개 미만은 정확한 분위수
+- PriceStats: 180일 창 교체 후 새 분포 표본이 모자라면 직전 분포, 동 → 지역 분포 대체, 이상가격 플래그는 매매/전세만
+"""
+
+import json
+import random
+import statistics
+from datetime import datetime, timedelta
+
+import pytest
+
+from price_stats import (
+    ANOMALY_LOW_RATIO, DONG_MIN_SAMPLES, QUANTILES, REGION_MIN_SAMPLES, WINDOW_DAYS,
+    Distribution, P2Quantile, PriceStats,
+)
+
+NOW = datetime(2026, 10, 18, 20)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_p2_close_to_exact_quartiles(seed):
+    rng = random.Random(seed)
+    xs = [rng.lognormvariate(10, 0.4) for _ in range(3000)]
+    dist = Distribution()
+    for x in xs:
+        dist.add(x)
+    exact = statistics.quantiles(xs, n=4, method="inclusive")
+    assert dist.count == len(xs)
+    assert dist.quartiles() == pytest.approx(exact, rel=0.01)
+    assert dist.quartiles()[1] == pytest.approx(statistics.median(xs), rel=0.01)
+
+
+def test_p2_under_five_is_exact():
+    xs = [40, 10, 30, 20]
+    sketches = [P2Quantile(p) for p in QUANTILES]
+    for i, x in enumerate(xs, 1):
+        for s in sketches:
+            s.add(x)
+        assert sketches[1].value() == statistics.median(xs[:i])
+    assert [s.value() for s in sketches] == statistics.quantiles(xs, n=4, method="inclusive")
+    assert P2Quantile(0.5).value() is None
+
+
+def test_p2_state_round_trip():
+    rng = random.Random(7)
+    original = Distribution()
+    for _ in range(50):
+        original.add(rng.randint(30000, 90000))
+    restored = Distribution(json.loads(json.dumps(original.state())))
+    for x in (10000, 60000, 120000):
+        original.add(x)
+        restored.add(x)
+    assert restored.quartiles() == original.quartiles()
+    assert restored.count == original.count
+
+
+def trade(price, dong="상계동", area_py=25):
+    return {"region": "서울 노원구", "dong": dong, "area_py": area_py, "price": price}
+
+
+def rent(deposit, rent_type="전세", dong="상계동"):
+    return {"region": "서울 노원구", "dong": dong, "area_py": 25, "deposit": deposit, "rent_type": rent_type}
+
+
+def test_new_window_falls_back_to_previous_distribution():
+    stats = PriceStats("trade")
+    stats.update([trade(p) for p in range(50000, 60000, 1000)], NOW)      # 10건
+    later = NOW + timedelta(days=WINDOW_DAYS + 1)
+    # 창 교체 후 새 표본이 DONG_MIN_SAMPLES 미만 → 직전 분포 기준
+    stats.update([trade(90000)] * (DONG_MIN_SAMPLES - 1), later)
+    g = stats.groups["서울 노원구|상계동|25|매매"]
+    assert g["since"] == later.strftime("%Y-%m-%d") and g["prev"].count == 10
+    # 지역 단위 새 분포(4건 ≥ REGION_MIN_SAMPLES)보다 동 단위 직전 분포가 먼저
+    prev_median = round(g["prev"].quartiles()[1])
+    assert 50000 <= prev_median < 60000
+    assert stats.score(trade(54500))["median"] == prev_median
+    # 새 분포 표본이 차면 새 분포 기준
+    stats.update([trade(90000)], later)
+    assert stats.score(trade(54500))["median"] == 90000
+
+
+def test_window_not_rotated_before_expiry():
+    stats = PriceStats("trade")
+    stats.update([trade(50000)] * 5, NOW)
+    stats.update([trade(70000)] * 5, NOW + timedelta(days=WINDOW_DAYS))
+    g = stats.groups["서울 노원구|상계동|25|매매"]
+    assert g["prev"] is None and g["cur"].count == 10
+
+
+def test_dong_then_region_fallback():
+    stats = PriceStats("trade")
+    stats.update([trade(60000, dong="상계동")] * (DONG_MIN_SAMPLES - 1), NOW)
+    # 동 표본 부족 → 같은 지역 전체 분포 (상계동 4 + 중계동 0 → 4건 ≥ REGION_MIN_SAMPLES)
+    assert DONG_MIN_SAMPLES - 1 >= REGION_MIN_SAMPLES
+    assert stats.score(trade(60000, dong="중계동"))["median"] == 60000
+    # 지역 표본도 부족하면 기준 없음
+    sparse = PriceStats("trade")
+    sparse.update([trade(60000)] * (REGION_MIN_SAMPLES - 1), NOW)
+    assert sparse.score(trade(60000)) is None
+    # 동 표본이 충분하면 지역보다 동 분포가 우선
+    stats.update([trade(80000, dong="중계동")] * DONG_MIN_SAMPLES, NOW)
+    assert stats.score(trade(80000, dong="중계동"))["median"] == 80000
+    assert stats.score(trade(60000, dong="상계동"))["median"] != 60000   # 상계동은 여전히 지역 분포
+    # 다른 면적대는 분포를 공유하지 않음
+    assert stats.score(trade(60000, area_py=40)) is None
+
+
+@pytest.mark.parametrize("kind, make, flagged", [
+    ("trade", trade, True),
+    ("rent", rent, True),
+    ("rent", lambda x: rent(x, rent_type="월세"), False),
+])
+def test_anomaly_flag_only_for_trade_and_jeonse(kind, make, flagged):
+    stats = PriceStats(kind)
+    stats.update([make(40000)] * DONG_MIN_SAMPLES, NOW)
+    low = stats.score(make(40000 * ANOMALY_LOW_RATIO - 1000))
+    assert low["ratio"] < ANOMALY_LOW_RATIO
+    assert low["anomaly"] is flagged
+    assert stats.score(make(40000 * ANOMALY_LOW_RATIO))["anomaly"] is False   # 경계값은 정상
+    assert stats.score(make(0)) is None
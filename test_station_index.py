@@ -0,0 +1,81 @@
+"""
+station_index 테스트: 격자 링 탐색 결과를 전체 역 haversine 순회(brute force)와 비교
+"""
+
+import math
+import random
+
+import pytest
+
+import main
+from station_index import CELL_KM, KM_PER_DEG_LAT, KM_PER_DEG_LON_EQUATOR, StationIndex, haversine
+
+
+def brute_nearest(stations, lat, lon):
+    """목록 순서상 먼저 나온 역이 동률에서 이기는 전체 순회"""
+    best, best_d = None, float("inf")
+    for st in stations:
+        d = haversine(lat, lon, st["lat"], st["lon"])
+        if d < best_d:
+            best, best_d = st, d
+    return best, best_d
+
+
+def random_points(n, seed):
+    rng = random.Random(seed)
+    return [(rng.uniform(37.3, 37.8), rng.uniform(126.7, 127.3)) for _ in range(n)]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return StationIndex(main.STATIONS)
+
+
+def test_nearest_matches_brute_force(index):
+    for lat, lon in random_points(500, seed=1):
+        st, d = index.nearest(lat, lon)
+        want, want_d = brute_nearest(main.STATIONS, lat, lon)
+        assert st is want
+        assert d == pytest.approx(want_d)
+
+
+def test_nearest_in_next_ring_out():
+    # 격자 좌표(셀 단위)로 배치: 질의점은 셀 (M, N)의 왼쪽 위 모서리 근처.
+    # 링 1에는 대각선 먼 구석의 역(약 2.1셀), 링 2에는 바로 위쪽 역(약 1.06셀)
+    # → 링 1에서 찾은 역으로 끝내면 틀리고, 한 링 더 넓혀야 정답
+    M, N = 7470, 2770   # 서울 부근 (약 37.6°N, 127.0°E)
+    lat_of = lambda cy: cy * CELL_KM / KM_PER_DEG_LAT
+    lats = {"위": lat_of(N + 2.05), "대각": lat_of(N + 1.95)}
+    km_per_deg_lon = KM_PER_DEG_LON_EQUATOR * math.cos(math.radians(sum(lats.values()) / 2))
+    lon_of = lambda cx: cx * CELL_KM / km_per_deg_lon
+    stations = [
+        {"name": "대각", "line": "B", "lat": lats["대각"], "lon": lon_of(M + 1.95)},
+        {"name": "위", "line": "A", "lat": lats["위"], "lon": lon_of(M + 0.05)},
+    ]
+    index = StationIndex(stations)
+    q = (lat_of(N + 0.99), lon_of(M + 0.05))
+    grid = index._all
+    cx, cy = grid.cell_of(*q)
+    ring = {st["name"]: max(abs(a - b) for a, b in zip(grid.cell_of(st["lat"], st["lon"]), (cx, cy))) for st in stations}
+    assert ring == {"대각": 1, "위": 2}
+
+    st, d = index.nearest(*q)
+    want, want_d = brute_nearest(stations, *q)
+    assert st is want and st["name"] == "위"
+    assert d == pytest.approx(want_d)
+
+
+def test_ties_keep_list_order():
+    st = {"line": "A", "lat": 37.5, "lon": 127.0}
+    stations = [dict(st, name="먼저"), dict(st, name="나중")]
+    assert StationIndex(stations).nearest(37.51, 127.01)[0]["name"] == "먼저"
+
+
+def test_empty_index():
+    assert StationIndex([]).nearest(37.5, 127.0) == (None, float("inf"))
+
+
+def test_batch_matches_single(index):
+    coords = random_points(50, seed=3)
+    assert index.nearest_many(coords) == [index.nearest(lat, lon) for lat, lon in coords]
+    assert [(st, d) for st, d, _ in main.find_nearest_stations(coords)] == index.nearest_many(coords)
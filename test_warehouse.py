@@ -0,0 +1,214 @@
+"""
+warehouse 테스트
+- encode_rows / decode_rows 왕복 (빈 목록, 문자열·None이 섞인 열, 행 순서와 무관한 같은 표현)
+- write: 같은 내용을 다시 쓰면 False (바이트·갱신 시각 그대로), final 표시만 바뀌면 True
+- final이 아닌 파티션은 pending에만 두고, final이 되면 root(git 추적)로 옮김
+- month_end / is_settled: 12월, 신고 기한 + 여유의 경계일
+- save_collected: 조회 실패 작업은 저장하지 않음
+- warehouse_backfill: final 파티션은 건너뛰고, 남은 한도에서 앞에서부터 끊음
+"""
+
+import json
+import random
+import shutil
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import molit_api
+import warehouse_backfill
+from warehouse import (
+    FINAL_GRACE_DAYS, REPORT_DEADLINE_DAYS, Warehouse, decode_rows, encode_rows, is_settled, month_end,
+    recent_months,
+)
+
+NOW = datetime(2026, 10, 18, 20)
+
+
+def trade_row(i, dong="상계동", road=""):
+    return {
+        "아파트": f"단지{i % 3}", "면적": 59.9 + i % 2 * 25, "거래금액": 50000 + i * 100, "층": i % 15 + 1,
+        "건축년도": 1990 + i, "거래년도": 2026, "거래월": 9, "거래일": i % 28 + 1,
+        "법정동": dong, "지번": str(100 + i), "도로명": road,
+    }
+
+
+def store(tmp_path):
+    return Warehouse(tmp_path / "warehouse", tmp_path / "pending")
+
+
+def canonical(rows):
+    return sorted(json.dumps(r, ensure_ascii=False, sort_keys=True) for r in rows)
+
+
+def test_round_trip():
+    rows = [trade_row(i) for i in range(20)]
+    payload = json.loads(json.dumps(encode_rows(rows), ensure_ascii=False))
+    assert payload["count"] == 20
+    assert payload["dicts"]["아파트"] == ["단지0", "단지1", "단지2"]
+    assert "거래금액" not in payload["dicts"]
+    assert canonical(decode_rows(payload)) == canonical(rows)
+
+
+def test_round_trip_empty():
+    payload = encode_rows([])
+    assert payload["count"] == 0 and payload["fields"] == []
+    assert decode_rows(json.loads(json.dumps(payload))) == []
+
+
+def test_round_trip_mixed_str_none_column():
+    # 같은 열에 문자열과 None, 앞 열이 같아 None·문자열을 비교해야 하는 행 포함
+    rows = [trade_row(1, dong="상계동"), trade_row(1, dong=None), trade_row(2, dong=None), trade_row(2, road="동일로")]
+    payload = json.loads(json.dumps(encode_rows(rows), ensure_ascii=False))
+    assert set(payload["dicts"]["법정동"]) == {"상계동", None}
+    assert canonical(decode_rows(payload)) == canonical(rows)
+
+
+def test_same_rows_any_order_same_encoding():
+    rows = [trade_row(i, dong=None if i % 4 == 0 else "중계동") for i in range(30)]
+    shuffled = rows[:]
+    random.Random(3).shuffle(shuffled)
+    assert encode_rows(shuffled) == encode_rows(rows)
+
+
+def test_write_is_byte_stable(tmp_path):
+    wh = store(tmp_path)
+    rows = [trade_row(i) for i in range(10)]
+    assert wh.write("trade", "11350", "202609", rows, NOW) is True
+    path = wh.path("trade", "11350", "202609")
+    body, meta = path.read_bytes(), wh.partitions("trade", "11350")["202609"]
+    assert meta == {"rows": 10, "updated_at": "2026-10-18 20:00", "final": False}
+
+    later = NOW + timedelta(hours=1)
+    assert wh.write("trade", "11350", "202609", reversed(rows), later) is False
+    assert path.read_bytes() == body
+    assert wh.partitions("trade", "11350")["202609"] == meta
+    # 다시 연 창고(index.json)에서도 같은 결과
+    assert store(tmp_path).write("trade", "11350", "202609", rows, later) is False
+    assert canonical(store(tmp_path).read("trade", "11350", "202609")) == canonical(rows)
+
+    # 내용이 바뀌면 True
+    assert wh.write("trade", "11350", "202609", rows[:-1], later) is True
+    assert wh.partitions("trade", "11350")["202609"]["rows"] == 9
+
+
+def test_write_marks_final_once_settled(tmp_path):
+    wh = store(tmp_path)
+    rows = [trade_row(i) for i in range(5)]
+    wh.write("trade", "11350", "202609", rows, NOW)
+    assert not wh.is_final("trade", "11350", "202609")
+    body = wh.path("trade", "11350", "202609").read_bytes()
+    # 같은 내용이라도 신고 기한이 지나 final이 되면 목록 갱신 (파일·갱신 시각은 그대로)
+    settled = datetime(2026, 11, 14, 9)
+    assert wh.write("trade", "11350", "202609", rows, settled) is True
+    assert wh.is_final("trade", "11350", "202609")
+    assert wh.path("trade", "11350", "202609").read_bytes() == body
+    assert wh.partitions("trade", "11350")["202609"]["updated_at"] == "2026-10-18 20:00"
+    assert wh.write("trade", "11350", "202609", rows, settled) is False
+
+
+def test_only_final_partitions_in_root(tmp_path):
+    wh = store(tmp_path)
+    rows = [trade_row(i) for i in range(5)]
+    wh.write("trade", "11350", "202609", rows, NOW)
+    wh.write("trade", "11350", "202001", rows, NOW)
+    root = tmp_path / "warehouse" / "trade" / "11350"
+    pending = tmp_path / "pending" / "trade" / "11350"
+    assert sorted(p.name for p in root.iterdir()) == ["202001.json.gz", "index.json"]
+    assert sorted(p.name for p in pending.iterdir()) == ["202609.json.gz", "index.json"]
+    assert set(json.loads((root / "index.json").read_text(encoding="utf-8"))) == {"202001"}
+    assert set(wh.partitions("trade", "11350")) == {"202001", "202609"}
+
+    # final이 되면 root로 옮기고 pending 사본·목록은 정리
+    wh.write("trade", "11350", "202609", rows, datetime(2026, 11, 14, 9))
+    assert sorted(p.name for p in root.iterdir()) == ["202001.json.gz", "202609.json.gz", "index.json"]
+    assert list(pending.iterdir()) == []
+    assert canonical(store(tmp_path).read("trade", "11350", "202609")) == canonical(rows)
+
+
+def test_legacy_non_final_in_root_moves_to_pending(tmp_path):
+    # 예전 방식으로 final 아닌 파티션까지 root에 올라가 있던 창고
+    rows = [trade_row(i) for i in range(5)]
+    store(tmp_path).write("trade", "11350", "202609", rows, NOW)
+    shutil.move(tmp_path / "pending", tmp_path / "warehouse")
+    wh = store(tmp_path)
+    assert wh.read("trade", "11350", "202609") is not None
+    assert wh.write("trade", "11350", "202609", rows, NOW) is True
+    assert wh.partitions("trade", "11350")["202609"]["updated_at"] == "2026-10-18 20:00"
+    assert not (tmp_path / "warehouse" / "trade" / "11350" / "202609.json.gz").exists()
+    assert wh.path("trade", "11350", "202609") == tmp_path / "pending" / "trade" / "11350" / "202609.json.gz"
+
+
+def test_read_missing_partition(tmp_path):
+    assert store(tmp_path).read("trade", "11350", "202609") is None
+    assert list(store(tmp_path).iter_rows("trade", "11350")) == []
+
+
+def test_month_end():
+    assert month_end("202612") == date(2026, 12, 31)
+    assert month_end("202611") == date(2026, 11, 30)
+    assert month_end("202402") == date(2024, 2, 29)
+    assert month_end("202501") == date(2025, 1, 31)
+
+
+@pytest.mark.parametrize("month, settle_day", [
+    ("202612", date(2027, 2, 14)),   # 12월: 해를 넘김
+    ("202609", date(2026, 11, 14)),
+])
+def test_is_settled_boundary(month, settle_day):
+    assert settle_day == month_end(month) + timedelta(days=REPORT_DEADLINE_DAYS + FINAL_GRACE_DAYS)
+    day_before = datetime.combine(settle_day - timedelta(days=1), datetime.max.time())
+    assert not is_settled(month, day_before)
+    assert is_settled(month, datetime.combine(settle_day, datetime.min.time()))
+
+
+def test_recent_months_cross_year():
+    assert recent_months(4, datetime(2026, 2, 1)) == ["202602", "202601", "202512", "202511"]
+    assert recent_months(0, NOW) == []
+
+
+def test_save_collected_skips_failed(tmp_path):
+    wh = store(tmp_path)
+    collected = {
+        ("11350", "202609", "trade"): [trade_row(1)],
+        ("11350", "202609", "rent"): [],                      # 거래 없는 달도 저장
+        ("11320", "202609", "trade"): [trade_row(2)],         # 일부 페이지만 받았을 수 있음
+    }
+    assert wh.save_collected(collected, {("11320", "202609", "trade")}, NOW) == 2
+    assert wh.read("trade", "11350", "202609") == [trade_row(1)]
+    assert wh.read("rent", "11350", "202609") == []
+    assert wh.read("trade", "11320", "202609") is None
+    assert wh.save_collected(collected, {("11320", "202609", "trade")}, NOW) == 0
+
+
+@pytest.fixture
+def quota(tmp_path, monkeypatch):
+    monkeypatch.setattr(molit_api, "_cache", molit_api.ResponseCache(tmp_path / "rtms"))
+    tracker = molit_api.QuotaTracker(tmp_path / "quota.json", 3)
+    monkeypatch.setattr(molit_api, "_quota", tracker)
+    return tracker
+
+
+def test_pending_jobs_skip_final(tmp_path):
+    wh = store(tmp_path)
+    wh.write("trade", "11350", "202001", [trade_row(1)], NOW)     # 신고 기한 지남 → final
+    wh.write("rent", "11350", "202609", [], NOW)                  # 아직 final 아님 → 다시 조회
+    jobs = warehouse_backfill.pending_jobs(wh, ["11350", "11320"], ["202609", "202001"])
+    assert ("11350", "202001", "trade") not in jobs
+    assert jobs[:4] == [
+        ("11350", "202609", "trade"), ("11350", "202609", "rent"),
+        ("11320", "202609", "trade"), ("11320", "202609", "rent"),
+    ]
+    assert len(jobs) == 7
+
+
+def test_fit_quota_stops_at_limit(quota):
+    jobs = [(code, month, kind) for month in ("202609", "202608") for code in ("11350", "11320") for kind in ("trade", "rent")]
+    # 엔드포인트별 한도 3 → 매매 4번째 작업(7번째)에서 멈추고 뒤의 전월세 작업도 넘기지 않음
+    assert warehouse_backfill.fit_quota(jobs) == jobs[:6]
+
+    quota.consume(molit_api.endpoint_of(warehouse_backfill.TRADE_API_URL))
+    quota.consume(molit_api.endpoint_of(warehouse_backfill.TRADE_API_URL))
+    assert warehouse_backfill.fit_quota(jobs) == jobs[:2]
+    quota.daily_limit = 0
+    assert warehouse_backfill.fit_quota(jobs) == []
@@ -0,0 +1,234 @@
+"""
+실거래 원본 이력 창고 (warehouse)
+- 수집한 RTMS 매매·전월세 원본 행(main.parse_trade_item / parse_rent_item)을 (종류, 지역코드, 계약년월) 파티션으로 보관
+- 파티션 파일: warehouse/{kind}/{region_code}/{YYYYMM}.json.gz
+  → 열 단위(columnar) + 문자열 열 사전 인코딩 + gzip(mtime=0). 행은 정렬해 두어 같은 내용이면 같은 바이트
+- 한 파티션은 그 달 조회 결과 전체로 통째 교체 (임시 파일 → os.replace). 조회 실패한 달은 쓰지 않는다
+- 신고 기한(계약 후 30일) + 반영 여유가 지난 달은 final로 표시 → 백필 재실행 시 건너뜀 (중단 후 재개)
+- git에는 final 파티션(warehouse/)만 올린다. 아직 신고가 더 들어올 수 있는 달은 .cache/warehouse/ 에 두고
+  (Actions 캐시로 이어 씀) final이 되는 실행에서 warehouse/ 로 옮긴다 → 매 실행 바뀌는 gzip이 커밋되지 않음
+- 파티션 목록(행 수·갱신 시각·final)은 각 폴더(지역별)의 index.json
+- main.py(매 실행 2개월), warehouse_backfill.py(N년 백필), flagship_backfill.py가 같은 창고를 쓴다
+"""
+
+import gzip
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+WAREHOUSE_DIR = BASE_DIR / "warehouse"
+PENDING_DIR = BASE_DIR / ".cache" / "warehouse"
+KINDS = ("trade", "rent")
+
+# 부동산 거래신고 기한(계약일로부터 30일) + API 반영 지연 여유
+REPORT_DEADLINE_DAYS = 30
+FINAL_GRACE_DAYS = 15
+
+
+def month_end(month):
+    """YYYYMM → 그 달 마지막 날 (date)"""
+    year, mon = int(month[:4]), int(month[4:])
+    first_next = date(year + mon // 12, mon % 12 + 1, 1)
+    return first_next - timedelta(days=1)
+
+
+def is_settled(month, now):
+    """이 달 계약분이 모두 신고·반영됐다고 볼 수 있는지"""
+    settle = month_end(month) + timedelta(days=REPORT_DEADLINE_DAYS + FINAL_GRACE_DAYS)
+    return now.date() >= settle
+
+
+def recent_months(n, now):
+    """now가 속한 달부터 n개월 전까지 YYYYMM 목록 (최근 달부터)"""
+    year, mon = now.year, now.month
+    months = []
+    for _ in range(max(0, n)):
+        months.append(f"{year}{mon:02d}")
+        mon -= 1
+        if mon == 0:
+            year, mon = year - 1, 12
+    return months
+
+
+def _sort_key(fields):
+    # None은 같은 열의 값보다 앞으로 (None과 문자열·숫자를 직접 비교하지 않게)
+    return lambda r: tuple((r.get(f) is not None, r.get(f)) for f in fields)
+
+
+def encode_rows(rows):
+    """원본 행 목록 → {"fields", "dicts", "columns"} 열 단위 표현.
+    문자열 열(빈 값 None 포함)은 dicts[필드]의 번호. 없는 필드는 None으로 채운다."""
+    fields = list(dict.fromkeys(f for r in rows for f in r))
+    rows = sorted(rows, key=_sort_key(fields))
+    dicts, columns = {}, {}
+    for field in fields:
+        values = [r.get(field) for r in rows]
+        if any(isinstance(v, str) for v in values) and all(v is None or isinstance(v, str) for v in values):
+            lookup = {}
+            columns[field] = [lookup.setdefault(v, len(lookup)) for v in values]
+            dicts[field] = list(lookup)
+        else:
+            columns[field] = values
+    return {"format": "columnar", "count": len(rows), "fields": fields, "dicts": dicts, "columns": columns}
+
+
+def decode_rows(payload):
+    """encode_rows 결과 → 원본 행 목록"""
+    fields, dicts, columns = payload["fields"], payload["dicts"], payload["columns"]
+    decoded = [
+        [dicts[f][i] for i in columns[f]] if f in dicts else columns[f]
+        for f in fields
+    ]
+    return [dict(zip(fields, values)) for values in zip(*decoded)]
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class Warehouse:
+    """(kind, region_code, YYYYMM) 파티션 창고. 여러 스레드에서 write/read 가능.
+    final 파티션은 root, 아직 final이 아닌 파티션은 pending 아래에 둔다."""
+
+    def __init__(self, root=WAREHOUSE_DIR, pending=PENDING_DIR):
+        self.root = Path(root)
+        self.pending = Path(pending)
+        self._lock = threading.Lock()
+        self._indexes = {}
+
+    def _base(self, final):
+        return self.root if final else self.pending
+
+    def _partition_path(self, kind, region_code, month, final):
+        return self._base(final) / kind / str(region_code) / f"{month}.json.gz"
+
+    def _index_path(self, kind, region_code, final):
+        return self._base(final) / kind / str(region_code) / "index.json"
+
+    def _index(self, kind, region_code, final):
+        # 호출 측에서 self._lock을 잡고 부른다
+        key = (final, kind, str(region_code))
+        if key not in self._indexes:
+            path = self._index_path(kind, region_code, final)
+            index = {}
+            if path.exists():
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        index = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    index = {}
+            self._indexes[key] = index
+        return self._indexes[key]
+
+    def _save_index(self, kind, region_code, final):
+        index = self._index(kind, region_code, final)
+        path = self._index_path(kind, region_code, final)
+        if not index:
+            path.unlink(missing_ok=True)
+            return
+        _write_atomic(path, json.dumps(dict(sorted(index.items())), ensure_ascii=False, indent=1).encode("utf-8"))
+
+    def path(self, kind, region_code, month):
+        """파티션 파일 위치 (root 목록에 있으면 root, 아니면 pending)"""
+        with self._lock:
+            in_root = month in self._index(kind, region_code, True)
+        path = self._partition_path(kind, region_code, month, True)
+        return path if in_root and path.exists() else self._partition_path(kind, region_code, month, False)
+
+    def partitions(self, kind, region_code):
+        """{YYYYMM: {"rows", "updated_at", "final"}}"""
+        with self._lock:
+            merged = {m: dict(meta) for m, meta in self._index(kind, region_code, False).items()}
+            merged.update((m, dict(meta)) for m, meta in self._index(kind, region_code, True).items())
+        return merged
+
+    def is_final(self, kind, region_code, month):
+        with self._lock:
+            meta = self._index(kind, region_code, True).get(month)
+        return bool(meta and meta.get("final")) and self._partition_path(kind, region_code, month, True).exists()
+
+    def write(self, kind, region_code, month, rows, now=None):
+        """파티션을 rows로 교체 → 내용(또는 final 표시)이 바뀌었으면 True.
+        final이 되면 pending에서 root로 옮긴다 (내용이 같으면 갱신 시각은 그대로)."""
+        now = now or datetime.now()
+        rows = list(rows)
+        body = gzip.compress(
+            json.dumps(encode_rows(rows), ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+            9, mtime=0,
+        )
+        final = is_settled(month, now)
+        path = self._partition_path(kind, region_code, month, final)
+        other_path = self._partition_path(kind, region_code, month, not final)
+        with self._lock:
+            index = self._index(kind, region_code, final)
+            other = self._index(kind, region_code, not final)
+            meta = index.get(month)
+            same = path.exists() and path.read_bytes() == body
+            if same and meta and meta.get("final") == final:
+                return False
+            prev = meta or other.get(month)
+            if not same:
+                same = other_path.exists() and other_path.read_bytes() == body
+                _write_atomic(path, body)
+            index[month] = {
+                "rows": len(rows),
+                "updated_at": prev["updated_at"] if same and prev else now.strftime("%Y-%m-%d %H:%M"),
+                "final": final,
+            }
+            # 파일을 먼저 쓰고 목록을 갱신 → 중간에 끊기면 목록에 없는 달로 남아 다음 실행에서 다시 받는다
+            self._save_index(kind, region_code, final)
+            # 다른 쪽(이전 pending 사본, 또는 final 아닌 채로 root에 올라가 있던 파티션)은 정리
+            if other.pop(month, None) is not None:
+                self._save_index(kind, region_code, not final)
+            other_path.unlink(missing_ok=True)
+        return True
+
+    def read(self, kind, region_code, month):
+        """파티션 원본 행 목록. 없으면 None"""
+        path = self.path(kind, region_code, month)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return decode_rows(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def iter_rows(self, kind, region_code, start=None, end=None):
+        """[start, end] 기간(YYYYMM, 양끝 포함) 파티션의 원본 행을 오래된 달부터 yield"""
+        for month in sorted(self.partitions(kind, region_code)):
+            if (start and month < start) or (end and month > end):
+                continue
+            yield from self.read(kind, region_code, month) or ()
+
+    def save_collected(self, collected, failed=(), now=None):
+        """main.collect_trades() 결과 {(region_code, month, kind): [행, ...]}를 파티션으로 저장 → 바뀐 파티션 수.
+        조회에 실패한 작업(failed)은 일부만 받았을 수 있으므로 건너뛴다."""
+        changed = 0
+        for (region_code, month, kind), rows in collected.items():
+            if (region_code, month, kind) in failed:
+                continue
+            changed += self.write(kind, region_code, month, rows, now)
+        return changed
+
+    def report(self):
+        """종류별 파티션 수 · 행 수 · final 비율 요약 문자열"""
+        parts = []
+        for kind in KINDS:
+            regions = sorted({
+                p.name for base in (self.root / kind, self.pending / kind) if base.exists() for p in base.iterdir() if p.is_dir()
+            })
+            if not regions:
+                continue
+            count = rows = final = 0
+            for region_code in regions:
+                for meta in self.partitions(kind, region_code).values():
+                    count += 1
+                    rows += meta.get("rows", 0)
+                    final += bool(meta.get("final"))
+            parts.append(f"{kind} {count}개 파티션 · {rows:,}행 (final {final})")
+        return ", ".join(parts) or "비어 있음"
@@ -0,0 +1,116 @@
+"""
+실거래 이력 창고 백필 스크립트
+- config.json의 전체 지역 × 최근 N년 × 매매/전월세를 warehouse/ 파티션으로 채움
+- 이미 final인 달(신고 기한 경과 후 받은 달)은 건너뜀 → 중단(한도 소진·강제 종료) 후 다시 실행하면 이어서 진행
+- 오늘 남은 API 한도로 끝낼 수 있는 만큼만 최근 달부터 조회하고, 나머지는 다음 실행으로 넘김
+- 조회는 main.collect_trades()로 병렬 실행 (호스트당 동시 요청은 molit_api가 제한)
+
+사용: python warehouse_backfill.py [--years 5] [--workers 8] [--per-host 4] [--region 11680 ...]
+"""
+
+import argparse
+from datetime import datetime, timedelta, timezone
+
+import molit_api
+from main import (
+    COLLECT_PER_HOST, COLLECT_WORKERS, RENT_API_URL, TRADE_API_URL,
+    collect_trades, load_config,
+)
+from warehouse import KINDS, Warehouse, recent_months
+
+DEFAULT_YEARS = 5
+# 한 번에 제출하는 조회 묶음 — 묶음마다 파티션을 저장해 중단돼도 받은 만큼은 남는다
+BATCH_SIZE = 48
+
+
+def pending_jobs(wh, region_codes, months):
+    """final이 아닌 (region_code, month, kind) 목록 — 최근 달부터"""
+    return [
+        (code, month, kind)
+        for month in months
+        for code in region_codes
+        for kind in KINDS
+        if not wh.is_final(kind, code, month)
+    ]
+
+
+def fit_quota(jobs):
+    """오늘 남은 한도 안에서 앞에서부터 조회할 수 있는 작업만 (추정 호출 수 기준)"""
+    urls = {"trade": TRADE_API_URL, "rent": RENT_API_URL}
+    quota = molit_api.get_quota()
+    left = {}
+    fitted = []
+    for job in jobs:
+        code, month, kind = job
+        need = molit_api.estimate_calls([(urls[kind], {"LAWD_CD": code, "DEAL_YMD": month})])
+        if any(n > left.setdefault(ep, quota.remaining(ep)) for ep, n in need.items()):
+            break
+        for ep, n in need.items():
+            left[ep] -= n
+        fitted.append(job)
+    return fitted
+
+
+def backfill(api_key, region_codes, years, workers, per_host, now):
+    wh = Warehouse()
+    months = recent_months(years * 12, now)
+    jobs = pending_jobs(wh, region_codes, months)
+    total = len(region_codes) * len(months) * len(KINDS)
+    print(f"대상: {len(region_codes)}개 지역 × {len(months)}개월 ({months[-1]} ~ {months[0]}) × 매매/전월세")
+    print(f"남은 파티션: {len(jobs)} / {total}")
+
+    runnable = fit_quota(jobs)
+    if len(runnable) < len(jobs):
+        print(f"오늘 한도로 {len(runnable)}개만 조회 — 나머지 {len(jobs) - len(runnable)}개는 다음 실행에서 이어서")
+
+    written = failed_total = 0
+    try:
+        for start in range(0, len(runnable), BATCH_SIZE):
+            batch = runnable[start:start + BATCH_SIZE]
+            failed = set()
+            collected = collect_trades(api_key, None, None, workers, per_host, failed, jobs=batch)
+            written += wh.save_collected(collected, failed, now)
+            failed_total += len(failed)
+            done = start + len(batch)
+            print(f"  [{done}/{len(runnable)}] {batch[-1][1]}까지 · 파티션 갱신 {written}개 · 실패 {failed_total}개")
+    except molit_api.QuotaExceeded as e:
+        # 진행 중이던 묶음은 버리고 종료 — 저장된 파티션은 다음 실행에서 건너뜀
+        print(f"[중단] {e} — 다음 실행에서 이어서 진행합니다.")
+    return written, failed_total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="실거래 이력 창고 백필")
+    parser.add_argument("--years", type=int, default=DEFAULT_YEARS, help=f"백필 기간(년, 기본 {DEFAULT_YEARS})")
+    parser.add_argument("--workers", type=int, help="동시 실행 스레드 수 (기본 config collect.workers)")
+    parser.add_argument("--per-host", type=int, help="호스트당 동시 요청 상한 (기본 config collect.per_host)")
+    parser.add_argument("--region", action="append", help="지역코드만 지정 (여러 번 사용 가능)")
+    args = parser.parse_args()
+
+    KST = timezone(timedelta(hours=9))
+    now = datetime.now(KST)
+    print("=" * 55)
+    print(f"실거래 이력 창고 백필 ({args.years}년)")
+    print(f"실행 시각: {now.strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 55)
+
+    config = load_config()
+    collect_cfg = config.get("collect", {})
+    workers = args.workers or collect_cfg.get("workers", COLLECT_WORKERS)
+    per_host = args.per_host or collect_cfg.get("per_host", COLLECT_PER_HOST)
+    molit_api.configure(daily_quota=collect_cfg.get("daily_quota", molit_api.DAILY_QUOTA))
+    region_codes = args.region or list(dict.fromkeys(r["code"] for r in config["regions"]))
+
+    written, failed = backfill(config["api_key"], region_codes, max(1, args.years), workers, per_host, now)
+
+    molit_api.close()
+    print(f"  [캐시] {molit_api.cache_report()}")
+    print(f"  [한도] 오늘 API 호출: {molit_api.quota_report()}")
+    print(f"\n{'=' * 55}")
+    print(f"완료! 파티션 갱신 {written}개, 조회 실패 {failed}개 (다음 실행에서 재시도)")
+    print(f"창고: {Warehouse().report()}")
+    print("=" * 55)
+
+
+if __name__ == "__main__":
+    main()